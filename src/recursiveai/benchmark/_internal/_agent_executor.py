@@ -0,0 +1,125 @@
+# Copyright 2024 Recursive AI
+
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from ..api.batch_benchmark_agent import BatchBenchmarkAgent
+from ..api.benchmark_agent import BenchmarkAgent
+from ..api.benchmark_case import BenchmarkCase, BenchmarkCaseResponse
+from ..api.exit_code import ExitCode
+from ..api.streaming_benchmark_agent import StreamingBenchmarkAgent
+from ._micro_batcher import MicroBatcher
+from ._repeat_timing import RepeatTiming, StreamTiming
+from ._util import timed
+
+_logger = logging.getLogger(__name__)
+
+
+class AgentExecutor:
+    """
+    Runs agents on single benchmark cases, the same way for every runner: streaming
+    agents are streamed and timed chunk by chunk, the cases of batch agents are
+    grouped by one micro-batcher per agent, and a call can be bounded by a timeout.
+
+    Runners wrap each case they run in submitter(), so a batch agent's batch is
+    dispatched right away when no other case can add to it.
+    """
+
+    def __init__(self) -> None:
+        self._batchers: dict[int, MicroBatcher] = {}
+
+    @contextmanager
+    def submitter(self, agent: BenchmarkAgent) -> Iterator[None]:
+        """Marks a case of the agent as in flight until the context exits"""
+        if not isinstance(agent, BatchBenchmarkAgent):
+            yield
+            return
+        with self._batcher(agent).submitter():
+            yield
+
+    async def run(
+        self,
+        agent: BenchmarkAgent,
+        case: BenchmarkCase,
+        timing: RepeatTiming,
+        timeout: float | None = None,
+    ) -> BenchmarkCaseResponse:
+        """
+        Runs the agent on the case, with a TIMEOUT exit code past timeout seconds.
+        Sets timing.agent to the time taken, leaving out the time the case waited
+        for its batch to fill.
+        """
+        response, timing.agent = await timed(
+            self._run_with_timeout(
+                agent=agent, case=case, timing=timing, timeout=timeout
+            )
+        )
+        if timing.batch_wait is not None:
+            timing.agent -= timing.batch_wait
+        return response
+
+    async def _run_with_timeout(
+        self,
+        agent: BenchmarkAgent,
+        case: BenchmarkCase,
+        timing: RepeatTiming,
+        timeout: float | None,
+    ) -> BenchmarkCaseResponse:
+        if timeout is None:
+            return await self._run_agent(agent=agent, case=case, timing=timing)
+
+        timeout = max(timeout, 0.0)
+        try:
+            return await asyncio.wait_for(
+                self._run_agent(agent=agent, case=case, timing=timing),
+                timeout=timeout,
+            )
+        except asyncio.TimeoutError:
+            _logger.error("Benchmark timed out after %ss", timeout)
+            return BenchmarkCaseResponse(exit_code=ExitCode.TIMEOUT)
+
+    async def _run_agent(
+        self, agent: BenchmarkAgent, case: BenchmarkCase, timing: RepeatTiming
+    ) -> BenchmarkCaseResponse:
+        if isinstance(agent, StreamingBenchmarkAgent):
+            return await self._run_streaming_agent(
+                agent=agent, case=case, timing=timing
+            )
+        if isinstance(agent, BatchBenchmarkAgent):
+            return await self._run_batch_agent(agent=agent, case=case, timing=timing)
+        return await agent.run_benchmark_case(case)
+
+    async def _run_batch_agent(
+        self, agent: BatchBenchmarkAgent, case: BenchmarkCase, timing: RepeatTiming
+    ) -> BenchmarkCaseResponse:
+        batcher = self._batcher(agent)
+        response, timing.batch_size, timing.batch_wait = await batcher.submit(case)
+        return response
+
+    def _batcher(self, agent: BatchBenchmarkAgent) -> MicroBatcher:
+        batcher = self._batchers.get(id(agent))
+        if batcher is None:
+            batcher = MicroBatcher(
+                handler=agent.run_benchmark_cases,
+                max_batch_size=agent.max_batch_size,
+                max_batch_wait=agent.max_batch_wait,
+            )
+            self._batchers[id(agent)] = batcher
+        return batcher
+
+    async def _run_streaming_agent(
+        self, agent: StreamingBenchmarkAgent, case: BenchmarkCase, timing: RepeatTiming
+    ) -> BenchmarkCaseResponse:
+        chunks = []
+        chunk_times = []
+        start_time = time.perf_counter()
+        async for chunk in agent.stream_benchmark_case(case):
+            chunk_times.append(time.perf_counter())
+            chunks.append(chunk)
+        timing.stream = StreamTiming.from_chunks(
+            start_time=start_time, chunk_times=chunk_times, chunks=chunks
+        )
+        return BenchmarkCaseResponse(response="".join(chunks))
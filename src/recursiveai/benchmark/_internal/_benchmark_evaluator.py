@@ -13,6 +13,9 @@ class BenchmarkEvaluator(ABC):
     ) -> Evaluation:
         raise NotImplementedError()
 
+    async def prewarm(self, connections: int) -> None:
+        """Opens connections to the judges' endpoints ahead of the first cases"""
+
     @property
     def name(self) -> str:
         return self.__class__.__name__
@@ -1,10 +1,14 @@
 # Copyright 2024 Recursive AI
 
+import numpy as np
 from pydantic import BaseModel, computed_field
 
 from ..api.benchmark_case import BenchmarkCase
+from ..api.exit_code import ExitCode
 from ._evaluation import Evaluation
 from ._metrics._benchmark_metrics import BenchmarkMetrics
+from ._metrics._ratings_store import RatingsStore
+from ._repeat_timing import RepeatTiming
 
 
 class BenchmarkOutput(BaseModel):
@@ -12,10 +16,32 @@ class BenchmarkOutput(BaseModel):
     info: BenchmarkCase
     repeats: int = 1
     evaluations: list[Evaluation | None]
+    exit_codes: list[ExitCode] = []
+    case_runtimes: list[float] = []
     mean_case_runtime: float | None = None
     total_runtime: float | None = None
+    timings: list[RepeatTiming] = []
 
     @computed_field
     @property
     def metrics(self) -> BenchmarkMetrics:
-        return BenchmarkMetrics(evals=self.evaluations)
+        # The outputs are already validated
+        return BenchmarkMetrics.model_construct(
+            evals=self.evaluations, runtimes=self.case_runtimes, timings=self.timings
+        )
+
+
+def case_mean_ratings(outputs: list[BenchmarkOutput]) -> np.ndarray:
+    """
+    Mean rating of each case, NaN when it has none. Same as the cases' metrics but
+    without building them, which dominates the cost of comparing large runs.
+    """
+    return RatingsStore.from_ratings(
+        [
+            [
+                evaluation.rating if evaluation is not None else None
+                for evaluation in output.evaluations
+            ]
+            for output in outputs
+        ]
+    ).case_mean_ratings()
@@ -0,0 +1,13 @@
+# Copyright 2024 Recursive AI
+
+from pydantic import BaseModel
+
+
+class CanaryOutput(BaseModel):
+    case_ids: list[int]
+    threshold: float
+    confidence: float
+    mean_rating: float | None = None
+    ci_low: float | None = None
+    ci_high: float | None = None
+    passed: bool = True
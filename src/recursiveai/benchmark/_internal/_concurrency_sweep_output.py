@@ -0,0 +1,61 @@
+# Copyright 2024 Recursive AI
+
+from pydantic import BaseModel, computed_field
+
+from ._metrics._latency_histogram import LatencyHistogram
+
+
+class ConcurrencyLevelOutput(BaseModel):
+    concurrency: int
+    num_requests: int = 0
+    num_errors: int = 0
+    elapsed: float | None = None
+    latencies: list[float] = []
+    mean_rating: float | None = None
+
+    @computed_field
+    @property
+    def throughput(self) -> float | None:
+        if not self.elapsed:
+            return None
+        return len(self.latencies) / self.elapsed
+
+    @computed_field
+    @property
+    def error_rate(self) -> float | None:
+        if not self.num_requests:
+            return None
+        return self.num_errors / self.num_requests
+
+    @computed_field
+    @property
+    def latency(self) -> dict[str, float] | None:
+        histogram = LatencyHistogram()
+        histogram.add_many(self.latencies)
+        return histogram.summary()
+
+
+class ConcurrencySweepOutput(BaseModel):
+    date: str
+    agent_name: str
+    knee_threshold: float
+    levels: list[ConcurrencyLevelOutput]
+
+    @computed_field
+    @property
+    def knee_concurrency(self) -> int | None:
+        """
+        Lowest concurrency level after which doubling (or otherwise increasing) the
+        concurrency improves throughput by less than knee_threshold (relative).
+        None if throughput kept improving over all the levels tested.
+        """
+        levels = sorted(self.levels, key=lambda level: level.concurrency)
+        for previous, current in zip(levels, levels[1:]):
+            if not previous.throughput:
+                continue
+            gain = ((current.throughput or 0.0) - previous.throughput) / (
+                previous.throughput
+            )
+            if gain < self.knee_threshold:
+                return previous.concurrency
+        return None
@@ -11,6 +11,9 @@ class CriteriaEvaluator(ABC):
     async def evaluate(self, criteria: str, test_text: str) -> Evaluation:
         raise NotImplementedError()
 
+    async def prewarm(self, connections: int) -> None:
+        """Opens connections to the judges' endpoints ahead of the first cases"""
+
     @property
     def name(self) -> str:
         return self.__class__.__name__
@@ -0,0 +1,7 @@
+# Copyright 2024 Recursive AI
+
+# Defaults shared by the runners
+
+MAX_CONCURRENT_CASES = 1000
+
+DEFAULT_RESULTS_FOLDER = "benchmark/results/"
@@ -2,7 +2,6 @@
 
 from typing import Any, Optional
 
-import numpy as np
 from pydantic import BaseModel, computed_field, model_validator
 from typing_extensions import Self
 
@@ -24,7 +23,7 @@ class Evaluation(BaseModel):
         valid_ratings = list(filter(None, self.ratings))
         if not valid_ratings:
             return None
-        return round(np.mean(valid_ratings))
+        return round(sum(valid_ratings) / len(valid_ratings))
 
     @model_validator(mode="after")
     def check_ratings_within_bounds(self) -> Self:
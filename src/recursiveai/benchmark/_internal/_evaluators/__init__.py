@@ -1,100 +1,94 @@
 # Copyright 2024 Recursive AI
 
+from typing import Callable
+
 from .._benchmark_evaluator import BenchmarkEvaluator
 from .._criteria_evaluator import CriteriaEvaluator
-from .._llm._anthropic_claude_model import (
-    CLAUDE_3_5_SONNET,
-    CLAUDE_3_HAIKU,
-    CLAUDE_3_OPUS,
-)
-from .._llm._azure_openai_gpt_model import AZURE_GPT
-from .._llm._google_gemini_model import (
-    GEMINI_1_5_FLASH,
-    GEMINI_1_5_PRO,
-    GEMINI_2_0_FLASH,
-)
-from .._llm._openai_gpt_model import (
-    GPT_3_5_TURBO,
-    GPT_4_1,
-    GPT_4_1_MINI,
-    GPT_4_1_NANO,
-    GPT_4_O,
-    GPT_4_O_MINI,
-    GPT_4_TURBO_PREVIEW,
-)
+from .._llm._registry import get_model
 from ._happy import HappyEvaluator
 from ._llm_criteria_judge import LLMCriteriaJudgeEvaluator
 from ._llm_criteria_jury import LLMCriteriaJuryEvaluator
 from ._llm_judge import LLMJudgeEvaluator
 from ._llm_jury import LLMJuryEvaluator
 from ._regex_match import RegexMatchEvaluator
+from ._registry import EvaluatorRegistry
 from ._strict_match import StrictMatchEvaluator
 
+EVALUATORS = EvaluatorRegistry[BenchmarkEvaluator](
+    entry_point_group="flow_benchmark_tools.evaluators"
+)
+CRITERIA_EVALUATORS = EvaluatorRegistry[CriteriaEvaluator](
+    entry_point_group="flow_benchmark_tools.criteria_evaluators"
+)
+
 
 def get_evaluator(evaluator: str) -> BenchmarkEvaluator:
-    match (evaluator):
-        case "happy":
-            return HappyEvaluator()
-        case "llm_judge_gpt-3.5-turbo":
-            return LLMJudgeEvaluator(model=GPT_3_5_TURBO)
-        case "llm_judge_gpt-4-turbo-preview":
-            return LLMJudgeEvaluator(model=GPT_4_TURBO_PREVIEW)
-        case "llm_judge_gpt-4o":
-            return LLMJudgeEvaluator(model=GPT_4_O)
-        case "llm_judge_gpt-4.1":
-            return LLMJudgeEvaluator(model=GPT_4_1)
-        case "llm_judge_gpt-4.1-mini":
-            return LLMJudgeEvaluator(model=GPT_4_1_MINI)
-        case "llm_judge_gpt-4.1-nano":
-            return LLMJudgeEvaluator(model=GPT_4_1_NANO)
-        case "llm_judge_claude-3-opus":
-            return LLMJudgeEvaluator(model=CLAUDE_3_OPUS)
-        case "llm_judge_claude-3-5-sonnet":
-            return LLMJudgeEvaluator(model=CLAUDE_3_5_SONNET)
-        case "llm_judge_claude-3-haiku":
-            return LLMJudgeEvaluator(model=CLAUDE_3_HAIKU)
-        case "llm_judge_gemini-1.5-flash":
-            return LLMJudgeEvaluator(model=GEMINI_1_5_FLASH)
-        case "llm_judge_gemini-1.5-pro":
-            return LLMJudgeEvaluator(model=GEMINI_1_5_PRO)
-        case "llm_judge_gemini-2.0-flash":
-            return LLMJudgeEvaluator(model=GEMINI_2_0_FLASH)
-        case "llm_judge_azure-gpt":
-            return LLMJudgeEvaluator(model=AZURE_GPT)
-        case "llm_jury_gpt-4.1-variants":
-            return LLMJuryEvaluator(judge_models=[GPT_4_1, GPT_4_1_MINI, GPT_4_1_NANO])
-        case "llm_jury_gpt_claude_gemini_high":
-            return LLMJuryEvaluator(
-                judge_models=[GPT_4_O, CLAUDE_3_5_SONNET, GEMINI_1_5_PRO]
-            )
-        case "llm_jury_gpt_claude_gemini_low":
-            return LLMJuryEvaluator(
-                judge_models=[GPT_3_5_TURBO, CLAUDE_3_HAIKU, GEMINI_1_5_FLASH]
-            )
-
-        case "strict_match":
-            return StrictMatchEvaluator()
-        case "regex_match":
-            return RegexMatchEvaluator()
-        case _:
-            return LLMJudgeEvaluator(model=GPT_4_O)
+    return EVALUATORS.create(evaluator)
 
 
 def get_criteria_evaluator(evaluator: str) -> CriteriaEvaluator:
-    match (evaluator):
-        case "llm_criteria_judge_gpt-4o":
-            return LLMCriteriaJudgeEvaluator(model=GPT_4_O)
-        case "llm_criteria_judge_gpt-4o-mini":
-            return LLMCriteriaJudgeEvaluator(model=GPT_4_O_MINI)
-        case "llm_criteria_jury_gpt_claude_gemini_high":
-            return LLMCriteriaJuryEvaluator(
-                judge_models=[GPT_4_O, CLAUDE_3_5_SONNET, GEMINI_1_5_PRO]
-            )
-        case "llm_criteria_jury_gpt_claude_gemini_low":
-            return LLMCriteriaJuryEvaluator(
-                judge_models=[GPT_3_5_TURBO, CLAUDE_3_HAIKU, GEMINI_1_5_FLASH]
-            )
-        case "llm_criteria_jury_gpt_gemini_high":
-            return LLMCriteriaJuryEvaluator(judge_models=[GPT_4_O, GEMINI_1_5_PRO])
-        case _:
-            return LLMCriteriaJudgeEvaluator(model=GPT_4_O)
+    return CRITERIA_EVALUATORS.create(evaluator)
+
+
+def _judge(model: str) -> Callable[[], BenchmarkEvaluator]:
+    return lambda: LLMJudgeEvaluator(model=get_model(model))
+
+
+def _jury(*models: str) -> Callable[[], BenchmarkEvaluator]:
+    return lambda: LLMJuryEvaluator(judge_models=[get_model(m) for m in models])
+
+
+def _criteria_judge(model: str) -> Callable[[], CriteriaEvaluator]:
+    return lambda: LLMCriteriaJudgeEvaluator(model=get_model(model))
+
+
+def _criteria_jury(*models: str) -> Callable[[], CriteriaEvaluator]:
+    return lambda: LLMCriteriaJuryEvaluator(judge_models=[get_model(m) for m in models])
+
+
+# Local evaluators hold no clients, a fresh instance is as good as a shared one
+EVALUATORS.register("happy", HappyEvaluator, cached=False)
+EVALUATORS.register("strict_match", StrictMatchEvaluator, cached=False)
+EVALUATORS.register("regex_match", RegexMatchEvaluator, cached=False)
+
+EVALUATORS.register("llm_judge_gpt-3.5-turbo", _judge("GPT_3_5_TURBO"))
+EVALUATORS.register("llm_judge_gpt-4-turbo-preview", _judge("GPT_4_TURBO_PREVIEW"))
+EVALUATORS.register("llm_judge_gpt-4o", _judge("GPT_4_O"))
+EVALUATORS.register("llm_judge_gpt-4.1", _judge("GPT_4_1"))
+EVALUATORS.register("llm_judge_gpt-4.1-mini", _judge("GPT_4_1_MINI"))
+EVALUATORS.register("llm_judge_gpt-4.1-nano", _judge("GPT_4_1_NANO"))
+EVALUATORS.register("llm_judge_claude-3-opus", _judge("CLAUDE_3_OPUS"))
+EVALUATORS.register("llm_judge_claude-3-5-sonnet", _judge("CLAUDE_3_5_SONNET"))
+EVALUATORS.register("llm_judge_claude-3-haiku", _judge("CLAUDE_3_HAIKU"))
+EVALUATORS.register("llm_judge_gemini-1.5-flash", _judge("GEMINI_1_5_FLASH"))
+EVALUATORS.register("llm_judge_gemini-1.5-pro", _judge("GEMINI_1_5_PRO"))
+EVALUATORS.register("llm_judge_gemini-2.0-flash", _judge("GEMINI_2_0_FLASH"))
+EVALUATORS.register("llm_judge_azure-gpt", _judge("AZURE_GPT"))
+
+EVALUATORS.register(
+    "llm_jury_gpt-4.1-variants", _jury("GPT_4_1", "GPT_4_1_MINI", "GPT_4_1_NANO")
+)
+EVALUATORS.register(
+    "llm_jury_gpt_claude_gemini_high",
+    _jury("GPT_4_O", "CLAUDE_3_5_SONNET", "GEMINI_1_5_PRO"),
+)
+EVALUATORS.register(
+    "llm_jury_gpt_claude_gemini_low",
+    _jury("GPT_3_5_TURBO", "CLAUDE_3_HAIKU", "GEMINI_1_5_FLASH"),
+)
+
+CRITERIA_EVALUATORS.register("llm_criteria_judge_gpt-4o", _criteria_judge("GPT_4_O"))
+CRITERIA_EVALUATORS.register(
+    "llm_criteria_judge_gpt-4o-mini", _criteria_judge("GPT_4_O_MINI")
+)
+CRITERIA_EVALUATORS.register(
+    "llm_criteria_jury_gpt_claude_gemini_high",
+    _criteria_jury("GPT_4_O", "CLAUDE_3_5_SONNET", "GEMINI_1_5_PRO"),
+)
+CRITERIA_EVALUATORS.register(
+    "llm_criteria_jury_gpt_claude_gemini_low",
+    _criteria_jury("GPT_3_5_TURBO", "CLAUDE_3_HAIKU", "GEMINI_1_5_FLASH"),
+)
+CRITERIA_EVALUATORS.register(
+    "llm_criteria_jury_gpt_gemini_high", _criteria_jury("GPT_4_O", "GEMINI_1_5_PRO")
+)
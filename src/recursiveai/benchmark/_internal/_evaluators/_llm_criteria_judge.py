@@ -42,6 +42,9 @@ class LLMCriteriaJudgeEvaluator(CriteriaEvaluator):
     def llm_model(self) -> str:
         return self._model.name
 
+    async def prewarm(self, connections: int) -> None:
+        await self._model.prewarm(connections)
+
     async def evaluate(self, criteria: str, test_text: str) -> Evaluation:
 
         user_prompt = _CRITERIA_JUDGE_USER_PROMPT.format(
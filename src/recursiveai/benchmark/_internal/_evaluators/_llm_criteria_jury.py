@@ -23,6 +23,9 @@ class LLMCriteriaJuryEvaluator(CriteriaEvaluator):
     def llm_models(self) -> str:
         return ",".join([judge.llm_model for judge in self._judges])
 
+    async def prewarm(self, connections: int) -> None:
+        await asyncio.gather(*[judge.prewarm(connections) for judge in self._judges])
+
     async def evaluate(self, criteria: str, test_text: str) -> Evaluation:
         evals = await asyncio.gather(
             *[
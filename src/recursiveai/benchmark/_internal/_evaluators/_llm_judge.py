@@ -48,6 +48,9 @@ class LLMJudgeEvaluator(BenchmarkEvaluator):
     def llm_model(self) -> str:
         return self._model.name
 
+    async def prewarm(self, connections: int) -> None:
+        await self._model.prewarm(connections)
+
     async def evaluate(
         self, query: str, reference_answer: str, test_answer: str
     ) -> Evaluation:
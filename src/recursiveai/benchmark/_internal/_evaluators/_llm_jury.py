@@ -18,6 +18,9 @@ class LLMJuryEvaluator(BenchmarkEvaluator):
     def llm_models(self) -> str:
         return ",".join([judge.llm_model for judge in self._judges])
 
+    async def prewarm(self, connections: int) -> None:
+        await asyncio.gather(*[judge.prewarm(connections) for judge in self._judges])
+
     async def evaluate(
         self, query: str, reference_answer: str, test_answer: str
     ) -> Evaluation:
@@ -0,0 +1,98 @@
+# Copyright 2024 Recursive AI
+
+import logging
+from enum import Enum
+from importlib.metadata import EntryPoint, entry_points
+from typing import Callable, Generic, TypeVar
+
+_logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class EvaluatorRegistry(Generic[T]):
+    """
+    Evaluator factories by name.
+
+    Evaluators are built on first use and, unless registered with cached=False,
+    the same instance is returned from then on, so runs share the evaluators and
+    the model clients and connection pools behind them. Factories can also be
+    provided by installed packages through the entry_point_group entry points,
+    which are only looked up for names that are not registered.
+    """
+
+    def __init__(self, entry_point_group: str) -> None:
+        self._entry_point_group = entry_point_group
+        self._factories: dict[str, tuple[Callable[[], T], bool]] = {}
+        self._instances: dict[str, T] = {}
+        self._discovered = False
+
+    def register(
+        self,
+        name: str,
+        factory: Callable[[], T],
+        cached: bool = True,
+        replace: bool = False,
+    ) -> None:
+        name = _name(name)
+        if name in self._factories and not replace:
+            raise ValueError(f"Evaluator {name} is already registered")
+        self._factories[name] = (factory, cached)
+        self._instances.pop(name, None)
+
+    def unregister(self, name: str) -> None:
+        name = _name(name)
+        self._factories.pop(name, None)
+        self._instances.pop(name, None)
+
+    def create(self, name: str) -> T:
+        name = _name(name)
+        if name in self._instances:
+            return self._instances[name]
+        if name not in self._factories:
+            self._discover()
+        if name not in self._factories:
+            raise ValueError(
+                f"Unknown evaluator {name}, expected one of: {', '.join(self.names())}"
+            )
+        factory, cached = self._factories[name]
+        evaluator = factory()
+        if cached:
+            self._instances[name] = evaluator
+        return evaluator
+
+    def names(self) -> list[str]:
+        self._discover()
+        return sorted(self._factories)
+
+    def clear_cache(self) -> None:
+        self._instances.clear()
+
+    def _discover(self) -> None:
+        if self._discovered:
+            return
+        self._discovered = True
+        for entry_point in entry_points(group=self._entry_point_group):
+            if entry_point.name in self._factories:
+                _logger.warning(
+                    "Ignoring entry point %s, evaluator %s is already registered",
+                    entry_point.value,
+                    entry_point.name,
+                )
+                continue
+            self._factories[entry_point.name] = (
+                _entry_point_factory(entry_point),
+                True,
+            )
+
+
+def _entry_point_factory(entry_point: EntryPoint) -> Callable[[], T]:
+    def factory() -> T:
+        return entry_point.load()()
+
+    return factory
+
+
+def _name(name: str) -> str:
+    # Enum members of str enums hash by member name, not by value
+    return name.value if isinstance(name, Enum) else name
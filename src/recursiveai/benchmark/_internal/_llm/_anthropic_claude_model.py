@@ -3,6 +3,7 @@
 import logging
 from functools import cached_property
 
+import anthropic
 from anthropic import (
     APITimeoutError,
     AsyncAnthropic,
@@ -14,15 +15,24 @@ from anthropic.types.message_create_params import MessageCreateParamsNonStreamin
 
 from .._util import async_retry
 from ._llm_model import ChatMessage, LLMModel
+from ._transport import prewarm_connections, shared_http_client
 
 _logger = logging.getLogger(__name__)
 
 
 class AnthropicClaude(LLMModel):
+    _endpoint = "anthropic"
 
     @cached_property
     def _client(self) -> AsyncAnthropic:
-        return AsyncAnthropic()
+        return AsyncAnthropic(http_client=shared_http_client(self._endpoint, anthropic))
+
+    async def prewarm(self, connections: int) -> None:
+        await prewarm_connections(
+            http_client=shared_http_client(self._endpoint, anthropic),
+            url=str(self._client.base_url),
+            connections=connections,
+        )
 
     async def async_chat_completion(
         self,
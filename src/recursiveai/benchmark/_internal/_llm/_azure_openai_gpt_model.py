@@ -2,15 +2,19 @@
 import os
 from functools import cached_property
 
+import openai
 from openai import AsyncAzureOpenAI
 
 from ._llm_model import ChatMessage
 from ._openai_gpt_model import GPTX
+from ._transport import shared_http_client
 
 _DEFAULT_OPENAI_API_VERSION = "2024-06-01"
 
 
 class AzureGPTX(GPTX):
+    _endpoint = "azure_openai"
+
     def __init__(self):
         deployment = os.getenv("AZURE_OPENAI_DEPLOYMENT")
         if not deployment:
@@ -25,7 +29,9 @@ class AzureGPTX(GPTX):
     @cached_property
     def _client(self) -> AsyncAzureOpenAI:
         return AsyncAzureOpenAI(
-            azure_deployment=self.name, api_version=self._api_version
+            azure_deployment=self.name,
+            api_version=self._api_version,
+            http_client=shared_http_client(self._endpoint, openai),
         )
 
     async def async_chat_completion(
@@ -1,6 +1,7 @@
 # Copyright 2024 Recursive AI
 
 import logging
+from functools import cached_property
 from typing import Optional
 
 from google.api_core.exceptions import (
@@ -24,20 +25,40 @@ from ._llm_model import ChatMessage, LLMModel
 _logger = logging.getLogger(__name__)
 
 
+_SAFETY_SETTINGS = {
+    HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
+    HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
+    HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
+    HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
+}
+
+# Judges use a fixed system prompt, so only a handful of clients are ever built
+_MAX_CACHED_CLIENTS = 16
+
+
 class GoogleGemini(LLMModel):
 
+    @cached_property
+    def _clients(self) -> dict[str | None, GenerativeModel]:
+        return {}
+
     def _client(self, system_prompt: Optional[str] = None) -> GenerativeModel:
-        safety_settings = {
-            HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_NONE,
-            HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_NONE,
-            HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_NONE,
-            HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
-        }
-        return GenerativeModel(
-            model_name=self._name,
-            safety_settings=safety_settings,
-            system_instruction=system_prompt,
-        )
+        """
+        Client for the given system prompt, built once and reused by later requests
+        and retries. All of them share the SDK's default async transport.
+        """
+        client = self._clients.get(system_prompt)
+        if client is None:
+            if len(self._clients) >= _MAX_CACHED_CLIENTS:
+                # Evict the oldest client
+                del self._clients[next(iter(self._clients))]
+            client = GenerativeModel(
+                model_name=self._name,
+                safety_settings=_SAFETY_SETTINGS,
+                system_instruction=system_prompt,
+            )
+            self._clients[system_prompt] = client
+        return client
 
     async def async_chat_completion(
         self,
@@ -43,3 +43,6 @@ class LLMModel(ABC):
         **kwargs,
     ) -> str | None:
         raise NotImplementedError()
+
+    async def prewarm(self, connections: int) -> None:
+        """Opens connections to the model's endpoint ahead of the first requests"""
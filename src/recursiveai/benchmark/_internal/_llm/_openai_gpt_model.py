@@ -3,6 +3,7 @@
 import logging
 from functools import cached_property
 
+import openai
 from openai import APITimeoutError, AsyncOpenAI, InternalServerError, RateLimitError
 from openai.types.chat import ChatCompletion
 from openai.types.chat.completion_create_params import (
@@ -11,15 +12,24 @@ from openai.types.chat.completion_create_params import (
 
 from .._util import async_retry
 from ._llm_model import ChatMessage, LLMModel
+from ._transport import prewarm_connections, shared_http_client
 
 _logger = logging.getLogger(__name__)
 
 
 class GPTX(LLMModel):
+    _endpoint = "openai"
 
     @cached_property
     def _client(self) -> AsyncOpenAI:
-        return AsyncOpenAI()
+        return AsyncOpenAI(http_client=shared_http_client(self._endpoint, openai))
+
+    async def prewarm(self, connections: int) -> None:
+        await prewarm_connections(
+            http_client=shared_http_client(self._endpoint, openai),
+            url=str(self._client.base_url),
+            connections=connections,
+        )
 
     async def async_chat_completion(
         self,
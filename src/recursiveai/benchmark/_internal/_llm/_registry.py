@@ -0,0 +1,35 @@
+# Copyright 2024 Recursive AI
+
+import importlib
+
+from ._llm_model import LLMModel
+
+# Model constant -> provider module defining it. Provider modules import their SDK
+# (and the Azure model reads its environment) when first imported, so they are
+# only imported once one of their models is requested.
+_MODEL_MODULES = {
+    "GPT_3_5_TURBO": "_openai_gpt_model",
+    "GPT_4_TURBO_PREVIEW": "_openai_gpt_model",
+    "GPT_4_O": "_openai_gpt_model",
+    "GPT_4_O_MINI": "_openai_gpt_model",
+    "GPT_4_1": "_openai_gpt_model",
+    "GPT_4_1_MINI": "_openai_gpt_model",
+    "GPT_4_1_NANO": "_openai_gpt_model",
+    "CLAUDE_3_OPUS": "_anthropic_claude_model",
+    "CLAUDE_3_SONNET": "_anthropic_claude_model",
+    "CLAUDE_3_5_SONNET": "_anthropic_claude_model",
+    "CLAUDE_3_HAIKU": "_anthropic_claude_model",
+    "GEMINI_1_5_FLASH": "_google_gemini_model",
+    "GEMINI_1_5_PRO": "_google_gemini_model",
+    "GEMINI_2_0_FLASH": "_google_gemini_model",
+    "AZURE_GPT": "_azure_openai_gpt_model",
+}
+
+
+def get_model(name: str) -> LLMModel:
+    """Returns the model constant of the given name, importing its provider"""
+    try:
+        module = _MODEL_MODULES[name]
+    except KeyError as e:
+        raise ValueError(f"Unknown model: {name}") from e
+    return getattr(importlib.import_module(f".{module}", __package__), name)
@@ -0,0 +1,99 @@
+# Copyright 2024 Recursive AI
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from types import ModuleType
+from typing import Any
+
+_logger = logging.getLogger(__name__)
+
+_DEFAULT_MAX_CONNECTIONS = 100
+_DEFAULT_KEEPALIVE_EXPIRY = 30.0
+
+
+@dataclass
+class TransportConfig:
+    """
+    Connection pool settings of the shared HTTP clients. max_keepalive_connections
+    defaults to max_connections, so a pool sized for the run's concurrency keeps
+    all its connections open between requests.
+    """
+
+    max_connections: int = _DEFAULT_MAX_CONNECTIONS
+    max_keepalive_connections: int | None = None
+    keepalive_expiry: float = _DEFAULT_KEEPALIVE_EXPIRY
+    http2: bool = False
+
+
+_config = TransportConfig()
+_http_clients: dict[str, Any] = {}
+
+
+def configure_transport(config: TransportConfig) -> None:
+    """
+    Sets the settings of the connection pools created from now on, for the whole
+    process. Pools already created, and the SDK clients using them, keep their
+    settings, so this is best called before the first request.
+    """
+    global _config
+    if _http_clients and config != _config:
+        _logger.warning(
+            "Connection pools already created for %s keep their settings",
+            ", ".join(sorted(_http_clients)),
+        )
+    _config = config
+
+
+def transport_config() -> TransportConfig:
+    return _config
+
+
+def shared_http_client(endpoint: str, sdk: ModuleType) -> Any:
+    """
+    HTTP client whose connection pool is shared by every client of the endpoint
+    (e.g. "openai", "anthropic"), to pass as the http_client of the SDK's clients.
+
+    sdk is the provider's SDK module (e.g. openai), whose DefaultAsyncHttpxClient
+    is used, as SDKs may rely on their own copy of httpx.
+    """
+    client = _http_clients.get(endpoint)
+    if client is None or client.is_closed:
+        if _config.http2:
+            try:
+                import h2  # noqa: F401 pylint: disable=unused-import
+            except ImportError as e:
+                raise ImportError(
+                    "HTTP/2 requires h2, install flow-benchmark-tools[http2]"
+                ) from e
+        max_keepalive_connections = _config.max_keepalive_connections
+        if max_keepalive_connections is None:
+            max_keepalive_connections = _config.max_connections
+        # The limits must be of the SDK's own httpx
+        limits = type(sdk.DEFAULT_CONNECTION_LIMITS)(
+            max_connections=_config.max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=_config.keepalive_expiry,
+        )
+        client = sdk.DefaultAsyncHttpxClient(limits=limits, http2=_config.http2)
+        _http_clients[endpoint] = client
+    return client
+
+
+async def prewarm_connections(http_client: Any, url: str, connections: int) -> int:
+    """
+    Opens up to `connections` connections to url in the pool of http_client, so
+    the first requests of a run don't pay for the TCP and TLS handshakes. A single
+    connection is enough with HTTP/2. Returns the number of connections opened.
+    """
+    if _config.http2:
+        connections = 1
+    connections = min(connections, _config.max_connections)
+    # Concurrent requests can't share an HTTP/1.1 connection, so each of them
+    # opens one, which then stays in the pool
+    responses = await asyncio.gather(
+        *[http_client.head(url) for _ in range(connections)], return_exceptions=True
+    )
+    opened = sum(1 for response in responses if not isinstance(response, BaseException))
+    _logger.info("Pre-warmed %s connections to %s", opened, url)
+    return opened
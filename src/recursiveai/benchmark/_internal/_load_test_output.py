@@ -0,0 +1,58 @@
+# Copyright 2024 Recursive AI
+
+from pydantic import BaseModel, computed_field
+
+from ._metrics._latency_histogram import LatencyHistogram
+
+
+class LoadStepOutput(BaseModel):
+    target_qps: float
+    duration: float
+    arrival_process: str
+    num_requests: int = 0
+    num_errors: int = 0
+    elapsed: float | None = None
+    latencies: list[float] = []
+    queue_delays: list[float] = []
+
+    @computed_field
+    @property
+    def offered_qps(self) -> float | None:
+        if not self.duration:
+            return None
+        return self.num_requests / self.duration
+
+    @computed_field
+    @property
+    def achieved_throughput(self) -> float | None:
+        """Successfully completed requests per second, including the drain time"""
+        if not self.elapsed:
+            return None
+        return len(self.latencies) / self.elapsed
+
+    @computed_field
+    @property
+    def error_rate(self) -> float | None:
+        if not self.num_requests:
+            return None
+        return self.num_errors / self.num_requests
+
+    @computed_field
+    @property
+    def latency(self) -> dict[str, float] | None:
+        histogram = LatencyHistogram()
+        histogram.add_many(self.latencies)
+        return histogram.summary()
+
+    @computed_field
+    @property
+    def queue_delay(self) -> dict[str, float] | None:
+        histogram = LatencyHistogram()
+        histogram.add_many(self.queue_delays)
+        return histogram.summary()
+
+
+class LoadTestOutput(BaseModel):
+    date: str
+    agent_name: str
+    steps: list[LoadStepOutput]
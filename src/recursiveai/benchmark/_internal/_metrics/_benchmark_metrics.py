@@ -6,16 +6,24 @@ import numpy as np
 from pydantic import BaseModel, Field, computed_field
 
 from .._evaluation import Evaluation
+from .._repeat_timing import RepeatTiming
 
 
 class BenchmarkMetrics(BaseModel):
     evals: list[Evaluation | None] = Field(exclude=True)
+    runtimes: list[float] = Field(default_factory=list, exclude=True)
+    timings: list[RepeatTiming] = Field(default_factory=list, exclude=True)
 
     @computed_field
     @property
     def num_evals(self) -> int:
         return len(self.evals)
 
+    @cached_property
+    def ratings(self) -> list[int | None]:
+        """Rating of each repeat, None when invalid"""
+        return [eval.rating if eval is not None else None for eval in self.evals]
+
     @computed_field
     @property
     def num_valid_ratings(self) -> int:
@@ -24,15 +32,15 @@ class BenchmarkMetrics(BaseModel):
     @computed_field
     @cached_property
     def valid_ratings(self) -> list[int]:
-        valid_evals = list(filter(None, self.evals))
-        return [eval.rating for eval in valid_evals if eval.rating is not None]
+        return [rating for rating in self.ratings if rating is not None]
 
     @computed_field
     @property
     def mean_rating(self) -> float | None:
         if not self.valid_ratings:
             return None
-        return np.mean(self.valid_ratings)
+        # Plain Python is much faster than NumPy over a handful of repeats
+        return sum(self.valid_ratings) / len(self.valid_ratings)
 
     @computed_field
     @property
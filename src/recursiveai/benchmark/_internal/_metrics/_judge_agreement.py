@@ -0,0 +1,149 @@
+# Copyright 2024 Recursive AI
+
+from typing import Sequence
+
+import numpy as np
+from pydantic import BaseModel
+
+from .._evaluation import Evaluation
+
+
+class JudgeAgreement(BaseModel):
+    """
+    Agreement between the judges of a jury over all the evaluations of a run.
+
+    pairwise_correlation[i][j] is the Pearson correlation of judges i and j over the
+    evaluations both rated, judge_bias[i] the mean deviation of judge i from the
+    mean rating of the jury. Fleiss' kappa is computed on binned ratings over the
+    evaluations every judge rated, Krippendorff's alpha (interval metric) uses every
+    evaluation with at least two ratings.
+    """
+
+    judges: list[str]
+    num_evaluations: int
+    pairwise_correlation: list[list[float | None]]
+    judge_bias: list[float | None]
+    fleiss_kappa: float | None = None
+    krippendorff_alpha: float | None = None
+
+
+def judge_ratings_matrix(
+    evaluations: Sequence[Evaluation | None],
+) -> tuple[np.ndarray, list[str]] | None:
+    """
+    Ratings of the jury evaluations (more than one rating) as an evaluations x
+    judges array, NaN for missing ratings, with the judge names. None when there is
+    no jury evaluation. Judges are matched by position, and named after the models
+    listed in the evaluator when possible.
+    """
+    jury_evals = [
+        evaluation
+        for evaluation in evaluations
+        if evaluation is not None and len(evaluation.ratings) > 1
+    ]
+    if not jury_evals:
+        return None
+    num_judges = max(len(evaluation.ratings) for evaluation in jury_evals)
+    matrix = np.full((len(jury_evals), num_judges), np.nan)
+    for row, evaluation in enumerate(jury_evals):
+        # Ratings of 0 are treated as missing, as in Evaluation.rating
+        matrix[row, : len(evaluation.ratings)] = [
+            rating if rating else np.nan for rating in evaluation.ratings
+        ]
+    return matrix, judge_names(jury_evals[0].evaluator, num_judges)
+
+
+def judge_names(evaluator: str, num_judges: int) -> list[str]:
+    _, _, models = evaluator.partition(" ")
+    names = models.split(",") if models else []
+    if len(names) != num_judges:
+        return [f"judge_{idx}" for idx in range(num_judges)]
+    return names
+
+
+def judge_agreement(
+    ratings: np.ndarray, judges: list[str], bins: Sequence[float]
+) -> JudgeAgreement:
+    valid = ~np.isnan(ratings)
+    rated = valid.sum(axis=1) >= 2
+    return JudgeAgreement(
+        judges=judges,
+        num_evaluations=int(rated.sum()),
+        pairwise_correlation=_nan_to_none(pairwise_correlation(ratings)).tolist(),
+        judge_bias=_nan_to_none(judge_bias(ratings)).tolist(),
+        fleiss_kappa=_float_or_none(fleiss_kappa(ratings, bins)),
+        krippendorff_alpha=_float_or_none(krippendorff_alpha(ratings)),
+    )
+
+
+def pairwise_correlation(ratings: np.ndarray) -> np.ndarray:
+    """Judges x judges Pearson correlations over pairwise complete evaluations"""
+    valid = (~np.isnan(ratings)).astype(float)
+    values = np.where(valid > 0, ratings, 0.0)
+    counts = valid.T @ valid
+    sums = values.T @ valid  # sums[i, j]: sum of judge i over the items j rated too
+    squares = (values**2).T @ valid
+    products = values.T @ values
+    with np.errstate(invalid="ignore", divide="ignore"):
+        covariance = counts * products - sums * sums.T
+        variance = counts * squares - sums**2
+        correlation = covariance / np.sqrt(variance * variance.T)
+    correlation[counts < 2] = np.nan
+    return correlation
+
+
+def judge_bias(ratings: np.ndarray) -> np.ndarray:
+    """Mean deviation of each judge from the jury mean, over items with 2+ ratings"""
+    rated = (~np.isnan(ratings)).sum(axis=1) >= 2
+    ratings = ratings[rated]
+    if not ratings.size:
+        return np.full(ratings.shape[1], np.nan)
+    deviations = ratings - np.nanmean(ratings, axis=1, keepdims=True)
+    valid = ~np.isnan(deviations)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(valid, deviations, 0.0).sum(axis=0) / valid.sum(axis=0)
+
+
+def fleiss_kappa(ratings: np.ndarray, bins: Sequence[float]) -> float | None:
+    """Fleiss' kappa of the ratings binned by bins, over the fully rated items"""
+    complete = ratings[~np.isnan(ratings).any(axis=1)]
+    num_items, num_judges = complete.shape
+    if num_items == 0 or num_judges < 2:
+        return None
+    categories = np.clip(np.digitize(complete, bins[1:-1]), 0, len(bins) - 2)
+    counts = np.stack(
+        [(categories == category).sum(axis=1) for category in range(len(bins) - 1)],
+        axis=1,
+    )
+    observed = ((counts**2).sum(axis=1) - num_judges) / (num_judges * (num_judges - 1))
+    proportions = counts.sum(axis=0) / (num_items * num_judges)
+    expected = float((proportions**2).sum())
+    if expected == 1.0:
+        return None
+    return (float(observed.mean()) - expected) / (1.0 - expected)
+
+
+def krippendorff_alpha(ratings: np.ndarray) -> float | None:
+    """Krippendorff's alpha with the interval metric, allowing missing ratings"""
+    valid = ~np.isnan(ratings)
+    pairable = valid.sum(axis=1) >= 2
+    values = np.where(valid, ratings, 0.0)[pairable]
+    counts = valid[pairable].sum(axis=1)
+    total = counts.sum()
+    if total < 2:
+        return None
+    # Sums of squared differences over ordered pairs, within items and overall
+    sums, squares = values.sum(axis=1), (values**2).sum(axis=1)
+    within = (2 * (counts * squares - sums**2) / (counts - 1)).sum() / total
+    overall = 2 * (total * squares.sum() - sums.sum() ** 2) / (total * (total - 1))
+    if overall == 0:
+        return None
+    return float(1.0 - within / overall)
+
+
+def _nan_to_none(array: np.ndarray) -> np.ndarray:
+    return np.where(np.isnan(array), None, array).astype(object)
+
+
+def _float_or_none(value: float | None) -> float | None:
+    return None if value is None or np.isnan(value) else float(value)
@@ -0,0 +1,108 @@
+# Copyright 2024 Recursive AI
+
+import math
+from typing import Iterable
+
+import numpy as np
+from pydantic import BaseModel, Field
+
+_MIN_TRACKED_LATENCY = 1e-9
+
+
+class LatencyHistogram(BaseModel):
+    """
+    Mergeable histogram of latencies (in seconds) with logarithmically sized bins.
+
+    Bin boundaries grow geometrically, so quantile estimates stay within
+    `relative_accuracy` of the true value over any latency range, while the memory
+    footprint only grows with the logarithm of the range. Histograms built for
+    different cases, runs or shards can be combined with `merge`.
+    """
+
+    relative_accuracy: float = 0.01
+    bins: dict[int, int] = Field(default_factory=dict)
+    zero_count: int = 0
+    count: int = 0
+    total: float = 0.0
+    min: float | None = None
+    max: float | None = None
+
+    @property
+    def _gamma(self) -> float:
+        return (1 + self.relative_accuracy) / (1 - self.relative_accuracy)
+
+    def add(self, value: float) -> None:
+        self.add_many([value])
+
+    def add_many(self, values: Iterable[float]) -> None:
+        if not isinstance(values, np.ndarray):
+            values = list(values)
+        array = np.asarray(values, dtype=float)
+        if not array.size:
+            return
+
+        positive = array[array > _MIN_TRACKED_LATENCY]
+        self.zero_count += int(array.size - positive.size)
+        if positive.size:
+            keys = np.ceil(np.log(positive) / math.log(self._gamma)).astype(int)
+            unique_keys, counts = np.unique(keys, return_counts=True)
+            for key, count in zip(unique_keys.tolist(), counts.tolist()):
+                self.bins[key] = self.bins.get(key, 0) + count
+
+        self.count += int(array.size)
+        self.total += float(array.sum())
+        array_min, array_max = float(array.min()), float(array.max())
+        self.min = array_min if self.min is None else min(self.min, array_min)
+        self.max = array_max if self.max is None else max(self.max, array_max)
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        if not math.isclose(self.relative_accuracy, other.relative_accuracy):
+            raise ValueError(
+                f"Cannot merge histograms with different relative accuracies ({self.relative_accuracy} != {other.relative_accuracy})"
+            )
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+        if other.max is not None:
+            self.max = other.max if self.max is None else max(self.max, other.max)
+
+    @property
+    def mean(self) -> float | None:
+        if not self.count:
+            return None
+        return self.total / self.count
+
+    def quantile(self, q: float) -> float | None:
+        if not self.count:
+            return None
+        if q < 0.0 or q > 1.0:
+            raise ValueError(f"Quantile q:{q} must be within [0, 1]")
+
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return self.min
+        cumulative = self.zero_count
+        for key in sorted(self.bins):
+            cumulative += self.bins[key]
+            if cumulative > rank:
+                value = 2 * self._gamma**key / (self._gamma + 1)
+                return float(np.clip(value, self.min, self.max))
+        return self.max
+
+    def summary(self) -> dict[str, float] | None:
+        if not self.count:
+            return None
+        return {
+            "min": self.min,
+            "p50": self.quantile(0.50),
+            "p90": self.quantile(0.90),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "max": self.max,
+            "mean": self.mean,
+            "total": self.total,
+        }
@@ -0,0 +1,215 @@
+# Copyright 2024 Recursive AI
+
+import math
+from typing import Sequence
+
+import numpy as np
+
+from .._repeat_timing import PHASES, STREAM_STATS, RepeatTiming
+from ._benchmark_metrics import BenchmarkMetrics
+
+COLUMNS = ["rating", "runtime", *PHASES, *STREAM_STATS]
+
+
+class RatingsStore:
+    """
+    Columnar store of the ratings, runtimes and timings of a run, with one NumPy
+    array per column indexed by case and repeat.
+
+    Missing values (invalid ratings, failed repeats, or repeats a case did not run)
+    are NaN, so run-level metrics are vectorized reductions over the arrays instead
+    of walks over every evaluation. Cases are appended as they finish, and the
+    arrays grow geometrically.
+    """
+
+    def __init__(self, num_cases: int = 0, num_repeats: int = 1) -> None:
+        shape = (max(num_cases, 1), max(num_repeats, 1))
+        self._columns = {name: np.full(shape, np.nan) for name in COLUMNS}
+        self._num_cases = 0
+        self._num_repeats = 0
+        self._case_ids: list[int] = []
+
+    @classmethod
+    def from_benchmark_metrics(
+        cls, benchmark_metrics: Sequence[BenchmarkMetrics]
+    ) -> "RatingsStore":
+        num_repeats = max(
+            (
+                max(len(bm_m.evals), len(bm_m.runtimes), len(bm_m.timings))
+                for bm_m in benchmark_metrics
+            ),
+            default=1,
+        )
+        store = cls.from_ratings(
+            [bm_m.ratings for bm_m in benchmark_metrics], num_repeats=num_repeats
+        )
+        if not benchmark_metrics:
+            return store
+        store._columns["runtime"] = _to_array(
+            [bm_m.runtimes for bm_m in benchmark_metrics], num_repeats
+        )
+        if any(bm_m.timings for bm_m in benchmark_metrics):
+            for name in [*PHASES, *STREAM_STATS]:
+                store._columns[name] = _to_array(
+                    [_timing_values(bm_m.timings, name) for bm_m in benchmark_metrics],
+                    num_repeats,
+                )
+        return store
+
+    @classmethod
+    def from_ratings(
+        cls,
+        ratings: Sequence[Sequence[float | None]],
+        num_repeats: int | None = None,
+    ) -> "RatingsStore":
+        """Store with only the ratings of each case, by default one row per case"""
+        if num_repeats is None:
+            num_repeats = max((len(row) for row in ratings), default=1)
+        store = cls(num_cases=len(ratings), num_repeats=num_repeats)
+        store._num_cases = len(ratings)
+        store._num_repeats = num_repeats
+        store._case_ids = list(range(len(ratings)))
+        if ratings:
+            # Padding in Python and converting each column at once is much faster
+            # than filling the arrays case by case
+            store._columns["rating"] = _to_array(
+                [_none_to_nan(row) for row in ratings], num_repeats
+            )
+        return store
+
+    def add_case(
+        self,
+        ratings: Sequence[float | None],
+        runtimes: Sequence[float] = (),
+        timings: Sequence[RepeatTiming] = (),
+        case_id: int | None = None,
+    ) -> int:
+        """Appends the repeats of a case, by default with its row as case_id"""
+        row = _case_row(ratings=ratings, runtimes=runtimes, timings=timings)
+        num_repeats = max(len(values) for values in row.values())
+        self._reserve(self._num_cases + 1, num_repeats)
+        for name, values in row.items():
+            self._columns[name][self._num_cases, : len(values)] = values
+        self._case_ids.append(self._num_cases if case_id is None else case_id)
+        self._num_cases += 1
+        self._num_repeats = max(self._num_repeats, num_repeats)
+        return self._num_cases - 1
+
+    @classmethod
+    def merge(cls, stores: Sequence["RatingsStore"]) -> "RatingsStore":
+        """Store with the cases of all the stores in turn, e.g. of a run's shards"""
+        stores = [store for store in stores if store.num_cases]
+        if not stores:
+            return cls()
+        num_repeats = max(store._num_repeats for store in stores)
+        merged = cls()
+        merged._columns = {
+            name: np.concatenate(
+                [_pad_repeats(store.column(name), num_repeats) for store in stores]
+            )
+            for name in COLUMNS
+        }
+        merged._num_cases = sum(store.num_cases for store in stores)
+        merged._num_repeats = num_repeats
+        merged._case_ids = [case_id for store in stores for case_id in store._case_ids]
+        return merged
+
+    def take(self, case_ids: Sequence[int]) -> "RatingsStore":
+        """New store with the rows of the given cases, in the order of case_ids"""
+        rows = {case_id: row for row, case_id in enumerate(self._case_ids)}
+        index = np.array([rows[case_id] for case_id in case_ids], dtype=int)
+        store = RatingsStore()
+        store._columns = {name: self.column(name)[index] for name in COLUMNS}
+        store._num_cases = len(index)
+        store._num_repeats = self._num_repeats
+        store._case_ids = list(case_ids)
+        return store
+
+    def _reserve(self, num_cases: int, num_repeats: int) -> None:
+        capacity_cases, capacity_repeats = self._columns["rating"].shape
+        if num_cases <= capacity_cases and num_repeats <= capacity_repeats:
+            return
+        shape = (_grow(capacity_cases, num_cases), _grow(capacity_repeats, num_repeats))
+        for name, column in self._columns.items():
+            grown = np.full(shape, np.nan)
+            grown[: column.shape[0], : column.shape[1]] = column
+            self._columns[name] = grown
+
+    @property
+    def num_cases(self) -> int:
+        return self._num_cases
+
+    def column(self, name: str) -> np.ndarray:
+        """Values of a column by case and repeat, NaN when missing"""
+        return self._columns[name][: self._num_cases, : self._num_repeats]
+
+    def valid_values(self, name: str) -> np.ndarray:
+        """Flat array of the non-missing values of a column"""
+        column = self.column(name)
+        return column[~np.isnan(column)]
+
+    @property
+    def ratings(self) -> np.ndarray:
+        return self.column("rating")
+
+    def case_mean_ratings(self) -> np.ndarray:
+        """Mean rating of each case, NaN for cases without a valid rating"""
+        valid = ~np.isnan(self.ratings)
+        counts = valid.sum(axis=1)
+        sums = np.where(valid, self.ratings, 0.0).sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(counts > 0, sums / counts, np.nan)
+
+
+def _case_row(
+    ratings: Sequence[float | None],
+    runtimes: Sequence[float],
+    timings: Sequence[RepeatTiming],
+) -> dict[str, list[float]]:
+    row = {"rating": _none_to_nan(ratings), "runtime": list(runtimes)}
+    for name in [*PHASES, *STREAM_STATS]:
+        row[name] = _timing_values(timings, name)
+    return row
+
+
+def _timing_values(timings: Sequence[RepeatTiming], name: str) -> list[float]:
+    if name in STREAM_STATS:
+        values = [
+            getattr(timing.stream, name) if timing.stream is not None else None
+            for timing in timings
+        ]
+    else:
+        values = [getattr(timing, name) for timing in timings]
+    return _none_to_nan(values)
+
+
+def _none_to_nan(values: Sequence[float | None]) -> list[float]:
+    return [math.nan if value is None else value for value in values]
+
+
+def _to_array(rows: list[Sequence[float]], num_repeats: int) -> np.ndarray:
+    return np.array(
+        [
+            (
+                row
+                if len(row) == num_repeats
+                else [*row, *[math.nan] * (num_repeats - len(row))]
+            )
+            for row in rows
+        ],
+        dtype=float,
+    )
+
+
+def _pad_repeats(column: np.ndarray, num_repeats: int) -> np.ndarray:
+    return np.pad(
+        column,
+        ((0, 0), (0, num_repeats - column.shape[1])),
+        constant_values=np.nan,
+    )
+
+
+def _grow(capacity: int, size: int) -> int:
+    if size <= capacity:
+        return capacity
+    return max(size, 2 * capacity)
@@ -3,33 +3,81 @@
 from functools import cached_property
 
 import numpy as np
-from pydantic import BaseModel, Field, computed_field
+from pydantic import BaseModel, ConfigDict, Field, computed_field
 
+from .._evaluation import Evaluation
+from .._repeat_timing import PHASES, STREAM_STATS
 from ._benchmark_metrics import BenchmarkMetrics
+from ._judge_agreement import JudgeAgreement, judge_agreement, judge_ratings_matrix
+from ._latency_histogram import LatencyHistogram
+from ._ratings_store import RatingsStore
+from ._statistics import bootstrap_confidence_interval
+
+_BOOTSTRAP_RESAMPLES = 2000
+_BOOTSTRAP_SEED = 0
+
+DEFAULT_PASS_THRESHOLD = 8.0
+DEFAULT_CONFIDENCE = 0.95
+
+RATING_BINS = [-0.5, 4.5, 7.5, 10.5]
+RATING_BIN_NAMES = ["poor", "fair", "good"]
 
 
 class RunMetrics(BaseModel):
-    benchmark_metrics: list[BenchmarkMetrics] = Field(exclude=True)
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    benchmark_metrics: list[BenchmarkMetrics] = Field(
+        default_factory=list, exclude=True
+    )
+    # Store filled as the cases finished, with one row per case. Built from
+    # benchmark_metrics when not given
+    ratings_store: RatingsStore | None = Field(default=None, exclude=True)
+    # Evaluations of all the cases, for the judge agreement. Taken from
+    # benchmark_metrics when not given
+    evaluations: list[Evaluation | None] | None = Field(default=None, exclude=True)
+    runtime: float | None = Field(default=None, exclude=True)
+    # Successful repeats of resumed cases, which did not run within runtime
+    num_resumed_repeats: int = Field(default=0, exclude=True)
+    # Serialized with the RunOutput, which sets them
+    pass_threshold: float = Field(default=DEFAULT_PASS_THRESHOLD, exclude=True)
+    confidence: float = Field(default=DEFAULT_CONFIDENCE, exclude=True)
 
     @computed_field
     @property
     def num_benchmarks(self) -> int:
-        return len(self.benchmark_metrics)
+        return self._store.num_cases
+
+    @cached_property
+    def _store(self) -> RatingsStore:
+        if self.ratings_store is not None:
+            return self.ratings_store
+        return RatingsStore.from_benchmark_metrics(self.benchmark_metrics)
+
+    @cached_property
+    def _case_ratings(self) -> np.ndarray:
+        return self._store.case_mean_ratings()
+
+    @cached_property
+    def _valid_ratings(self) -> np.ndarray:
+        return self._case_ratings[~np.isnan(self._case_ratings)]
 
     @computed_field
     @cached_property
     def ratings(self) -> list[float | None]:
-        return [bm_m.mean_rating for bm_m in self.benchmark_metrics]
+        return [
+            None if np.isnan(rating) else rating
+            for rating in self._case_ratings.tolist()
+        ]
 
     @computed_field
     @property
     def num_valid_ratings(self) -> int:
-        return len(self.valid_ratings)
+        return int(self._valid_ratings.size)
 
     @computed_field
     @cached_property
     def valid_ratings(self) -> list[float]:
-        return list(filter(None, self.ratings))
+        return self._valid_ratings.tolist()
 
     @computed_field
     @property
@@ -39,32 +87,136 @@ class RunMetrics(BaseModel):
     @computed_field
     @cached_property
     def sorted_enumerated_ratings(self) -> list[tuple[int, float]]:
-        return sorted(enumerate(self.ratings), key=lambda x: (x[1] is not None, x[1]))
+        # Cases without rating first, then by increasing rating (stable on ties)
+        valid = ~np.isnan(self._case_ratings)
+        order = np.lexsort((np.where(valid, self._case_ratings, 0.0), valid))
+        return [(idx, self.ratings[idx]) for idx in order.tolist()]
 
     @computed_field
     @property
     def histogram(self) -> dict[str, int]:
-        bins = [-0.5, 4.5, 7.5, 10.5]
-        counts, _ = np.histogram(self.valid_ratings, bins=bins)
-        if len(counts) == 3:
-            return {
-                "invalid": len(self.ratings) - len(self.valid_ratings),
-                "poor": int(counts[0]),
-                "fair": int(counts[1]),
-                "good": int(counts[2]),
-            }
-        return {}
+        counts, _ = np.histogram(self._valid_ratings, bins=RATING_BINS)
+        return {
+            "invalid": len(self.ratings) - self.num_valid_ratings,
+            **{name: int(count) for name, count in zip(RATING_BIN_NAMES, counts)},
+        }
 
     @computed_field
     @property
     def mean_rating(self) -> float | None:
-        if not self.valid_ratings:
+        if not self._valid_ratings.size:
             return None
-        return np.mean(self.valid_ratings)
+        return float(self._valid_ratings.mean())
 
     @computed_field
     @property
     def std_dev(self) -> float | None:
-        if not self.valid_ratings:
+        if not self._valid_ratings.size:
+            return None
+        return float(self._valid_ratings.std())
+
+    @computed_field
+    @property
+    def mean_rating_ci(self) -> tuple[float, float] | None:
+        return bootstrap_confidence_interval(
+            self._valid_ratings,
+            confidence=self.confidence,
+            num_resamples=_BOOTSTRAP_RESAMPLES,
+            seed=_BOOTSTRAP_SEED,
+        )
+
+    @cached_property
+    def _passes(self) -> np.ndarray:
+        return self._valid_ratings >= self.pass_threshold
+
+    @computed_field
+    @property
+    def pass_rate(self) -> float | None:
+        """Fraction of valid ratings at or above pass_threshold"""
+        if not self._valid_ratings.size:
+            return None
+        return float(self._passes.mean())
+
+    @computed_field
+    @property
+    def pass_rate_ci(self) -> tuple[float, float] | None:
+        return bootstrap_confidence_interval(
+            self._passes,
+            confidence=self.confidence,
+            num_resamples=_BOOTSTRAP_RESAMPLES,
+            seed=_BOOTSTRAP_SEED,
+        )
+
+    @computed_field
+    @cached_property
+    def judge_agreement(self) -> JudgeAgreement | None:
+        """Agreement between the judges of jury evaluators, None without juries"""
+        evaluations = self.evaluations
+        if evaluations is None:
+            evaluations = [
+                evaluation
+                for bm_m in self.benchmark_metrics
+                for evaluation in bm_m.evals
+            ]
+        matrix = judge_ratings_matrix(evaluations)
+        if matrix is None:
+            return None
+        ratings, judges = matrix
+        return judge_agreement(ratings, judges=judges, bins=RATING_BINS)
+
+    @cached_property
+    def latency_histogram(self) -> LatencyHistogram:
+        histogram = LatencyHistogram()
+        histogram.add_many(self._store.valid_values("runtime"))
+        return histogram
+
+    @computed_field
+    @property
+    def latency(self) -> dict[str, float] | None:
+        return self.latency_histogram.summary()
+
+    @cached_property
+    def phase_histograms(self) -> dict[str, LatencyHistogram]:
+        histograms = {}
+        for phase in PHASES:
+            histograms[phase] = LatencyHistogram()
+            histograms[phase].add_many(self._store.valid_values(phase))
+        return histograms
+
+    @computed_field
+    @property
+    def phase_timings(self) -> dict[str, dict[str, float] | None]:
+        return {
+            phase: histogram.summary()
+            for phase, histogram in self.phase_histograms.items()
+        }
+
+    @cached_property
+    def stream_histograms(self) -> dict[str, LatencyHistogram]:
+        histograms = {}
+        for stat in STREAM_STATS:
+            histograms[stat] = LatencyHistogram()
+            histograms[stat].add_many(self._store.valid_values(stat))
+        return histograms
+
+    @computed_field
+    @property
+    def stream_timings(self) -> dict[str, dict[str, float] | None] | None:
+        if not self.stream_histograms["time_to_first_chunk"].count:
+            return None
+        return {
+            stat: histogram.summary()
+            for stat, histogram in self.stream_histograms.items()
+        }
+
+    @computed_field
+    @property
+    def throughput(self) -> float | None:
+        """
+        Successfully completed case repeats per second of run wall-clock time,
+        leaving out the repeats of resumed cases
+        """
+        num_repeats = self.latency_histogram.count - self.num_resumed_repeats
+        if not self.runtime or num_repeats <= 0:
             return None
-        return np.std(self.valid_ratings)
+        return num_repeats / self.runtime
@@ -0,0 +1,208 @@
+# Copyright 2024 Recursive AI
+
+import math
+from statistics import NormalDist
+from typing import Sequence
+
+import numpy as np
+
+_BOOTSTRAP_CHUNK_ELEMENTS = 10_000_000
+# Drawing multinomial counts costs about this many times more than an index, per item
+_MULTINOMIAL_SPEEDUP = 16
+_MAX_CONTINUED_FRACTION_TERMS = 300
+
+
+def t_critical_value(confidence: float, dof: int) -> float:
+    """
+    Two-sided critical value of Student's t distribution.
+
+    Exact for 1 and 2 degrees of freedom, and computed with the Cornish-Fisher
+    expansion around the normal quantile otherwise (relative error below 1%).
+    """
+    if dof < 1:
+        raise ValueError(f"dof:{dof} must be at least 1")
+    p = (1 + confidence) / 2
+    if dof == 1:
+        return math.tan(math.pi * (p - 0.5))
+    if dof == 2:
+        return (2 * p - 1) / math.sqrt(2 * p * (1 - p))
+    z = NormalDist().inv_cdf(p)
+    v = dof
+    return (
+        z
+        + (z**3 + z) / (4 * v)
+        + (5 * z**5 + 16 * z**3 + 3 * z) / (96 * v**2)
+        + (3 * z**7 + 19 * z**5 + 17 * z**3 - 15 * z) / (384 * v**3)
+        + (79 * z**9 + 776 * z**7 + 1482 * z**5 - 1920 * z**3 - 945 * z)
+        / (92160 * v**4)
+    )
+
+
+def mean_confidence_interval(
+    values: Sequence[float], confidence: float = 0.95
+) -> tuple[float, float] | None:
+    """Student's t confidence interval of the mean, None with less than two values"""
+    if len(values) < 2:
+        return None
+    array = np.asarray(values, dtype=float)
+    mean = float(array.mean())
+    half_width = t_critical_value(confidence, len(array) - 1) * float(
+        array.std(ddof=1) / math.sqrt(len(array))
+    )
+    return (mean - half_width, mean + half_width)
+
+
+def neyman_allocation(
+    std_devs: Sequence[float],
+    current: Sequence[int],
+    budget: int,
+    max_per_item: int,
+) -> np.ndarray:
+    """
+    Splits a budget of extra samples among items so that the total number of
+    samples of each item moves towards being proportional to its standard deviation
+    (Neyman allocation), which minimizes the variance of the mean of item means.
+
+    Items never go above max_per_item samples. Returns zeros when all standard
+    deviations are zero, since extra samples would not improve the estimate.
+    """
+    std_devs = np.asarray(std_devs, dtype=float)
+    current = np.asarray(current, dtype=int)
+    capacity = np.clip(max_per_item - current, 0, None)
+    allocation = np.zeros(len(current), dtype=int)
+    if budget <= 0 or std_devs.sum() <= 0 or capacity.sum() <= 0:
+        return allocation
+
+    target = (current.sum() + budget) * std_devs / std_devs.sum()
+    weights = np.minimum(np.clip(target - current, 0, None), capacity)
+    if weights.sum() <= 0:
+        # Every item is already above its target share: spread by std dev instead
+        weights = np.where(capacity > 0, std_devs, 0.0)
+        if weights.sum() <= 0:
+            return allocation
+
+    budget = min(budget, int(capacity[weights > 0].sum()))
+    shares = weights / weights.sum() * budget
+    allocation = np.minimum(np.floor(shares).astype(int), capacity)
+    remainders = np.where(allocation < capacity, shares - allocation, -np.inf)
+    for idx in np.argsort(-remainders, kind="stable"):
+        if allocation.sum() >= budget:
+            break
+        if allocation[idx] < capacity[idx] and weights[idx] > 0:
+            allocation[idx] += 1
+    return allocation
+
+
+def bootstrap_mean_distribution(
+    values: Sequence[float],
+    num_resamples: int = 2000,
+    seed: int | None = None,
+) -> np.ndarray:
+    """
+    Means of num_resamples bootstrap resamples of values, drawn all at once.
+
+    Resampling n values with replacement is equivalent to drawing multinomial counts
+    over the distinct values, so when values repeat a lot (as ratings do) the cost
+    grows with the number of distinct values rather than with n, which keeps 100k
+    value bootstraps in the milliseconds. Otherwise indices are resampled directly.
+    """
+    array = np.asarray(values, dtype=float)
+    if not array.size:
+        return np.empty(0)
+    unique, counts = np.unique(array, return_counts=True)
+    rng = np.random.default_rng(seed)
+    use_counts = unique.size * _MULTINOMIAL_SPEEDUP <= array.size
+    # Bound the size of the resamples x values matrix drawn at once
+    chunk_size = max(
+        _BOOTSTRAP_CHUNK_ELEMENTS // (unique.size if use_counts else array.size), 1
+    )
+    means = []
+    for start in range(0, num_resamples, chunk_size):
+        size = min(chunk_size, num_resamples - start)
+        if use_counts:
+            resampled = rng.multinomial(array.size, counts / array.size, size=size)
+            means.append(resampled @ unique / array.size)
+        else:
+            indices = rng.integers(0, array.size, size=(size, array.size))
+            means.append(array[indices].mean(axis=1))
+    return np.concatenate(means)
+
+
+def bootstrap_confidence_interval(
+    values: Sequence[float],
+    confidence: float = 0.95,
+    num_resamples: int = 2000,
+    seed: int | None = None,
+) -> tuple[float, float] | None:
+    """Percentile bootstrap confidence interval of the mean, None with no values"""
+    means = bootstrap_mean_distribution(values, num_resamples=num_resamples, seed=seed)
+    if not means.size:
+        return None
+    alpha = (1 - confidence) / 2
+    low, high = np.quantile(means, [alpha, 1 - alpha])
+    return (float(low), float(high))
+
+
+def t_two_sided_p_value(t: float, dof: int) -> float:
+    """Two-sided p-value of Student's t statistic"""
+    if dof < 1:
+        raise ValueError(f"dof:{dof} must be at least 1")
+    if math.isinf(t):
+        return 0.0
+    return _regularized_incomplete_beta(dof / (dof + t * t), dof / 2, 0.5)
+
+
+def paired_t_test(differences: np.ndarray) -> tuple[float | None, float | None]:
+    """
+    Effect size (Cohen's d_z, the mean over the standard deviation of the
+    differences) and two-sided p-value of a paired t-test, None with less than two
+    differences.
+    """
+    if len(differences) < 2:
+        return None, None
+    mean = float(differences.mean())
+    std_dev = float(differences.std(ddof=1))
+    if std_dev == 0:
+        return None, 1.0 if mean == 0 else 0.0
+    t = mean / (std_dev / math.sqrt(len(differences)))
+    return mean / std_dev, t_two_sided_p_value(t, len(differences) - 1)
+
+
+def _regularized_incomplete_beta(x: float, a: float, b: float) -> float:
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    log_front = (
+        math.lgamma(a + b)
+        - math.lgamma(a)
+        - math.lgamma(b)
+        + a * math.log(x)
+        + b * math.log1p(-x)
+    )
+    # The continued fraction converges quickly only below the mean of the distribution
+    if x < (a + 1) / (a + b + 2):
+        return math.exp(log_front) * _beta_continued_fraction(x, a, b) / a
+    return 1.0 - math.exp(log_front) * _beta_continued_fraction(1 - x, b, a) / b
+
+
+def _beta_continued_fraction(x: float, a: float, b: float) -> float:
+    """Lentz's evaluation of the continued fraction of the incomplete beta function"""
+    tiny = 1e-300
+    c = 1.0
+    d = 1.0 - (a + b) * x / (a + 1)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    result = d
+    for m in range(1, _MAX_CONTINUED_FRACTION_TERMS + 1):
+        for numerator in (
+            m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+            -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1)),
+        ):
+            d = 1.0 + numerator * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + numerator / c
+            c = c if abs(c) > tiny else tiny
+            result *= c * d
+        if abs(c * d - 1.0) < 1e-12:
+            break
+    return result
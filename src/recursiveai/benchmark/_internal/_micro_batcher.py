@@ -0,0 +1,129 @@
+# Copyright 2024 Recursive AI
+
+import asyncio
+import time
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Generic, Iterator, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Groups items submitted concurrently into batches processed by a single call.
+
+    A batch is dispatched as soon as it holds max_batch_size items, or
+    max_batch_wait seconds after its first item was submitted, whichever comes
+    first. Each submitter gets back the result matching its own item.
+
+    Callers that will submit items can also announce themselves as submitters for
+    as long as they may submit. A batch is then dispatched without waiting once
+    every submitter has an item pending or running, as no other item can arrive.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[list[T]], Awaitable[list[R]]],
+        max_batch_size: int,
+        max_batch_wait: float,
+    ) -> None:
+        if max_batch_size < 1:
+            raise ValueError(f"max_batch_size:{max_batch_size} must be at least 1")
+        self._handler = handler
+        self._max_batch_size = max_batch_size
+        self._max_batch_wait = max_batch_wait
+        self._pending: list[tuple[T, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+        self._num_submitters = 0
+        self._num_running = 0
+
+    @contextmanager
+    def submitter(self) -> Iterator[None]:
+        """Announces a caller that may submit items until the context exits"""
+        self._num_submitters += 1
+        try:
+            yield
+        finally:
+            self._num_submitters -= 1
+            self._dispatch_if_all_submitted()
+
+    async def submit(self, item: T) -> tuple[R, int, float]:
+        """
+        Returns the result for the item, the size of the batch it ran in and the
+        time it waited for the batch to be dispatched
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        submit_time = time.perf_counter()
+        self._pending.append((item, future))
+        if len(self._pending) >= self._max_batch_size:
+            self._dispatch()
+        else:
+            if self._timer is None:
+                self._timer = loop.call_later(self._max_batch_wait, self._dispatch)
+            if self._all_submitted():
+                # Checked again once the submitters started along with this one
+                # had a chance to submit too
+                loop.call_soon(self._dispatch_if_all_submitted)
+        try:
+            result, batch_size, dispatch_time = await future
+        except asyncio.CancelledError:
+            # A cancelled or timed out caller's item is not sent with a later batch
+            self._withdraw(future)
+            raise
+        return result, batch_size, dispatch_time - submit_time
+
+    def _withdraw(self, future: asyncio.Future) -> None:
+        self._pending = [entry for entry in self._pending if entry[1] is not future]
+        if not self._pending and self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _dispatch_if_all_submitted(self) -> None:
+        if self._pending and self._all_submitted():
+            self._dispatch()
+
+    def _all_submitted(self) -> bool:
+        return (
+            self._num_submitters > 0
+            and len(self._pending) + self._num_running >= self._num_submitters
+        )
+
+    def _dispatch(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        dispatch_time = time.perf_counter()
+        while self._pending:
+            batch = self._pending[: self._max_batch_size]
+            self._pending = self._pending[self._max_batch_size :]
+            self._num_running += len(batch)
+            task = asyncio.create_task(self._run_batch(batch, dispatch_time))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(
+        self, batch: list[tuple[T, asyncio.Future]], dispatch_time: float
+    ) -> None:
+        try:
+            results = await self._handler([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(
+                    f"Batch handler returned {len(results)} results for {len(batch)} items"
+                )
+        except asyncio.CancelledError:
+            for _, future in batch:
+                future.cancel()
+            raise
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+        else:
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result((result, len(batch), dispatch_time))
+        finally:
+            self._num_running -= len(batch)
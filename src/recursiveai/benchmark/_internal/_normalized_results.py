@@ -0,0 +1,126 @@
+# Copyright 2024 Recursive AI
+
+import hashlib
+from typing import Any
+
+NORMALIZED_LAYOUT = "normalized"
+
+# Texts at least this long are stored once in the text table and referenced by hash
+MIN_SHARED_TEXT_LENGTH = 128
+
+_TEXT_REF = "$text"
+_CASE_TEXT_FIELDS = ["query", "reference_answer"]
+_EVALUATION_TEXT_FIELDS = ["query", "reference_answer", "test_answer", "evaluation"]
+
+
+class _TextStore:
+    def __init__(self, min_length: int, texts: dict[str, str] | None = None) -> None:
+        self.min_length = min_length
+        self.texts = texts if texts is not None else {}
+
+    def ref(self, value: Any) -> Any:
+        if isinstance(value, list):
+            return [self.ref(item) for item in value]
+        if not isinstance(value, str) or len(value) < self.min_length:
+            return value
+        key = hashlib.sha256(value.encode()).hexdigest()[:32]
+        self.texts.setdefault(key, value)
+        return {_TEXT_REF: key}
+
+    def resolve(self, value: Any) -> Any:
+        # The same text object is returned for every reference, so loaded results
+        # share their strings in memory
+        if isinstance(value, list):
+            return [self.resolve(item) for item in value]
+        if isinstance(value, dict) and _TEXT_REF in value:
+            return self.texts[value[_TEXT_REF]]
+        return value
+
+
+def normalize_results(
+    results: dict[str, Any], min_text_length: int = MIN_SHARED_TEXT_LENGTH
+) -> dict[str, Any]:
+    """
+    Converts dumped run results to a normalized layout: a case table and an
+    evaluation table per run, where evaluations refer to their case by id and
+    leave out the query and reference answer when they are the case's, plus a
+    content-addressed table of the long texts of all the runs.
+    """
+    store = _TextStore(min_length=min_text_length)
+    runs = []
+    for run in results["runs"]:
+        run = dict(run)
+        cases, evaluations = [], []
+        for output in run.pop("benchmark_outputs"):
+            output = dict(output)
+            info = output["info"]
+            case_evaluations = output.pop("evaluations")
+            output["num_evaluations"] = len(case_evaluations)
+            for repeat, evaluation in enumerate(case_evaluations):
+                if evaluation is None:
+                    continue
+                row = {"case_id": output["id"], "repeat": repeat}
+                for key, value in evaluation.items():
+                    if key in _CASE_TEXT_FIELDS and value == info.get(key):
+                        continue
+                    if key in _EVALUATION_TEXT_FIELDS:
+                        value = store.ref(value)
+                    row[key] = value
+                evaluations.append(row)
+            output["info"] = {
+                key: store.ref(value) if key in _CASE_TEXT_FIELDS else value
+                for key, value in info.items()
+            }
+            cases.append(output)
+        run["cases"] = cases
+        run["evaluations"] = evaluations
+        runs.append(run)
+    return {
+        **{key: value for key, value in results.items() if key != "runs"},
+        "layout": NORMALIZED_LAYOUT,
+        "texts": store.texts,
+        "runs": runs,
+    }
+
+
+def denormalize_results(results: dict[str, Any]) -> dict[str, Any]:
+    """Converts results in the normalized layout back to the nested layout"""
+    store = _TextStore(min_length=0, texts=results["texts"])
+    runs = []
+    for run in results["runs"]:
+        run = dict(run)
+        by_case: dict[int, list[dict[str, Any]]] = {}
+        for row in run.pop("evaluations"):
+            by_case.setdefault(row["case_id"], []).append(row)
+        outputs = []
+        for output in run.pop("cases"):
+            output = dict(output)
+            info = {
+                key: store.resolve(value) if key in _CASE_TEXT_FIELDS else value
+                for key, value in output["info"].items()
+            }
+            evaluations: list[dict[str, Any] | None] = [None] * output.pop(
+                "num_evaluations"
+            )
+            for row in by_case.get(output["id"], []):
+                evaluation = {
+                    key: store.resolve(value)
+                    for key, value in row.items()
+                    if key not in ("case_id", "repeat")
+                }
+                for key in _CASE_TEXT_FIELDS:
+                    evaluation.setdefault(key, info.get(key))
+                evaluations[row["repeat"]] = evaluation
+            output["info"] = info
+            output["evaluations"] = evaluations
+            outputs.append(output)
+        run["benchmark_outputs"] = outputs
+        runs.append(run)
+    return {
+        **{
+            key: value
+            for key, value in results.items()
+            if key not in ("layout", "texts", "runs")
+        },
+        "runs": runs,
+    }
@@ -0,0 +1,69 @@
+# Copyright 2024 Recursive AI
+
+import numpy as np
+from pydantic import BaseModel
+
+PHASES = ["queue", "before_case", "batch_wait", "agent", "evaluator", "after_case"]
+
+STREAM_STATS = ["time_to_first_chunk", "mean_inter_chunk_gap", "chunks_per_second"]
+
+
+class StreamTiming(BaseModel):
+    """
+    Latency statistics of a streamed agent response.
+
+    Output rates are computed over the generation time, i.e. from the first to the
+    last chunk, so they are None for responses streamed as a single chunk.
+    """
+
+    time_to_first_chunk: float | None = None
+    num_chunks: int = 0
+    output_chars: int = 0
+    mean_inter_chunk_gap: float | None = None
+    max_inter_chunk_gap: float | None = None
+    chunks_per_second: float | None = None
+    chars_per_second: float | None = None
+
+    @classmethod
+    def from_chunks(
+        cls, start_time: float, chunk_times: list[float], chunks: list[str]
+    ) -> "StreamTiming":
+        if not chunk_times:
+            return cls()
+        timing = cls(
+            time_to_first_chunk=chunk_times[0] - start_time,
+            num_chunks=len(chunks),
+            output_chars=sum(len(chunk) for chunk in chunks),
+        )
+        generation_time = chunk_times[-1] - chunk_times[0]
+        if len(chunk_times) > 1 and generation_time > 0:
+            gaps = np.diff(chunk_times)
+            timing.mean_inter_chunk_gap = float(gaps.mean())
+            timing.max_inter_chunk_gap = float(gaps.max())
+            timing.chunks_per_second = (len(chunks) - 1) / generation_time
+            timing.chars_per_second = (
+                timing.output_chars - len(chunks[0])
+            ) / generation_time
+        return timing
+
+
+class RepeatTiming(BaseModel):
+    """
+    Monotonic-clock durations (in seconds) of the phases of a single case repeat.
+
+    Phases that were not reached, e.g. the evaluator after a failed agent call,
+    are left as None. `queue` is the time spent waiting for a concurrency slot and
+    is only non-zero for the first repeat of a case. `stream` is only set for
+    streaming agents, and `batch_size` and `batch_wait`, the time spent waiting for
+    the batch to be dispatched and left out of `agent`, for batch agents.
+    """
+
+    queue: float = 0.0
+    before_case: float | None = None
+    batch_wait: float | None = None
+    agent: float | None = None
+    evaluator: float | None = None
+    after_case: float | None = None
+    total: float | None = None
+    stream: StreamTiming | None = None
+    batch_size: int | None = None
@@ -1,18 +1,98 @@
 # Copyright 2024 Recursive AI
 
-from pydantic import BaseModel, computed_field
+from pydantic import BaseModel, PrivateAttr, computed_field
 
 from ._benchmark_output import BenchmarkOutput
-from ._metrics._run_metrics import RunMetrics
+from ._canary_output import CanaryOutput
+from ._metrics._ratings_store import RatingsStore
+from ._metrics._run_metrics import (
+    DEFAULT_CONFIDENCE,
+    DEFAULT_PASS_THRESHOLD,
+    RunMetrics,
+)
+from ._warmup_output import WarmupOutput
 
 
 class RunOutput(BaseModel):
     date: str
     agent_name: str
+    # Unique id given by the runner, None in results saved before it had one
+    run_id: str | None = None
     benchmark_outputs: list[BenchmarkOutput]
+    total_runtime: float | None = None
+    warmup: WarmupOutput | None = None
+    canary: CanaryOutput | None = None
+    # Cases taken from the results of an earlier run instead of being run again
+    resumed_case_ids: list[int] = []
+    # Lowest rating counted as a pass in pass_rate, and the confidence of the
+    # metrics' confidence intervals
+    pass_threshold: float = DEFAULT_PASS_THRESHOLD
+    confidence: float = DEFAULT_CONFIDENCE
+    _ratings_store: RatingsStore | None = PrivateAttr(default=None)
+    _ratings_store_key: tuple[tuple[int, int], ...] = PrivateAttr(default=())
+    _metrics: RunMetrics | None = PrivateAttr(default=None)
+    _metrics_key: tuple | None = PrivateAttr(default=None)
+
+    def use_ratings_store(self, ratings_store: RatingsStore) -> None:
+        """
+        Computes the metrics from a store of the outputs' ratings and timings, with
+        one row per output in the same order, instead of building it from the
+        evaluations. The store is ignored once cases or repeats are added or removed.
+        """
+        self._ratings_store = ratings_store
+        self._ratings_store_key = self._outputs_key()
+        self._metrics = None
+
+    def _outputs_key(self) -> tuple[tuple[int, int], ...]:
+        return tuple(
+            (output.id, len(output.evaluations)) for output in self.benchmark_outputs
+        )
 
     @computed_field
     @property
     def metrics(self) -> RunMetrics:
-        benchmark_metrics = [bm.metrics for bm in self.benchmark_outputs]
-        return RunMetrics(benchmark_metrics=benchmark_metrics)
+        """
+        Computed once, and again after cases or repeats are added or removed or the
+        run's settings change
+        """
+        outputs_key = self._outputs_key()
+        key = (
+            outputs_key,
+            self.total_runtime,
+            tuple(self.resumed_case_ids),
+            self.pass_threshold,
+            self.confidence,
+        )
+        if self._metrics is None or key != self._metrics_key:
+            self._metrics = self._compute_metrics(outputs_key)
+            self._metrics_key = key
+        return self._metrics
+
+    def _compute_metrics(self, outputs_key: tuple[tuple[int, int], ...]) -> RunMetrics:
+        benchmark_metrics = []
+        ratings_store = None
+        evaluations = None
+        if self._ratings_store is not None and outputs_key == self._ratings_store_key:
+            # The store holds what the metrics of each case would give
+            ratings_store = self._ratings_store
+            evaluations = [
+                evaluation
+                for bm in self.benchmark_outputs
+                for evaluation in bm.evaluations
+            ]
+        else:
+            benchmark_metrics = [bm.metrics for bm in self.benchmark_outputs]
+        resumed_case_ids = set(self.resumed_case_ids)
+        return RunMetrics(
+            benchmark_metrics=benchmark_metrics,
+            ratings_store=ratings_store,
+            evaluations=evaluations,
+            runtime=self.total_runtime,
+            pass_threshold=self.pass_threshold,
+            confidence=self.confidence,
+            num_resumed_repeats=sum(
+                len(bm.case_runtimes)
+                for bm in self.benchmark_outputs
+                if bm.id in resumed_case_ids
+            ),
+        )
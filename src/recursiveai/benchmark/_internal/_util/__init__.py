@@ -4,11 +4,19 @@ import asyncio
 import logging
 import time
 from functools import wraps
-from typing import Any, Awaitable, Callable, Optional
+from typing import Any, Awaitable, Callable, Optional, TypeVar
 
 Function = Callable[..., Any]
 AsyncFunction = Callable[..., Awaitable[Any]]
 
+T = TypeVar("T")
+
+
+async def timed(awaitable: Awaitable[T]) -> tuple[T, float]:
+    start_time = time.perf_counter()
+    result = await awaitable
+    return result, time.perf_counter() - start_time
+
 
 def retry(
     func: Optional[Function] = None,
@@ -0,0 +1,11 @@
+# Copyright 2024 Recursive AI
+
+from pydantic import BaseModel
+
+
+class WarmupOutput(BaseModel):
+    num_cases: int = 0
+    num_errors: int = 0
+    case_runtimes: list[float] = []
+    mean_case_runtime: float | None = None
+    total_runtime: float | None = None
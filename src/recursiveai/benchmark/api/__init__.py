@@ -1,9 +1,29 @@
 # Copyright 2024 Recursive AI
 
+from .batch_benchmark_agent import BatchBenchmarkAgent
 from .benchmark import Benchmark
 from .benchmark_agent import BenchmarkAgent
 from .benchmark_case import BenchmarkCase, BenchmarkCaseResponse
-from .benchmark_evaluator import Evaluator
+from .benchmark_evaluator import (
+    BenchmarkEvaluator,
+    CriteriaEvaluator,
+    Evaluator,
+    register_criteria_evaluator,
+    register_evaluator,
+)
 from .benchmark_run import BenchmarkRun
 from .benchmark_runner import BenchmarkRunner
 from .exit_code import ExitCode
+from .load_test_runner import ArrivalProcess, LoadStep, LoadTestRunner, qps_ramp
+from .regression import RegressionReport, detect_regressions
+from .results_exporter import ExportFormat, ResultsExporter
+from .results_io import Compression, ResultsLayout, RunResults, load_run_results
+from .results_warehouse import ResultsWarehouse, case_hash
+from .run_comparison import RunComparison, compare_runs
+from .streaming_benchmark_agent import StreamingBenchmarkAgent
+from .transport import (
+    TransportConfig,
+    configure_transport,
+    prewarm_connections,
+    shared_http_client,
+)
@@ -1,4 +1,5 @@
 # Copyright 2024 Recursive AI
 
 from .async_callback_agent import AsyncCallbackAgent
+from .async_streaming_callback_agent import AsyncStreamingCallbackAgent
 from .callback_agent import CallbackAgent
@@ -0,0 +1,30 @@
+# Copyright 2024 Recursive AI
+
+import logging
+from typing import AsyncIterator, Callable
+
+from ..benchmark_case import BenchmarkCase, BenchmarkCaseResponse
+from ..exit_code import ExitCode
+from ..streaming_benchmark_agent import StreamingBenchmarkAgent
+
+_logger = logging.getLogger(__name__)
+
+
+class AsyncStreamingCallbackAgent(StreamingBenchmarkAgent):
+
+    def __init__(self, async_callback: Callable[[str], AsyncIterator[str]]) -> None:
+        super().__init__()
+        self._async_callback = async_callback
+
+    def stream_benchmark_case(self, case: BenchmarkCase) -> AsyncIterator[str]:
+        return self._async_callback(case.query)
+
+    async def run_benchmark_case(self, case: BenchmarkCase) -> BenchmarkCaseResponse:
+        try:
+            response = await super().run_benchmark_case(case)
+        except Exception:
+            _logger.exception(
+                "Caught exception while running benchmark: %s", case.query
+            )
+            response = BenchmarkCaseResponse(response=None, exit_code=ExitCode.FAILED)
+        return response
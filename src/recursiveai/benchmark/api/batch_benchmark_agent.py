@@ -0,0 +1,40 @@
+# Copyright 2024 Recursive AI
+
+from abc import abstractmethod
+
+from .benchmark_agent import BenchmarkAgent
+from .benchmark_case import BenchmarkCase, BenchmarkCaseResponse
+
+_DEFAULT_MAX_BATCH_SIZE = 8
+_DEFAULT_MAX_BATCH_WAIT = 0.05
+
+
+class BatchBenchmarkAgent(BenchmarkAgent):
+    """
+    Interface used to define semantic agents that process several cases per call.
+
+    The runner groups concurrently executing cases into micro-batches of at most
+    `max_batch_size` cases, waiting at most `max_batch_wait` seconds for a batch to
+    fill up, and maps the responses back to their cases. A batch is sent right away
+    once every case in flight is in it or in a batch already running. Batches can
+    only hold more than one case when the runner executes cases in parallel, and
+    the time a case waits for its batch is timed apart from the agent's.
+    """
+
+    @abstractmethod
+    async def run_benchmark_cases(
+        self, cases: list[BenchmarkCase]
+    ) -> list[BenchmarkCaseResponse]:
+        raise NotImplementedError()
+
+    async def run_benchmark_case(self, case: BenchmarkCase) -> BenchmarkCaseResponse:
+        responses = await self.run_benchmark_cases([case])
+        return responses[0]
+
+    @property
+    def max_batch_size(self) -> int:
+        return _DEFAULT_MAX_BATCH_SIZE
+
+    @property
+    def max_batch_wait(self) -> float:
+        return _DEFAULT_MAX_BATCH_WAIT
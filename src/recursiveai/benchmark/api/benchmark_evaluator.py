@@ -1,6 +1,11 @@
 # Copyright 2024 Recursive AI
 
 from enum import Enum
+from typing import Callable
+
+from .._internal._benchmark_evaluator import BenchmarkEvaluator
+from .._internal._criteria_evaluator import CriteriaEvaluator
+from .._internal._evaluators import CRITERIA_EVALUATORS, EVALUATORS
 
 
 class Evaluator(str, Enum):
@@ -36,3 +41,34 @@ class Evaluator(str, Enum):
 
     STRICT_MATCH = "strict_match"
     REGEX_MATCH = "regex_match"
+
+
+def register_evaluator(
+    name: str,
+    factory: Callable[[], BenchmarkEvaluator],
+    cached: bool = True,
+    replace: bool = False,
+) -> None:
+    """
+    Makes an evaluator available to BenchmarkRunner by name. The factory is called
+    on first use and, if cached, its evaluator is shared by all later runs.
+
+    Packages can also provide factories through entry points of the
+    flow_benchmark_tools.evaluators group.
+    """
+    EVALUATORS.register(name=name, factory=factory, cached=cached, replace=replace)
+
+
+def register_criteria_evaluator(
+    name: str,
+    factory: Callable[[], CriteriaEvaluator],
+    cached: bool = True,
+    replace: bool = False,
+) -> None:
+    """
+    Same as register_evaluator for CriteriaBenchmarkRunner, with entry points of
+    the flow_benchmark_tools.criteria_evaluators group.
+    """
+    CRITERIA_EVALUATORS.register(
+        name=name, factory=factory, cached=cached, replace=replace
+    )
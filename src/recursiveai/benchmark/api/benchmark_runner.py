@@ -2,44 +2,105 @@
 
 import asyncio
 import datetime
-import json
+import itertools
 import logging
+import math
 import os
 import time
+from collections import defaultdict
+from typing import Awaitable, Sequence, TypeVar
 
+import numpy as np
+
+from .._internal._agent_executor import AgentExecutor
 from .._internal._benchmark_output import BenchmarkOutput
+from .._internal._canary_output import CanaryOutput
+from .._internal._concurrency_sweep_output import (
+    ConcurrencyLevelOutput,
+    ConcurrencySweepOutput,
+)
+from .._internal._defaults import DEFAULT_RESULTS_FOLDER, MAX_CONCURRENT_CASES
+from .._internal._evaluation import Evaluation
 from .._internal._evaluators import get_criteria_evaluator, get_evaluator
+from .._internal._llm._transport import TransportConfig, configure_transport
+from .._internal._metrics._ratings_store import RatingsStore
+from .._internal._metrics._run_metrics import (
+    DEFAULT_CONFIDENCE,
+    DEFAULT_PASS_THRESHOLD,
+    RunMetrics,
+)
+from .._internal._metrics._statistics import mean_confidence_interval, neyman_allocation
+from .._internal._repeat_timing import RepeatTiming
 from .._internal._run_output import RunOutput
+from .._internal._util import timed
+from .._internal._warmup_output import WarmupOutput
 from .benchmark_agent import BenchmarkAgent
-from .benchmark_case import BenchmarkCase
-from .benchmark_evaluator import Evaluator
+from .benchmark_case import BenchmarkCase, BenchmarkCaseResponse
+from .benchmark_evaluator import BenchmarkEvaluator, CriteriaEvaluator, Evaluator
 from .benchmark_run import BenchmarkRun
 from .exit_code import ExitCode
+from .results_exporter import ResultsExporter, new_run_id
+from .results_io import Compression, ResultsLayout, load_run_results, save_results
+from .results_warehouse import ResultsWarehouse, case_hash
 
 _logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 _MAX_NUM_REPEATS = 20
-_MAX_CONCURRENT_CASES = 1000
+_MAX_PREWARM_CONNECTIONS = 64
+
+_DEFAULT_MIN_REPEATS = 3
+_NUM_BUDGET_ROUNDS = 4
+# Time after_case still gets past the run deadline, so agents can release resources
+_CLEANUP_GRACE_SECONDS = 5.0
 
-_DEFAULT_RESULTS_FOLDER = "benchmark/results/"
+_DEFAULT_SWEEP_CONCURRENCY_LEVELS = (1, 2, 4, 8, 16, 32, 64)
+_DEFAULT_SWEEP_KNEE_THRESHOLD = 0.1
 
 
 class BenchmarkRunner:
     def __init__(
         self,
         runs: list[BenchmarkRun] | BenchmarkRun,
-        evaluator: Evaluator = Evaluator.LLM_JUDGE_GPT_4_0,
-        results_folder=_DEFAULT_RESULTS_FOLDER,
+        evaluator: Evaluator | str = Evaluator.LLM_JUDGE_GPT_4_0,
+        results_folder=DEFAULT_RESULTS_FOLDER,
         results_file="",
         repeats: int = 1,
         parallel: bool = False,
-        max_concurrency: int = _MAX_CONCURRENT_CASES,
+        max_concurrency: int = MAX_CONCURRENT_CASES,
+        warmup_cases: int = 0,
+        warmup_seconds: float = 0.0,
+        case_timeout: float | None = None,
+        run_deadline: float | None = None,
+        min_repeats: int = _DEFAULT_MIN_REPEATS,
+        target_ci_width: float | None = None,
+        confidence: float = DEFAULT_CONFIDENCE,
+        pass_threshold: float = DEFAULT_PASS_THRESHOLD,
+        repeat_budget: int | None = None,
+        canary_size: int | float | None = None,
+        canary_threshold: float | None = None,
+        canary_stratify: bool = False,
+        canary_seed: int | None = None,
+        exporter: ResultsExporter | None = None,
+        drop_case_text: bool = False,
+        compact_results: bool = False,
+        results_compression: Compression = Compression.NONE,
+        results_layout: ResultsLayout = ResultsLayout.NESTED,
+        warehouse: ResultsWarehouse | None = None,
+        num_shards: int = 1,
+        shard_index: int = 0,
+        sample_size: int | float | None = None,
+        sample_seed: int | None = None,
+        resume_from: str | None = None,
+        transport: TransportConfig | None = None,
+        prewarm: bool = True,
     ) -> None:
         if isinstance(runs, list):
             self._runs = runs
         else:
             self._runs = [runs]
-        self._evaluator = get_evaluator(evaluator=evaluator)
+        self._evaluator = self._create_evaluator(evaluator=evaluator)
         self._results_folder = results_folder
         self._results_file = results_file
         if repeats < 1:
@@ -54,19 +115,134 @@ class BenchmarkRunner:
         else:
             self._repeats = repeats
         self._parallel = parallel
+        self._max_concurrency = max_concurrency
         self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._agent_executor = AgentExecutor()
+        # Ratings and timings of the cases of each ongoing run, added as they finish
+        self._ratings_stores: dict[str, RatingsStore] = {}
+        self._warmup_cases = max(warmup_cases, 0)
+        self._warmup_seconds = max(warmup_seconds, 0.0)
+        self._case_timeout = case_timeout
+        self._run_deadline = run_deadline
+        self._deadline: float | None = None
+        self._min_repeats = min(max(min_repeats, 2), self._repeats)
+        self._target_ci_width = target_ci_width
+        self._confidence = confidence
+        self._pass_threshold = pass_threshold
+        self._repeat_budget = repeat_budget
+        self._pilot_repeats = max(min_repeats, 2)
+        self._canary_size = canary_size
+        self._canary_threshold = canary_threshold
+        self._canary_stratify = canary_stratify
+        self._canary_seed = canary_seed
+        self._exporter = exporter
+        self._drop_case_text = drop_case_text
+        self._compact_results = compact_results
+        self._results_compression = results_compression
+        self._results_layout = results_layout
+        self._warehouse = warehouse
+        if num_shards < 1 or not 0 <= shard_index < num_shards:
+            raise ValueError(
+                f"Invalid shard_index:{shard_index} for num_shards:{num_shards}"
+            )
+        self._num_shards = num_shards
+        self._shard_index = shard_index
+        self._sample_size = sample_size
+        self._sample_seed = sample_seed
+        self._resume_runs = load_run_results(resume_from).runs if resume_from else []
+        # Only when asked for, as the settings apply to the whole process
+        if transport is not None:
+            configure_transport(transport)
+        self._prewarm = prewarm
+
+    def _create_evaluator(self, evaluator: Evaluator | str) -> BenchmarkEvaluator:
+        return get_evaluator(evaluator=evaluator)
 
-    async def run(self) -> None:
-        start_time = time.time()
-        results = await asyncio.gather(*[self._execute_run(run) for run in self._runs])
-        runtime = time.time() - start_time
+    async def run(self) -> list[RunOutput]:
+        if self._exporter is not None and self._exporter.closed:
+            raise ValueError(
+                "The results exporter was closed by an earlier run, pass a new one"
+            )
+        start_time = time.perf_counter()
+        if self._run_deadline is not None:
+            self._deadline = start_time + self._run_deadline
+        try:
+            results = await asyncio.gather(
+                *[self._execute_run(run) for run in self._runs]
+            )
+        finally:
+            self._deadline = None
+        runtime = time.perf_counter() - start_time
         self._save_run_results_to_json(results=results, runtime=runtime)
+        if self._exporter is not None:
+            for result in results:
+                self._exporter.add_run(run_id=result.run_id, output=result)
+            self._exporter.close()
+        if self._warehouse is not None:
+            for result in results:
+                self._warehouse.ingest(result)
+        return results
 
-    async def _execute_run(self, run: BenchmarkRun) -> RunOutput:
+    async def sweep_concurrency(
+        self,
+        concurrency_levels: Sequence[int] = _DEFAULT_SWEEP_CONCURRENCY_LEVELS,
+        sample_size: int | None = None,
+        evaluate: bool = False,
+        knee_threshold: float = _DEFAULT_SWEEP_KNEE_THRESHOLD,
+        seed: int | None = None,
+        results_file: str = "",
+    ) -> list[ConcurrencySweepOutput]:
+        """
+        Runs the same sample of cases of every run at each of the concurrency levels,
+        to find the level at which adding concurrency stops improving throughput.
+
+        By default responses are not judged, so only the agent is measured. Results
+        are saved to results_file in the results folder, never to the runner's own
+        results_file, which holds the results of run().
+        """
+        results = []
+        for run in self._runs:
+            results.append(
+                await self._execute_sweep(
+                    run=run,
+                    concurrency_levels=concurrency_levels,
+                    sample_size=sample_size,
+                    evaluate=evaluate,
+                    knee_threshold=knee_threshold,
+                    seed=seed,
+                )
+            )
+        self._save_sweep_results_to_json(results=results, results_file=results_file)
+        return results
+
+    async def _execute_sweep(
+        self,
+        run: BenchmarkRun,
+        concurrency_levels: Sequence[int],
+        sample_size: int | None,
+        evaluate: bool,
+        knee_threshold: float,
+        seed: int | None,
+    ) -> ConcurrencySweepOutput:
         date = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        await run.agent.before_run(run.benchmark)
         cases = run.benchmark.cases
-        if self._parallel:
+        if sample_size is not None and sample_size < len(cases):
+            rng = np.random.default_rng(seed)
+            sample = sorted(rng.choice(len(cases), size=sample_size, replace=False))
+            cases = [cases[idx] for idx in sample]
+
+        await run.agent.before_run(run.benchmark)
+        await self._prewarm_evaluator()
+        await self._execute_warmup(run)
+        levels = []
+        for concurrency in concurrency_levels:
+            _logger.info(
+                "Concurrency sweep: agent=%s concurrency=%s",
+                run.agent.name,
+                concurrency,
+            )
+            semaphore = asyncio.Semaphore(concurrency)
+            start_time = time.perf_counter()
             outputs = await asyncio.gather(
                 *[
                     self._execute_benchmark_case(
@@ -74,107 +250,697 @@ class BenchmarkRunner:
                         case=case,
                         idx=idx,
                         total=len(cases),
+                        evaluate=evaluate,
+                        semaphore=semaphore,
                     )
                     for idx, case in enumerate(cases)
                 ]
             )
-        else:
-            outputs = []
-            for idx, case in enumerate(cases):
-                output = await self._execute_benchmark_case(
+            elapsed = time.perf_counter() - start_time
+            latencies = [
+                runtime for output in outputs for runtime in output.case_runtimes
+            ]
+            num_requests = sum(len(output.evaluations) for output in outputs)
+            mean_rating = None
+            if evaluate:
+                mean_rating = RunOutput(
+                    date=date,
+                    agent_name=run.agent.name,
+                    benchmark_outputs=outputs,
+                ).metrics.mean_rating
+            levels.append(
+                ConcurrencyLevelOutput(
+                    concurrency=concurrency,
+                    num_requests=num_requests,
+                    num_errors=num_requests - len(latencies),
+                    elapsed=elapsed,
+                    latencies=latencies,
+                    mean_rating=mean_rating,
+                )
+            )
+        await run.agent.after_run(run.benchmark)
+
+        output = ConcurrencySweepOutput(
+            date=date,
+            agent_name=run.agent.name,
+            knee_threshold=knee_threshold,
+            levels=levels,
+        )
+        for level in output.levels:
+            _logger.info(
+                "concurrency=%s throughput=%.3f/s latency=%s error_rate=%s",
+                level.concurrency,
+                level.throughput or 0.0,
+                level.latency,
+                level.error_rate,
+            )
+        _logger.info("Throughput knee at concurrency=%s", output.knee_concurrency)
+        return output
+
+    async def _execute_run(self, run: BenchmarkRun) -> RunOutput:
+        date = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        if self._run_deadline is not None and self._deadline is None:
+            self._deadline = time.perf_counter() + self._run_deadline
+        await run.agent.before_run(run.benchmark)
+        await self._prewarm_evaluator()
+        warmup = await self._execute_warmup(run)
+        cases = run.benchmark.cases
+        run_id = new_run_id(agent_name=run.agent.name, date=date)
+        self._ratings_stores[run_id] = RatingsStore()
+        start_time = time.perf_counter()
+        canary = None
+        case_ids = self._select_cases(cases)
+        resumed = self._resumed_outputs(
+            agent_name=run.agent.name, cases=cases, case_ids=case_ids
+        )
+        for output in resumed:
+            self._case_completed(run_id=run_id, output=output)
+        resumed_ids = {output.id for output in resumed}
+        case_ids = [idx for idx in case_ids if idx not in resumed_ids]
+        if case_ids and self._canary_size and self._canary_threshold is not None:
+            canary_ids = self._sample_canary(cases=cases, case_ids=case_ids)
+            outputs = await self._execute_cases(
+                agent=run.agent,
+                cases=cases,
+                case_ids=canary_ids,
+                num_selected=len(case_ids),
+                run_id=run_id,
+            )
+            canary = self._evaluate_canary(outputs)
+            if canary.passed:
+                outputs += await self._execute_cases(
                     agent=run.agent,
-                    case=case,
-                    idx=idx,
-                    total=len(cases),
+                    cases=cases,
+                    case_ids=sorted(set(case_ids) - set(canary_ids)),
+                    num_selected=len(case_ids),
+                    run_id=run_id,
                 )
-                outputs.append(output)
+        else:
+            outputs = await self._execute_cases(
+                agent=run.agent,
+                cases=cases,
+                case_ids=case_ids,
+                num_selected=len(case_ids),
+                run_id=run_id,
+            )
+        outputs += resumed
+        outputs.sort(key=lambda output: output.id)
+        total_runtime = time.perf_counter() - start_time
         await run.agent.after_run(run.benchmark)
-        return RunOutput(
-            date=date, agent_name=run.agent.name, benchmark_outputs=outputs
+        result = RunOutput(
+            date=date,
+            agent_name=run.agent.name,
+            run_id=run_id,
+            benchmark_outputs=outputs,
+            total_runtime=total_runtime,
+            warmup=warmup,
+            canary=canary,
+            resumed_case_ids=sorted(resumed_ids),
+            pass_threshold=self._pass_threshold,
+            confidence=self._confidence,
+        )
+        ratings_store = self._ratings_stores.pop(run_id)
+        result.use_ratings_store(ratings_store.take([output.id for output in outputs]))
+        return result
+
+    async def _execute_cases(
+        self,
+        agent: BenchmarkAgent,
+        cases: list[BenchmarkCase],
+        case_ids: list[int],
+        num_selected: int,
+        run_id: str,
+    ) -> list[BenchmarkOutput]:
+        """
+        Runs the cases of case_ids, out of the num_selected cases run by this run.
+        A repeat budget is shared between calls in proportion to their cases.
+        """
+        if self._repeat_budget is not None:
+            outputs = [
+                BenchmarkOutput(id=idx, info=cases[idx], repeats=0, evaluations=[])
+                for idx in case_ids
+            ]
+            budget = self._repeat_budget * len(case_ids) // max(num_selected, 1)
+            await self._execute_budgeted_cases(
+                agent=agent, outputs=outputs, total=len(cases), budget=budget
+            )
+            for output in outputs:
+                self._case_completed(run_id=run_id, output=output)
+            return outputs
+
+        async def execute_case(idx: int) -> BenchmarkOutput:
+            output = await self._execute_benchmark_case(
+                agent=agent,
+                case=cases[idx],
+                idx=idx,
+                total=len(cases),
+            )
+            self._case_completed(run_id=run_id, output=output)
+            return output
+
+        if self._parallel:
+            return list(await asyncio.gather(*[execute_case(idx) for idx in case_ids]))
+        outputs = []
+        for idx in case_ids:
+            outputs.append(await execute_case(idx))
+        return outputs
+
+    def _case_completed(self, run_id: str, output: BenchmarkOutput) -> None:
+        self._ratings_stores[run_id].add_case(
+            ratings=output.metrics.ratings,
+            runtimes=output.case_runtimes,
+            timings=output.timings,
+            case_id=output.id,
+        )
+        if self._exporter is not None:
+            self._exporter.add_case(run_id=run_id, output=output)
+        if self._drop_case_text:
+            # The run's metrics only need the ratings, which are in the store
+            output.evaluations = [
+                (
+                    evaluation.model_copy(
+                        update={"test_answer": "", "evaluation": None}
+                    )
+                    if evaluation is not None
+                    else None
+                )
+                for evaluation in output.evaluations
+            ]
+
+    async def _prewarm_evaluator(self) -> None:
+        """
+        Opens the judges' connections before the first case, so its latency and
+        the run's throughput don't include the connection handshakes.
+        """
+        if not self._prewarm:
+            return
+        connections = 1
+        if self._parallel:
+            connections = min(self._max_concurrency, _MAX_PREWARM_CONNECTIONS)
+        try:
+            await self._evaluator.prewarm(connections)
+        except Exception:
+            _logger.exception("Caught exception while pre-warming the evaluator")
+
+    def _select_cases(self, cases: list[BenchmarkCase]) -> list[int]:
+        """
+        Ids of the cases to run: a random sample of sample_size cases (all of them
+        by default), split into num_shards interleaved shards of which only
+        shard_index is run. Case ids stay those of the whole benchmark, so shards
+        of the same sample_seed can be merged.
+        """
+        case_ids = list(range(len(cases)))
+        if self._sample_size is not None:
+            size = _sample_count(self._sample_size, len(cases))
+            rng = np.random.default_rng(self._sample_seed)
+            case_ids = sorted(rng.choice(len(cases), size=size, replace=False).tolist())
+        return case_ids[self._shard_index :: self._num_shards]
+
+    def _resumed_outputs(
+        self, agent_name: str, cases: list[BenchmarkCase], case_ids: list[int]
+    ) -> list[BenchmarkOutput]:
+        """
+        Outputs of the resumed results for the agent's cases among case_ids that
+        already completed there, matched by case content. Cases that failed, were
+        cut short by a deadline or are missing are run again.
+        """
+        completed = {}
+        for result in self._resume_runs:
+            if result.agent_name != agent_name:
+                continue
+            for output in result.benchmark_outputs:
+                if self._output_completed(output):
+                    completed[case_hash(output.info)] = output
+        resumed = []
+        for idx in case_ids:
+            output = completed.get(case_hash(cases[idx]))
+            if output is not None:
+                resumed.append(output.model_copy(update={"id": idx}))
+        if resumed:
+            _logger.info(
+                "Resuming agent=%s with %s of %s cases completed",
+                agent_name,
+                len(resumed),
+                len(case_ids),
+            )
+        return resumed
+
+    def _output_completed(self, output: BenchmarkOutput) -> bool:
+        if not output.evaluations or any(
+            evaluation is None for evaluation in output.evaluations
+        ):
+            return False
+        if any(exit_code != ExitCode.SUCCESS for exit_code in output.exit_codes):
+            return False
+        # With adaptive repeats a case may legitimately stop before repeats
+        if self._target_ci_width is None and self._repeat_budget is None:
+            return len(output.evaluations) >= self._repeats
+        return True
+
+    def _sample_canary(
+        self, cases: list[BenchmarkCase], case_ids: list[int]
+    ) -> list[int]:
+        """
+        Samples the canary among case_ids, either uniformly at random or stratified
+        by case labels, keeping each distinct set of labels in proportion to its
+        frequency.
+        """
+        size = _sample_count(self._canary_size, len(case_ids))
+        rng = np.random.default_rng(self._canary_seed)
+        if not self._canary_stratify:
+            return sorted(rng.choice(case_ids, size=size, replace=False).tolist())
+
+        strata = defaultdict(list)
+        for idx in case_ids:
+            strata[tuple(sorted(cases[idx].labels or []))].append(idx)
+        keys = sorted(strata)
+        shares = np.array([len(strata[key]) for key in keys]) * size / len(case_ids)
+        quotas = np.floor(shares).astype(int)
+        for idx in np.argsort(-(shares - quotas), kind="stable")[: size - quotas.sum()]:
+            quotas[idx] += 1
+        sample = []
+        for key, quota in zip(keys, quotas):
+            sample += rng.choice(strata[key], size=quota, replace=False).tolist()
+        return sorted(sample)
+
+    def _evaluate_canary(self, outputs: list[BenchmarkOutput]) -> CanaryOutput:
+        metrics = RunMetrics(
+            benchmark_metrics=[output.metrics for output in outputs],
+            pass_threshold=self._pass_threshold,
+            confidence=self._confidence,
         )
+        canary = CanaryOutput(
+            case_ids=[output.id for output in outputs],
+            threshold=self._canary_threshold,
+            confidence=self._confidence,
+            mean_rating=metrics.mean_rating,
+        )
+        interval = mean_confidence_interval(
+            metrics.valid_ratings, confidence=self._confidence
+        )
+        if interval is not None:
+            canary.ci_low, canary.ci_high = interval
+            canary.passed = canary.ci_high >= self._canary_threshold
+        else:
+            # Without a confidence interval only a canary with no valid rating fails
+            canary.passed = metrics.mean_rating is not None
+        if canary.passed:
+            _logger.info("Canary passed: %s", canary)
+        else:
+            _logger.error("Canary failed, aborting the rest of the run: %s", canary)
+        return canary
+
+    async def _execute_budgeted_cases(
+        self,
+        agent: BenchmarkAgent,
+        outputs: list[BenchmarkOutput],
+        total: int,
+        budget: int,
+    ) -> None:
+        """
+        Spends a budget of repeats over the given cases. Every case first gets a
+        pilot of min_repeats repeats (at least 2), and the rest of the budget is
+        allocated in rounds to the cases whose ratings vary the most (Neyman
+        allocation), recomputed from the observed ratings after every round.
+        """
+        if not outputs:
+            return
+
+        pilot_repeats = self._pilot_repeats
+        if pilot_repeats * len(outputs) > budget:
+            pilot_repeats = max(budget // len(outputs), 1)
+            _logger.warning(
+                "Repeat budget:%s is too small for the pilot round, running %s repeats per case",
+                budget,
+                pilot_repeats,
+            )
+        allocation = np.full(len(outputs), pilot_repeats)
+        remaining = budget
+        round_size = None
+        while remaining > 0 and allocation.sum() > 0 and not self._deadline_passed():
+            executed = sum(output.repeats for output in outputs)
+            await self._execute_allocation(
+                agent=agent, outputs=outputs, allocation=allocation, total=total
+            )
+            remaining -= sum(output.repeats for output in outputs) - executed
+            if round_size is None:
+                round_size = -(-remaining // _NUM_BUDGET_ROUNDS)
+            allocation = neyman_allocation(
+                std_devs=self._rating_std_devs(outputs),
+                current=[output.repeats for output in outputs],
+                budget=min(round_size, remaining),
+                max_per_item=_MAX_NUM_REPEATS,
+            )
+            _logger.info(
+                "Allocated %s extra repeats, %s left in the budget",
+                allocation.sum(),
+                remaining,
+            )
+
+    async def _execute_allocation(
+        self,
+        agent: BenchmarkAgent,
+        outputs: list[BenchmarkOutput],
+        allocation: np.ndarray,
+        total: int,
+    ) -> None:
+        executions = [
+            self._execute_case_repeats(
+                agent=agent,
+                output=output,
+                num_repeats=int(num_repeats),
+                total=total,
+            )
+            for output, num_repeats in zip(outputs, allocation)
+            if num_repeats > 0
+        ]
+        if self._parallel:
+            await asyncio.gather(*executions)
+        else:
+            for execution in executions:
+                await execution
+
+    def _rating_std_devs(self, outputs: list[BenchmarkOutput]) -> list[float]:
+        std_devs = []
+        for output in outputs:
+            ratings = output.metrics.valid_ratings
+            std_devs.append(np.std(ratings, ddof=1) if len(ratings) > 1 else np.nan)
+        # Cases without enough valid ratings are treated as the noisiest ones
+        std_devs = np.asarray(std_devs)
+        max_std_dev = np.nanmax(std_devs) if not np.all(np.isnan(std_devs)) else 0.0
+        return list(np.nan_to_num(std_devs, nan=max_std_dev))
+
+    async def _execute_warmup(self, run: BenchmarkRun) -> WarmupOutput | None:
+        """
+        Runs the agent on the benchmark cases, cycling through them, until at least
+        warmup_cases cases have run and warmup_seconds have passed. Responses are not
+        evaluated and are left out of the run metrics.
+        """
+        if not run.benchmark.cases or (
+            not self._warmup_cases and not self._warmup_seconds
+        ):
+            return None
+
+        _logger.info(
+            "Warming up agent=%s cases=%s seconds=%s",
+            run.agent.name,
+            self._warmup_cases,
+            self._warmup_seconds,
+        )
+        output = WarmupOutput()
+        cases = itertools.cycle(run.benchmark.cases)
+        start_time = time.perf_counter()
+        while (
+            output.num_cases < self._warmup_cases
+            or time.perf_counter() - start_time < self._warmup_seconds
+        ) and not self._deadline_passed():
+            timing = RepeatTiming()
+            with self._agent_executor.submitter(run.agent):
+                _, exit_code = await self._execute_repeat(
+                    agent=run.agent, case=next(cases), timing=timing, evaluate=False
+                )
+            output.num_cases += 1
+            if exit_code == ExitCode.SUCCESS:
+                output.case_runtimes.append(timing.agent)
+            else:
+                output.num_errors += 1
+        output.total_runtime = time.perf_counter() - start_time
+        if output.case_runtimes:
+            output.mean_case_runtime = sum(output.case_runtimes) / len(
+                output.case_runtimes
+            )
+        return output
 
     async def _execute_benchmark_case(
-        self, agent: BenchmarkAgent, case: BenchmarkCase, idx: int, total: int
+        self,
+        agent: BenchmarkAgent,
+        case: BenchmarkCase,
+        idx: int,
+        total: int,
+        evaluate: bool = True,
+        semaphore: asyncio.Semaphore | None = None,
     ) -> BenchmarkOutput:
-        async with self._semaphore:
+        output = BenchmarkOutput(id=idx, info=case, repeats=0, evaluations=[])
+        await self._execute_case_repeats(
+            agent=agent,
+            output=output,
+            num_repeats=self._repeats,
+            total=total,
+            evaluate=evaluate,
+            semaphore=semaphore,
+        )
+        return output
+
+    async def _execute_case_repeats(
+        self,
+        agent: BenchmarkAgent,
+        output: BenchmarkOutput,
+        num_repeats: int,
+        total: int,
+        evaluate: bool = True,
+        semaphore: asyncio.Semaphore | None = None,
+    ) -> None:
+        """
+        Runs up to num_repeats more repeats of a case, appending them to output.
+        The case holds the runner's semaphore, or the given one, while it runs.
+        """
+        case = output.info
+        queue_start_time = time.perf_counter()
+        async with semaphore or self._semaphore:
+            queue_time = time.perf_counter() - queue_start_time
             _logger.info(
                 "Benchmark %s of %s: agent=%s benchmark=%s",
-                idx + 1,
+                output.id + 1,
                 total,
                 agent.name,
                 case,
             )
-            evaluations = []
-            case_runtimes = []
-            start_time = time.time()
-            for repeat in range(self._repeats):
-                _logger.info("Repeat %s of %s", repeat + 1, self._repeats)
-                evaluation = None
-                try:
-                    await agent.before_case(case)
-                    case_start_time = time.time()
-                    response = await agent.run_benchmark_case(case)
-                    case_end_time = time.time()
-                    if response.exit_code == ExitCode.SUCCESS:
-                        evaluation = await self._evaluator.evaluate(
-                            query=case.query,
-                            reference_answer=case.reference_answer,
-                            test_answer=response.response,
-                        )
-                    else:
-                        _logger.error(
-                            "Benchmark exit_code is not SUCCESS: %s", response.exit_code
-                        )
-
-                except Exception:
-                    _logger.exception("Caught exception while running benchmark")
-
-                else:
-                    if response.exit_code == ExitCode.SUCCESS:
-                        case_runtimes.append(case_end_time - case_start_time)
-
-                finally:
-                    try:
-                        await agent.after_case(case)
-                    except Exception:
-                        _logger.exception(
-                            "Caught exception while running after_benchmark"
-                        )
-
-                evaluations.append(evaluation)
-            total_runtime = time.time() - start_time
-
-            mean_case_runtime = None
-            if case_runtimes:
-                mean_case_runtime = sum(case_runtimes) / len(case_runtimes)
-
-            return BenchmarkOutput(
-                id=idx,
-                info=case,
-                repeats=self._repeats,
-                evaluations=evaluations,
-                mean_case_runtime=mean_case_runtime,
-                total_runtime=total_runtime,
+            start_time = time.perf_counter()
+            with self._agent_executor.submitter(agent):
+                await self._execute_repeats(
+                    agent=agent,
+                    output=output,
+                    num_repeats=num_repeats,
+                    queue_time=queue_time,
+                    evaluate=evaluate,
+                )
+            total_runtime = time.perf_counter() - start_time
+
+        output.repeats = len(output.evaluations)
+        output.total_runtime = (output.total_runtime or 0.0) + total_runtime
+        if output.case_runtimes:
+            output.mean_case_runtime = sum(output.case_runtimes) / len(
+                output.case_runtimes
+            )
+
+    async def _execute_repeats(
+        self,
+        agent: BenchmarkAgent,
+        output: BenchmarkOutput,
+        num_repeats: int,
+        queue_time: float,
+        evaluate: bool,
+    ) -> None:
+        for repeat in range(num_repeats):
+            if self._deadline_passed():
+                _logger.warning(
+                    "Run deadline exceeded, skipping %s remaining repeats of benchmark %s",
+                    num_repeats - repeat,
+                    output.id + 1,
+                )
+                break
+            _logger.info("Repeat %s of %s", repeat + 1, num_repeats)
+            timing = RepeatTiming(queue=queue_time if repeat == 0 else 0.0)
+            evaluation, exit_code = await self._execute_repeat(
+                agent=agent, case=output.info, timing=timing, evaluate=evaluate
+            )
+            if exit_code == ExitCode.SUCCESS:
+                output.case_runtimes.append(timing.agent)
+            output.evaluations.append(evaluation)
+            output.exit_codes.append(exit_code)
+            output.timings.append(timing)
+            if self._rating_converged(output.evaluations):
+                _logger.info(
+                    "Rating converged after %s repeats", len(output.evaluations)
+                )
+                break
+
+    def _rating_converged(self, evaluations: list[Evaluation | None]) -> bool:
+        """
+        Sequential stopping rule: a case's rating has converged once it has at least
+        min_repeats valid ratings, and never fewer than two, and the confidence
+        interval of their mean is no wider than target_ci_width.
+        """
+        if self._target_ci_width is None:
+            return False
+        ratings = [
+            evaluation.rating
+            for evaluation in evaluations
+            if evaluation is not None and evaluation.rating is not None
+        ]
+        if len(ratings) < max(self._min_repeats, 2):
+            return False
+        interval = mean_confidence_interval(ratings, confidence=self._confidence)
+        if interval is None:
+            return False
+        low, high = interval
+        return high - low <= self._target_ci_width
+
+    async def _execute_repeat(
+        self,
+        agent: BenchmarkAgent,
+        case: BenchmarkCase,
+        timing: RepeatTiming,
+        evaluate: bool = True,
+    ) -> tuple[Evaluation | None, ExitCode]:
+        """
+        Runs a repeat of a case. Past the run deadline every phase is cut short, and
+        a repeat cut short before its evaluation completed exits with TIMEOUT.
+        after_case still gets a short grace period past the deadline.
+        """
+        evaluation = None
+        start_time = time.perf_counter()
+        try:
+            _, timing.before_case = await timed(
+                self._within_deadline(agent.before_case(case))
             )
+            response = await self._run_agent_with_timeout(
+                agent=agent, case=case, timing=timing
+            )
+            exit_code = response.exit_code
+            if response.exit_code == ExitCode.SUCCESS:
+                if evaluate:
+                    evaluation, timing.evaluator = await timed(
+                        self._within_deadline(self._evaluate_response(case, response))
+                    )
+            else:
+                _logger.error(
+                    "Benchmark exit_code is not SUCCESS: %s", response.exit_code
+                )
+
+        except asyncio.TimeoutError:
+            _logger.error("Run deadline exceeded while running benchmark")
+            evaluation = None
+            exit_code = ExitCode.TIMEOUT
+
+        except Exception:
+            _logger.exception("Caught exception while running benchmark")
+            evaluation = None
+            exit_code = ExitCode.FAILED
+
+        finally:
+            try:
+                _, timing.after_case = await timed(
+                    self._within_deadline(
+                        agent.after_case(case), grace=_CLEANUP_GRACE_SECONDS
+                    )
+                )
+            except asyncio.TimeoutError:
+                _logger.error(
+                    "Run deadline and grace period exceeded while running after_benchmark"
+                )
+            except Exception:
+                _logger.exception("Caught exception while running after_benchmark")
+            timing.total = time.perf_counter() - start_time
+
+        return evaluation, exit_code
+
+    async def _run_agent_with_timeout(
+        self, agent: BenchmarkAgent, case: BenchmarkCase, timing: RepeatTiming
+    ) -> BenchmarkCaseResponse:
+        timeouts = [
+            timeout
+            for timeout in [self._case_timeout, self._remaining_time()]
+            if timeout is not None
+        ]
+        return await self._agent_executor.run(
+            agent=agent,
+            case=case,
+            timing=timing,
+            timeout=min(timeouts) if timeouts else None,
+        )
+
+    async def _within_deadline(self, awaitable: Awaitable[T], grace: float = 0.0) -> T:
+        """
+        Awaits awaitable, raising asyncio.TimeoutError grace seconds past the run
+        deadline
+        """
+        remaining_time = self._remaining_time()
+        if remaining_time is None:
+            return await awaitable
+        return await asyncio.wait_for(
+            awaitable, timeout=max(remaining_time, 0.0) + grace
+        )
+
+    def _remaining_time(self) -> float | None:
+        if self._deadline is None:
+            return None
+        return self._deadline - time.perf_counter()
+
+    def _deadline_passed(self) -> bool:
+        remaining_time = self._remaining_time()
+        return remaining_time is not None and remaining_time <= 0
+
+    async def _evaluate_response(
+        self, case: BenchmarkCase, response: BenchmarkCaseResponse
+    ) -> Evaluation:
+        return await self._evaluator.evaluate(
+            query=case.query,
+            reference_answer=case.reference_answer,
+            test_answer=response.response,
+        )
 
     def _save_run_results_to_json(
         self, results: list[RunOutput], runtime: float | None = None
     ) -> None:
-        filename = self._results_file
-        if not self._results_file:
+        output = {}
+        output["total_runtime"] = runtime
+        output["runs"] = [result.model_dump() for result in results]
+        self._save_to_json(
+            output=output,
+            prefix="benchmark_run",
+            results_file=self._results_file,
+            layout=self._results_layout,
+        )
+
+    def _save_sweep_results_to_json(
+        self, results: list[ConcurrencySweepOutput], results_file: str = ""
+    ) -> None:
+        output = {"sweeps": [result.model_dump() for result in results]}
+        self._save_to_json(
+            output=output, prefix="concurrency_sweep", results_file=results_file
+        )
+
+    def _save_to_json(
+        self,
+        output: dict,
+        prefix: str,
+        results_file: str = "",
+        layout: ResultsLayout = ResultsLayout.NESTED,
+    ) -> None:
+        filename = results_file
+        if not results_file:
             date = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-            filename = f"benchmark_run_{date}.json"
+            filename = f"{prefix}_{date}.json"
 
         folder = self._results_folder
         os.makedirs(folder, exist_ok=True)
 
-        full_path = os.path.join(folder, filename)
-        _logger.info("Saving results to %s", full_path)
-        output = {}
-        with open(full_path, "w") as f:
-            output["total_runtime"] = runtime
-            output["runs"] = [result.model_dump() for result in results]
-            json.dump(output, f, ensure_ascii=False, indent=4)
+        full_path = save_results(
+            output=output,
+            path=os.path.join(folder, filename),
+            compact=self._compact_results,
+            compression=self._results_compression,
+            layout=layout,
+        )
+        _logger.info("Saved results to %s", full_path)
+
+
+def _sample_count(size: int | float, total: int) -> int:
+    """Number of items to sample out of total, a float below 1 being a fraction"""
+    if isinstance(size, float) and size < 1:
+        size = math.ceil(size * total)
+    return min(int(size), total)
 
 
 class CriteriaBenchmarkRunner(BenchmarkRunner):
@@ -186,12 +952,38 @@ class CriteriaBenchmarkRunner(BenchmarkRunner):
     def __init__(
         self,
         runs: list[BenchmarkRun] | BenchmarkRun,
-        evaluator: Evaluator = Evaluator.LLM_CRITERIA_JUDGE_GPT_4_0,
-        results_folder=_DEFAULT_RESULTS_FOLDER,
+        evaluator: Evaluator | str = Evaluator.LLM_CRITERIA_JUDGE_GPT_4_0,
+        results_folder=DEFAULT_RESULTS_FOLDER,
         results_file="",
         repeats: int = 1,
         parallel: bool = False,
-        max_concurrency: int = _MAX_CONCURRENT_CASES,
+        max_concurrency: int = MAX_CONCURRENT_CASES,
+        warmup_cases: int = 0,
+        warmup_seconds: float = 0.0,
+        case_timeout: float | None = None,
+        run_deadline: float | None = None,
+        min_repeats: int = _DEFAULT_MIN_REPEATS,
+        target_ci_width: float | None = None,
+        confidence: float = DEFAULT_CONFIDENCE,
+        pass_threshold: float = DEFAULT_PASS_THRESHOLD,
+        repeat_budget: int | None = None,
+        canary_size: int | float | None = None,
+        canary_threshold: float | None = None,
+        canary_stratify: bool = False,
+        canary_seed: int | None = None,
+        exporter: ResultsExporter | None = None,
+        drop_case_text: bool = False,
+        compact_results: bool = False,
+        results_compression: Compression = Compression.NONE,
+        results_layout: ResultsLayout = ResultsLayout.NESTED,
+        warehouse: ResultsWarehouse | None = None,
+        num_shards: int = 1,
+        shard_index: int = 0,
+        sample_size: int | float | None = None,
+        sample_seed: int | None = None,
+        resume_from: str | None = None,
+        transport: TransportConfig | None = None,
+        prewarm: bool = True,
     ) -> None:
         super().__init__(
             runs=runs,
@@ -201,68 +993,40 @@ class CriteriaBenchmarkRunner(BenchmarkRunner):
             repeats=repeats,
             parallel=parallel,
             max_concurrency=max_concurrency,
+            warmup_cases=warmup_cases,
+            warmup_seconds=warmup_seconds,
+            case_timeout=case_timeout,
+            run_deadline=run_deadline,
+            min_repeats=min_repeats,
+            target_ci_width=target_ci_width,
+            confidence=confidence,
+            pass_threshold=pass_threshold,
+            repeat_budget=repeat_budget,
+            canary_size=canary_size,
+            canary_threshold=canary_threshold,
+            canary_stratify=canary_stratify,
+            canary_seed=canary_seed,
+            exporter=exporter,
+            drop_case_text=drop_case_text,
+            compact_results=compact_results,
+            results_compression=results_compression,
+            results_layout=results_layout,
+            warehouse=warehouse,
+            num_shards=num_shards,
+            shard_index=shard_index,
+            sample_size=sample_size,
+            sample_seed=sample_seed,
+            resume_from=resume_from,
+            transport=transport,
+            prewarm=prewarm,
         )
-        self._evaluator = get_criteria_evaluator(evaluator=evaluator)
 
-    async def _execute_benchmark_case(
-        self, agent: BenchmarkAgent, case: BenchmarkCase, idx: int, total: int
-    ) -> BenchmarkOutput:
-        async with self._semaphore:
-            _logger.info(
-                "Benchmark %s of %s: agent=%s benchmark=%s",
-                idx + 1,
-                total,
-                agent.name,
-                case,
-            )
-            evaluations = []
-            case_runtimes = []
-            start_time = time.time()
-            for repeat in range(self._repeats):
-                _logger.info("Repeat %s of %s", repeat + 1, self._repeats)
-                evaluation = None
-                try:
-                    await agent.before_case(case)
-                    case_start_time = time.time()
-                    response = await agent.run_benchmark_case(case)
-
-                    case_end_time = time.time()
-                    if response.exit_code == ExitCode.SUCCESS:
-                        evaluation = await self._evaluator.evaluate(
-                            criteria=case.extras["criteria"], test_text=case.query
-                        )
-                    else:
-                        _logger.error(
-                            "Benchmark exit_code is not SUCCESS: %s", response.exit_code
-                        )
-
-                except Exception:
-                    _logger.exception("Caught exception while running benchmark")
-
-                else:
-                    if response.exit_code == ExitCode.SUCCESS:
-                        case_runtimes.append(case_end_time - case_start_time)
-
-                finally:
-                    try:
-                        await agent.after_case(case)
-                    except Exception:
-                        _logger.exception(
-                            "Caught exception while running after_benchmark"
-                        )
-
-                evaluations.append(evaluation)
-            total_runtime = time.time() - start_time
-
-            mean_case_runtime = None
-            if case_runtimes:
-                mean_case_runtime = sum(case_runtimes) / len(case_runtimes)
-
-            return BenchmarkOutput(
-                id=idx,
-                info=case,
-                repeats=self._repeats,
-                evaluations=evaluations,
-                mean_case_runtime=mean_case_runtime,
-                total_runtime=total_runtime,
-            )
+    def _create_evaluator(self, evaluator: Evaluator | str) -> CriteriaEvaluator:
+        return get_criteria_evaluator(evaluator=evaluator)
+
+    async def _evaluate_response(
+        self, case: BenchmarkCase, response: BenchmarkCaseResponse
+    ) -> Evaluation:
+        return await self._evaluator.evaluate(
+            criteria=case.extras["criteria"], test_text=case.query
+        )
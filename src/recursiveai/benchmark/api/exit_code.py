@@ -7,3 +7,4 @@ class ExitCode(IntEnum):
     SUCCESS = 0
     SKIPPED = 1
     FAILED = 2
+    TIMEOUT = 3
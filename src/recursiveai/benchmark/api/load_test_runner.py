@@ -0,0 +1,238 @@
+# Copyright 2024 Recursive AI
+
+import asyncio
+import datetime
+import itertools
+import logging
+import os
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Iterator
+
+import numpy as np
+
+from .._internal._agent_executor import AgentExecutor
+from .._internal._defaults import DEFAULT_RESULTS_FOLDER, MAX_CONCURRENT_CASES
+from .._internal._load_test_output import LoadStepOutput, LoadTestOutput
+from .._internal._repeat_timing import RepeatTiming
+from .benchmark_agent import BenchmarkAgent
+from .benchmark_case import BenchmarkCase
+from .benchmark_run import BenchmarkRun
+from .exit_code import ExitCode
+from .results_io import Compression, save_results
+
+_logger = logging.getLogger(__name__)
+
+
+class ArrivalProcess(str, Enum):
+    POISSON = "poisson"
+    CONSTANT = "constant"
+
+
+@dataclass
+class LoadStep:
+    qps: float
+    duration: float
+
+
+def qps_ramp(
+    start_qps: float, stop_qps: float, step_qps: float, step_duration: float
+) -> list[LoadStep]:
+    """
+    Builds a stepped ramp of load steps from start_qps to stop_qps (both included),
+    each step lasting step_duration seconds.
+    """
+    if start_qps <= 0 or step_qps <= 0:
+        raise ValueError("start_qps and step_qps must be positive")
+    num_steps = int(np.floor((stop_qps - start_qps) / step_qps + 1e-9)) + 1
+    return [
+        LoadStep(qps=start_qps + idx * step_qps, duration=step_duration)
+        for idx in range(max(num_steps, 1))
+    ]
+
+
+class LoadTestRunner:
+    """
+    Open-loop load tester.
+
+    Unlike the BenchmarkRunner, which keeps a fixed number of cases in flight,
+    requests are issued following an arrival process at a target rate, regardless
+    of how fast the agent answers. Benchmark cases are cycled through for the whole
+    duration of each load step, and no evaluation of the responses is performed.
+    Agents are called as by the BenchmarkRunner, streamed or batched, with latencies
+    leaving out the time a request waits for its batch, and requests taking over
+    case_timeout seconds count as errors. Results are saved as by the
+    BenchmarkRunner, optionally compact and compressed.
+    """
+
+    def __init__(
+        self,
+        runs: list[BenchmarkRun] | BenchmarkRun,
+        steps: list[LoadStep] | LoadStep,
+        arrival_process: ArrivalProcess = ArrivalProcess.POISSON,
+        max_concurrency: int = MAX_CONCURRENT_CASES,
+        results_folder=DEFAULT_RESULTS_FOLDER,
+        results_file="",
+        seed: int | None = None,
+        case_timeout: float | None = None,
+        compact_results: bool = False,
+        results_compression: Compression = Compression.NONE,
+    ) -> None:
+        if isinstance(runs, list):
+            self._runs = runs
+        else:
+            self._runs = [runs]
+        if isinstance(steps, list):
+            self._steps = steps
+        else:
+            self._steps = [steps]
+        for step in self._steps:
+            if step.qps <= 0 or step.duration <= 0:
+                raise ValueError(f"Invalid load step: {step}")
+        self._arrival_process = arrival_process
+        self._max_concurrency = max_concurrency
+        self._results_folder = results_folder
+        self._results_file = results_file
+        self._rng = np.random.default_rng(seed)
+        self._case_timeout = case_timeout
+        self._compact_results = compact_results
+        self._results_compression = results_compression
+        self._agent_executor = AgentExecutor()
+
+    async def run(self) -> list[LoadTestOutput]:
+        # Runs are load tested one after the other so they don't compete for resources
+        results = []
+        for run in self._runs:
+            results.append(await self._execute_run(run))
+        self._save_load_test_results_to_json(results=results)
+        return results
+
+    async def _execute_run(self, run: BenchmarkRun) -> LoadTestOutput:
+        date = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        if not run.benchmark.cases:
+            raise ValueError("Cannot load test an empty benchmark")
+        await run.agent.before_run(run.benchmark)
+        cases = itertools.cycle(run.benchmark.cases)
+        steps = []
+        for idx, step in enumerate(self._steps):
+            _logger.info(
+                "Load step %s of %s: agent=%s qps=%s duration=%ss",
+                idx + 1,
+                len(self._steps),
+                run.agent.name,
+                step.qps,
+                step.duration,
+            )
+            steps.append(
+                await self._execute_step(agent=run.agent, cases=cases, step=step)
+            )
+        await run.agent.after_run(run.benchmark)
+        return LoadTestOutput(date=date, agent_name=run.agent.name, steps=steps)
+
+    async def _execute_step(
+        self, agent: BenchmarkAgent, cases: Iterator[BenchmarkCase], step: LoadStep
+    ) -> LoadStepOutput:
+        output = LoadStepOutput(
+            target_qps=step.qps,
+            duration=step.duration,
+            arrival_process=self._arrival_process.value,
+        )
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+        tasks = []
+        start_time = time.perf_counter()
+        for arrival_time in self._arrival_times(step):
+            delay = start_time + arrival_time - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(
+                asyncio.create_task(
+                    self._execute_request(
+                        agent=agent,
+                        case=next(cases),
+                        scheduled_time=start_time + arrival_time,
+                        semaphore=semaphore,
+                        output=output,
+                    )
+                )
+            )
+        await asyncio.gather(*tasks)
+        output.elapsed = time.perf_counter() - start_time
+        output.num_requests = len(tasks)
+        return output
+
+    def _arrival_times(self, step: LoadStep) -> list[float]:
+        match self._arrival_process:
+            case ArrivalProcess.CONSTANT:
+                return list(np.arange(0.0, step.duration, 1.0 / step.qps))
+            case ArrivalProcess.POISSON:
+                # Draw more inter-arrival gaps than needed on average and trim
+                num_gaps = int(step.qps * step.duration * 1.5) + 10
+                arrivals = np.cumsum(self._rng.exponential(1.0 / step.qps, num_gaps))
+                while arrivals[-1] < step.duration:
+                    extra = self._rng.exponential(1.0 / step.qps, num_gaps)
+                    arrivals = np.concatenate(
+                        [arrivals, arrivals[-1] + np.cumsum(extra)]
+                    )
+                return list(arrivals[arrivals < step.duration])
+
+    async def _execute_request(
+        self,
+        agent: BenchmarkAgent,
+        case: BenchmarkCase,
+        scheduled_time: float,
+        semaphore: asyncio.Semaphore,
+        output: LoadStepOutput,
+    ) -> None:
+        async with semaphore:
+            with self._agent_executor.submitter(agent):
+                await self._execute_admitted_request(
+                    agent=agent,
+                    case=case,
+                    scheduled_time=scheduled_time,
+                    output=output,
+                )
+
+    async def _execute_admitted_request(
+        self,
+        agent: BenchmarkAgent,
+        case: BenchmarkCase,
+        scheduled_time: float,
+        output: LoadStepOutput,
+    ) -> None:
+        output.queue_delays.append(time.perf_counter() - scheduled_time)
+        try:
+            await agent.before_case(case)
+            timing = RepeatTiming()
+            response = await self._agent_executor.run(
+                agent=agent, case=case, timing=timing, timeout=self._case_timeout
+            )
+            if response.exit_code == ExitCode.SUCCESS:
+                output.latencies.append(timing.agent)
+            else:
+                output.num_errors += 1
+        except Exception:
+            _logger.exception("Caught exception while running benchmark")
+            output.num_errors += 1
+        finally:
+            try:
+                await agent.after_case(case)
+            except Exception:
+                _logger.exception("Caught exception while running after_benchmark")
+
+    def _save_load_test_results_to_json(self, results: list[LoadTestOutput]) -> None:
+        filename = self._results_file
+        if not self._results_file:
+            date = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+            filename = f"load_test_{date}.json"
+
+        folder = self._results_folder
+        os.makedirs(folder, exist_ok=True)
+
+        full_path = save_results(
+            output={"runs": [result.model_dump() for result in results]},
+            path=os.path.join(folder, filename),
+            compact=self._compact_results,
+            compression=self._results_compression,
+        )
+        _logger.info("Saved results to %s", full_path)
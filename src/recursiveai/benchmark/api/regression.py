@@ -0,0 +1,205 @@
+# Copyright 2024 Recursive AI
+
+from collections import Counter
+from typing import Callable
+
+import numpy as np
+from pydantic import BaseModel, computed_field
+
+from .._internal._benchmark_output import BenchmarkOutput, case_mean_ratings
+from .._internal._metrics._statistics import (
+    bootstrap_confidence_interval,
+    paired_t_test,
+)
+from .._internal._run_output import RunOutput
+from .results_exporter import output_run_id
+from .results_warehouse import case_hash
+
+_DEFAULT_RATING_DROP_THRESHOLD = 2.0
+_DEFAULT_MIN_RATING_EFFECT = 0.1
+_DEFAULT_LATENCY_INCREASE_THRESHOLD = 0.25
+_DEFAULT_MAX_REPORTED_CASES = 100
+
+
+class CaseRegression(BaseModel):
+    case_id: int
+    case_hash: str
+    baseline: float
+    candidate: float
+    change: float
+
+
+class MetricRegression(BaseModel):
+    num_cases: int
+    baseline_mean: float | None = None
+    candidate_mean: float | None = None
+    mean_difference: float | None = None
+    mean_difference_ci: tuple[float, float] | None = None
+    effect_size: float | None = None
+    p_value: float | None = None
+    num_regressed_cases: int = 0
+    regressed_cases: list[CaseRegression] = []
+    regression: bool = False
+
+
+class RegressionReport(BaseModel):
+    baseline_run: str
+    candidate_run: str
+    confidence: float
+    num_aligned_cases: int
+    num_missing_cases: int
+    num_new_cases: int
+    rating: MetricRegression
+    latency: MetricRegression
+
+    @computed_field
+    @property
+    def passed(self) -> bool:
+        return not (self.rating.regression or self.latency.regression)
+
+
+def detect_regressions(
+    baseline: RunOutput,
+    candidate: RunOutput,
+    rating_drop_threshold: float = _DEFAULT_RATING_DROP_THRESHOLD,
+    latency_increase_threshold: float = _DEFAULT_LATENCY_INCREASE_THRESHOLD,
+    min_rating_effect: float = _DEFAULT_MIN_RATING_EFFECT,
+    confidence: float = 0.95,
+    max_reported_cases: int = _DEFAULT_MAX_REPORTED_CASES,
+    num_resamples: int = 2000,
+    seed: int | None = 0,
+) -> RegressionReport:
+    """
+    Compares a candidate run against a baseline run, aligning cases by the hash of
+    their query and reference answer, so the runs don't need the same case order.
+    Identical cases repeated within a run are aligned in the order they appear.
+
+    A case regressed when its mean rating dropped by at least rating_drop_threshold
+    points, or its mean runtime grew by more than latency_increase_threshold
+    (relative). The run regressed when the mean rating dropped by at least
+    min_rating_effect points, or the mean runtime grew by more than
+    latency_increase_threshold, with a paired t-test significant at the given
+    confidence. Only the largest max_reported_cases regressions are listed.
+    """
+    baseline_keys = _case_keys(baseline.benchmark_outputs)
+    candidate_keys = _case_keys(candidate.benchmark_outputs)
+    keys, baseline_idx, candidate_idx = np.intersect1d(
+        baseline_keys, candidate_keys, return_indices=True
+    )
+    # Back to the candidate order, so ties are reported in a stable order
+    order = np.argsort(candidate_idx)
+    baseline_idx, candidate_idx = baseline_idx[order], candidate_idx[order]
+    hashes = np.array([key.split(":")[0] for key in keys[order]], dtype=str)
+    baseline_outputs = [baseline.benchmark_outputs[idx] for idx in baseline_idx]
+    candidate_outputs = [candidate.benchmark_outputs[idx] for idx in candidate_idx]
+    case_ids = np.array([output.id for output in candidate_outputs], dtype=int)
+
+    ratings = _compare(
+        baseline=case_mean_ratings(baseline_outputs),
+        candidate=case_mean_ratings(candidate_outputs),
+        case_ids=case_ids,
+        hashes=hashes,
+        regressed=lambda base, cand: base - cand >= rating_drop_threshold,
+        confidence=confidence,
+        max_reported_cases=max_reported_cases,
+        num_resamples=num_resamples,
+        seed=seed,
+    )
+    ratings.regression = (
+        ratings.p_value is not None
+        and ratings.p_value < 1 - confidence
+        and ratings.mean_difference <= -min_rating_effect
+    )
+
+    latency = _compare(
+        baseline=_mean_runtimes(baseline_outputs),
+        candidate=_mean_runtimes(candidate_outputs),
+        case_ids=case_ids,
+        hashes=hashes,
+        regressed=lambda base, cand: cand > base * (1 + latency_increase_threshold),
+        confidence=confidence,
+        max_reported_cases=max_reported_cases,
+        num_resamples=num_resamples,
+        seed=seed,
+    )
+    latency.regression = (
+        latency.p_value is not None
+        and latency.p_value < 1 - confidence
+        and latency.candidate_mean
+        > latency.baseline_mean * (1 + latency_increase_threshold)
+    )
+
+    return RegressionReport(
+        baseline_run=output_run_id(baseline),
+        candidate_run=output_run_id(candidate),
+        confidence=confidence,
+        num_aligned_cases=len(hashes),
+        num_missing_cases=len(baseline_keys) - len(hashes),
+        num_new_cases=len(candidate_keys) - len(hashes),
+        rating=ratings,
+        latency=latency,
+    )
+
+
+def _compare(
+    baseline: np.ndarray,
+    candidate: np.ndarray,
+    case_ids: np.ndarray,
+    hashes: np.ndarray,
+    regressed: Callable[[np.ndarray, np.ndarray], np.ndarray],
+    confidence: float,
+    max_reported_cases: int,
+    num_resamples: int,
+    seed: int | None,
+) -> MetricRegression:
+    valid = ~(np.isnan(baseline) | np.isnan(candidate))
+    baseline, candidate = baseline[valid], candidate[valid]
+    case_ids, hashes = case_ids[valid], hashes[valid]
+    comparison = MetricRegression(num_cases=int(valid.sum()))
+    if not comparison.num_cases:
+        return comparison
+
+    differences = candidate - baseline
+    comparison.baseline_mean = float(baseline.mean())
+    comparison.candidate_mean = float(candidate.mean())
+    comparison.mean_difference = float(differences.mean())
+    comparison.mean_difference_ci = bootstrap_confidence_interval(
+        differences, confidence=confidence, num_resamples=num_resamples, seed=seed
+    )
+    comparison.effect_size, comparison.p_value = paired_t_test(differences)
+
+    regressed_idx = np.flatnonzero(regressed(baseline, candidate))
+    comparison.num_regressed_cases = len(regressed_idx)
+    # Largest regressions first: biggest drops in rating, biggest increases in runtime
+    order = np.argsort(-np.abs(differences[regressed_idx]), kind="stable")
+    comparison.regressed_cases = [
+        CaseRegression(
+            case_id=int(case_ids[idx]),
+            case_hash=str(hashes[idx]),
+            baseline=float(baseline[idx]),
+            candidate=float(candidate[idx]),
+            change=float(differences[idx]),
+        )
+        for idx in regressed_idx[order][:max_reported_cases]
+    ]
+    return comparison
+
+
+def _case_keys(outputs: list[BenchmarkOutput]) -> np.ndarray:
+    # Case hash and how many identical cases came before it, e.g. "<hash>:1"
+    occurrences: Counter[str] = Counter()
+    keys = []
+    for output in outputs:
+        digest = case_hash(output.info)
+        keys.append(f"{digest}:{occurrences[digest]}")
+        occurrences[digest] += 1
+    return np.array(keys, dtype=str)
+
+
+def _mean_runtimes(outputs: list[BenchmarkOutput]) -> np.ndarray:
+    return np.array(
+        [
+            np.nan if output.mean_case_runtime is None else output.mean_case_runtime
+            for output in outputs
+        ]
+    )
@@ -0,0 +1,292 @@
+# Copyright 2024 Recursive AI
+
+import datetime
+import logging
+import os
+import uuid
+from enum import Enum
+from typing import Any
+
+from .._internal._benchmark_output import BenchmarkOutput
+from .._internal._metrics._judge_agreement import judge_names
+from .._internal._run_output import RunOutput
+
+_logger = logging.getLogger(__name__)
+
+_DEFAULT_ROW_GROUP_SIZE = 1024
+
+# Columns with free text, left out of the tables unless include_text is set
+_TEXT_COLUMNS = {"query", "reference_answer", "test_answer", "evaluation"}
+
+
+class ExportFormat(str, Enum):
+    PARQUET = "parquet"
+    ARROW = "arrow"
+
+
+def _schemas(pa) -> dict[str, Any]:
+    return {
+        "runs": pa.schema(
+            [
+                ("run_id", pa.string()),
+                ("agent_name", pa.string()),
+                ("date", pa.string()),
+                ("total_runtime", pa.float64()),
+                ("num_cases", pa.int64()),
+                ("mean_rating", pa.float64()),
+                ("std_dev", pa.float64()),
+                ("pass_rate", pa.float64()),
+            ]
+        ),
+        "cases": pa.schema(
+            [
+                ("run_id", pa.string()),
+                ("case_id", pa.int64()),
+                ("labels", pa.list_(pa.string())),
+                ("repeats", pa.int64()),
+                ("mean_rating", pa.float64()),
+                ("std_dev", pa.float64()),
+                ("mean_case_runtime", pa.float64()),
+                ("total_runtime", pa.float64()),
+                ("query", pa.string()),
+                ("reference_answer", pa.string()),
+            ]
+        ),
+        "repeats": pa.schema(
+            [
+                ("run_id", pa.string()),
+                ("case_id", pa.int64()),
+                ("repeat", pa.int64()),
+                ("exit_code", pa.string()),
+                ("evaluator", pa.string()),
+                ("rating", pa.float64()),
+                ("runtime", pa.float64()),
+                ("test_answer", pa.string()),
+                ("evaluation", pa.string()),
+            ]
+        ),
+        "judges": pa.schema(
+            [
+                ("run_id", pa.string()),
+                ("case_id", pa.int64()),
+                ("repeat", pa.int64()),
+                ("judge", pa.int64()),
+                ("judge_name", pa.string()),
+                ("rating", pa.float64()),
+                ("evaluation", pa.string()),
+            ]
+        ),
+    }
+
+
+class ResultsExporter:
+    """
+    Writes benchmark results as columnar tables: runs (one row per run), cases
+    (one row per case), repeats (one row per case repeat) and judges (one row per
+    judge rating of a repeat).
+
+    Each table is a folder with one file per exporter, named after export_id, so
+    exports to the same folder add files instead of overwriting earlier ones, and a
+    table folder can be read as a single dataset.
+
+    Cases are buffered and written in row groups as they complete, so results can
+    be exported while a run is going on. An exporter can't be used once closed.
+    Requires pyarrow.
+    """
+
+    def __init__(
+        self,
+        folder: str,
+        export_format: ExportFormat = ExportFormat.PARQUET,
+        include_text: bool = True,
+        row_group_size: int = _DEFAULT_ROW_GROUP_SIZE,
+    ) -> None:
+        try:
+            import pyarrow
+        except ImportError as e:
+            raise ImportError(
+                "ResultsExporter requires pyarrow, install flow-benchmark-tools[arrow]"
+            ) from e
+        self._pa = pyarrow
+        self._folder = folder
+        self._format = export_format
+        self._row_group_size = max(row_group_size, 1)
+        self._schemas = {
+            table: self._pa.schema(
+                [
+                    field
+                    for field in schema
+                    if include_text or field.name not in _TEXT_COLUMNS
+                ]
+            )
+            for table, schema in _schemas(self._pa).items()
+        }
+        self._buffers: dict[str, list[dict[str, Any]]] = {
+            table: [] for table in self._schemas
+        }
+        self._writers: dict[str, Any] = {}
+        self._closed = False
+        date = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        self.export_id = f"{date}_{uuid.uuid4().hex[:8]}"
+
+    def __enter__(self) -> "ResultsExporter":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def path(self, table: str) -> str:
+        """File this exporter writes the table to"""
+        return os.path.join(
+            self._folder, table, f"{self.export_id}.{self._format.value}"
+        )
+
+    def add_case(self, run_id: str, output: BenchmarkOutput) -> None:
+        metrics = output.metrics
+        self._append(
+            "cases",
+            run_id=run_id,
+            case_id=output.id,
+            labels=output.info.labels,
+            repeats=output.repeats,
+            mean_rating=metrics.mean_rating,
+            std_dev=metrics.std_dev,
+            mean_case_runtime=output.mean_case_runtime,
+            total_runtime=output.total_runtime,
+            query=output.info.query,
+            reference_answer=output.info.reference_answer,
+        )
+        for repeat, evaluation in enumerate(output.evaluations):
+            exit_code = (
+                output.exit_codes[repeat] if repeat < len(output.exit_codes) else None
+            )
+            timing = output.timings[repeat] if repeat < len(output.timings) else None
+            self._append(
+                "repeats",
+                run_id=run_id,
+                case_id=output.id,
+                repeat=repeat,
+                exit_code=exit_code.name if exit_code is not None else None,
+                evaluator=evaluation.evaluator if evaluation else None,
+                rating=evaluation.rating if evaluation else None,
+                runtime=timing.agent if timing else None,
+                test_answer=evaluation.test_answer if evaluation else None,
+                evaluation=(
+                    evaluation.evaluation
+                    if evaluation and isinstance(evaluation.evaluation, str)
+                    else None
+                ),
+            )
+            if evaluation is None or len(evaluation.ratings) < 2:
+                continue
+            names = judge_names(evaluation.evaluator, len(evaluation.ratings))
+            texts = (
+                evaluation.evaluation
+                if isinstance(evaluation.evaluation, list)
+                else [None] * len(evaluation.ratings)
+            )
+            for judge, (name, rating, text) in enumerate(
+                zip(names, evaluation.ratings, texts)
+            ):
+                self._append(
+                    "judges",
+                    run_id=run_id,
+                    case_id=output.id,
+                    repeat=repeat,
+                    judge=judge,
+                    judge_name=name,
+                    rating=rating or None,
+                    evaluation=text,
+                )
+        for table, rows in self._buffers.items():
+            if len(rows) >= self._row_group_size:
+                self._flush(table)
+
+    def add_run(self, run_id: str, output: RunOutput) -> None:
+        metrics = output.metrics
+        self._append(
+            "runs",
+            run_id=run_id,
+            agent_name=output.agent_name,
+            date=output.date,
+            total_runtime=output.total_runtime,
+            num_cases=len(output.benchmark_outputs),
+            mean_rating=metrics.mean_rating,
+            std_dev=metrics.std_dev,
+            pass_rate=metrics.pass_rate,
+        )
+
+    def export(self, results: list[RunOutput]) -> None:
+        """Exports finished runs, with all their cases"""
+        for result in results:
+            run_id = output_run_id(result)
+            for output in result.benchmark_outputs:
+                self.add_case(run_id=run_id, output=output)
+            self.add_run(run_id=run_id, output=result)
+
+    def close(self) -> None:
+        """Writes the buffered rows and closes the files, only the first time"""
+        if self._closed:
+            return
+        self._closed = True
+        for table in self._schemas:
+            self._flush(table)
+            # Tables without rows are still written, with their schema
+            self._writer(table)
+        for writer in self._writers.values():
+            writer.close()
+        self._writers = {}
+
+    def _append(self, table: str, **row: Any) -> None:
+        if self._closed:
+            raise ValueError("Cannot export results with a closed ResultsExporter")
+        self._buffers[table].append(row)
+
+    def _flush(self, table: str) -> None:
+        rows = self._buffers[table]
+        if not rows:
+            return
+        schema = self._schemas[table]
+        batch = self._pa.Table.from_pylist(
+            [{name: row.get(name) for name in schema.names} for row in rows],
+            schema=schema,
+        )
+        self._writer(table).write_table(batch)
+        self._buffers[table] = []
+
+    def _writer(self, table: str) -> Any:
+        if table not in self._writers:
+            path = self.path(table)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            _logger.info("Exporting %s to %s", table, path)
+            if self._format == ExportFormat.PARQUET:
+                import pyarrow.parquet
+
+                self._writers[table] = pyarrow.parquet.ParquetWriter(
+                    path, self._schemas[table]
+                )
+            else:
+                import pyarrow.ipc
+
+                self._writers[table] = pyarrow.ipc.new_file(path, self._schemas[table])
+        return self._writers[table]
+
+
+def run_identifier(agent_name: str, date: str) -> str:
+    return f"{agent_name}_{date}"
+
+
+def new_run_id(agent_name: str, date: str) -> str:
+    """Id of a new run, unique even among runs of the same agent started together"""
+    return f"{run_identifier(agent_name=agent_name, date=date)}_{uuid.uuid4().hex[:8]}"
+
+
+def output_run_id(output: RunOutput) -> str:
+    """Id of a run, made of its agent and date for results without one"""
+    if output.run_id is not None:
+        return output.run_id
+    return run_identifier(agent_name=output.agent_name, date=output.date)
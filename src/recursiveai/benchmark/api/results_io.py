@@ -0,0 +1,161 @@
+# Copyright 2024 Recursive AI
+
+import gzip
+import json
+from enum import Enum
+from typing import Any, Callable, Iterator
+
+from pydantic import BaseModel
+
+from .._internal._normalized_results import (
+    NORMALIZED_LAYOUT,
+    denormalize_results,
+    normalize_results,
+)
+from .._internal._run_output import RunOutput
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+# Levels of nested dicts and lists encoded piece by piece, deep enough to reach the
+# cases of the runs, so a single case is the most encoded at once
+_STREAM_DEPTH = 4
+
+
+class Compression(str, Enum):
+    NONE = "none"
+    GZIP = "gzip"
+    ZSTD = "zstd"
+
+    @property
+    def extension(self) -> str:
+        return {"none": "", "gzip": ".gz", "zstd": ".zst"}[self.value]
+
+
+class ResultsLayout(str, Enum):
+    NESTED = "nested"
+    NORMALIZED = NORMALIZED_LAYOUT
+
+
+class RunResults(BaseModel):
+    total_runtime: float | None = None
+    runs: list[RunOutput]
+
+
+def dumps_results(output: dict[str, Any], compact: bool = True) -> bytes:
+    """
+    Serializes results to JSON. Compact output has no indentation and uses orjson
+    when installed, which is several times faster than the json module.
+    """
+    return b"".join(iter_results_json(output, compact=compact))
+
+
+def iter_results_json(output: dict[str, Any], compact: bool = True) -> Iterator[bytes]:
+    """Serializes results to JSON in pieces, as dumps_results"""
+    if not compact:
+        encoder = json.JSONEncoder(ensure_ascii=False, indent=4)
+        # The pure Python encoder used with indentation yields as it goes
+        for chunk in encoder.iterencode(output):
+            yield chunk.encode()
+        return
+    yield from _iter_compact_json(output, dumps=_compact_dumps(), depth=_STREAM_DEPTH)
+
+
+def _compact_dumps() -> Callable[[Any], bytes]:
+    try:
+        import orjson
+    except ImportError:
+        return lambda value: json.dumps(
+            value, ensure_ascii=False, separators=(",", ":")
+        ).encode()
+    return lambda value: orjson.dumps(
+        value, option=orjson.OPT_SERIALIZE_NUMPY, default=float
+    )
+
+
+def _iter_compact_json(
+    value: Any, dumps: Callable[[Any], bytes], depth: int
+) -> Iterator[bytes]:
+    if depth and isinstance(value, dict) and value:
+        yield b"{"
+        for idx, (key, item) in enumerate(value.items()):
+            yield (b"," if idx else b"") + dumps(str(key)) + b":"
+            yield from _iter_compact_json(item, dumps=dumps, depth=depth - 1)
+        yield b"}"
+    elif depth and isinstance(value, list) and value:
+        yield b"["
+        for idx, item in enumerate(value):
+            if idx:
+                yield b","
+            yield from _iter_compact_json(item, dumps=dumps, depth=depth - 1)
+        yield b"]"
+    else:
+        yield dumps(value)
+
+
+def save_results(
+    output: dict[str, Any],
+    path: str,
+    compact: bool = True,
+    compression: Compression = Compression.NONE,
+    layout: ResultsLayout = ResultsLayout.NESTED,
+) -> str:
+    """
+    Writes results to path, adding the extension of the compression if missing.
+    Returns the path written to. The JSON is encoded and compressed piece by piece,
+    so the whole file is never held in memory.
+
+    The normalized layout stores each case and each long text once, instead of
+    repeating them in every evaluation. It only applies to run results.
+    """
+    if not path.endswith(compression.extension):
+        path += compression.extension
+    if layout == ResultsLayout.NORMALIZED:
+        output = normalize_results(output)
+    chunks = iter_results_json(output, compact=compact)
+    match compression:
+        case Compression.NONE:
+            with open(path, "wb") as f:
+                f.writelines(chunks)
+        case Compression.GZIP:
+            with gzip.open(path, "wb", compresslevel=6) as f:
+                f.writelines(chunks)
+        case Compression.ZSTD:
+            zstandard = _import_zstandard()
+            with open(path, "wb") as f:
+                with zstandard.ZstdCompressor().stream_writer(f) as writer:
+                    for chunk in chunks:
+                        writer.write(chunk)
+    return path
+
+
+def load_results(path: str) -> dict[str, Any]:
+    """Reads results written by save_results, detecting the compression"""
+    with open(path, "rb") as f:
+        magic = f.read(len(_ZSTD_MAGIC))
+        f.seek(0)
+        if magic.startswith(_GZIP_MAGIC):
+            data = gzip.decompress(f.read())
+        elif magic == _ZSTD_MAGIC:
+            with _import_zstandard().ZstdDecompressor().stream_reader(f) as reader:
+                data = reader.read()
+        else:
+            data = f.read()
+    return json.loads(data)
+
+
+def load_run_results(path: str) -> RunResults:
+    """Reads the results file of a BenchmarkRunner run back into RunOutputs"""
+    results = load_results(path)
+    if results.get("layout") == NORMALIZED_LAYOUT:
+        results = denormalize_results(results)
+    return RunResults.model_validate(results)
+
+
+def _import_zstandard():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError(
+            "zstd compression requires zstandard, install flow-benchmark-tools[compression]"
+        ) from e
+    return zstandard
@@ -0,0 +1,240 @@
+# Copyright 2024 Recursive AI
+
+import hashlib
+import logging
+import os
+import sqlite3
+from typing import Any
+
+from .._internal._run_output import RunOutput
+from .benchmark_case import BenchmarkCase
+from .results_exporter import output_run_id
+from .results_io import load_run_results
+
+_logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    agent_name TEXT NOT NULL,
+    date TEXT NOT NULL,
+    total_runtime REAL,
+    num_cases INTEGER NOT NULL,
+    mean_rating REAL,
+    std_dev REAL,
+    pass_rate REAL
+);
+CREATE TABLE IF NOT EXISTS cases (
+    run_id TEXT NOT NULL REFERENCES runs(run_id) ON DELETE CASCADE,
+    case_id INTEGER NOT NULL,
+    case_hash TEXT NOT NULL,
+    query TEXT NOT NULL,
+    repeats INTEGER NOT NULL,
+    mean_rating REAL,
+    mean_case_runtime REAL,
+    PRIMARY KEY (run_id, case_id)
+);
+CREATE TABLE IF NOT EXISTS case_labels (
+    run_id TEXT NOT NULL,
+    case_id INTEGER NOT NULL,
+    label TEXT NOT NULL,
+    FOREIGN KEY (run_id, case_id) REFERENCES cases(run_id, case_id) ON DELETE CASCADE
+);
+CREATE TABLE IF NOT EXISTS evaluations (
+    run_id TEXT NOT NULL,
+    case_id INTEGER NOT NULL,
+    repeat INTEGER NOT NULL,
+    evaluator TEXT,
+    rating REAL,
+    exit_code INTEGER,
+    FOREIGN KEY (run_id, case_id) REFERENCES cases(run_id, case_id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS runs_agent_date ON runs (agent_name, date);
+CREATE INDEX IF NOT EXISTS runs_date ON runs (date);
+CREATE INDEX IF NOT EXISTS cases_hash ON cases (case_hash);
+CREATE INDEX IF NOT EXISTS case_labels_label ON case_labels (label, run_id, case_id);
+CREATE INDEX IF NOT EXISTS evaluations_case ON evaluations (run_id, case_id);
+CREATE INDEX IF NOT EXISTS evaluations_evaluator ON evaluations (evaluator);
+"""
+
+
+def case_hash(case: BenchmarkCase) -> str:
+    """Stable identifier of a benchmark case across runs"""
+    content = "\0".join([case.query, case.reference_answer or ""])
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+class ResultsWarehouse:
+    """
+    Local SQLite database of benchmark results, indexed by agent, date, label,
+    case hash and evaluator, to query trends and per-case history across runs
+    without re-parsing results files.
+    """
+
+    def __init__(self, path: str) -> None:
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self._connection = sqlite3.connect(path)
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        self._connection.executescript(_SCHEMA)
+
+    def __enter__(self) -> "ResultsWarehouse":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def ingest(self, output: RunOutput, replace: bool = False) -> str:
+        """
+        Adds a run and returns its run_id. A run already ingested under the same
+        run_id is only replaced if replace is set, otherwise it raises a ValueError.
+        """
+        run_id = output_run_id(output)
+        metrics = output.metrics
+        cases, labels, evaluations = [], [], []
+        for bm_output in output.benchmark_outputs:
+            cases.append(
+                (
+                    run_id,
+                    bm_output.id,
+                    case_hash(bm_output.info),
+                    bm_output.info.query,
+                    bm_output.repeats,
+                    bm_output.metrics.mean_rating,
+                    bm_output.mean_case_runtime,
+                )
+            )
+            labels.extend(
+                (run_id, bm_output.id, label) for label in bm_output.info.labels or []
+            )
+            for repeat, evaluation in enumerate(bm_output.evaluations):
+                exit_code = (
+                    bm_output.exit_codes[repeat]
+                    if repeat < len(bm_output.exit_codes)
+                    else None
+                )
+                evaluations.append(
+                    (
+                        run_id,
+                        bm_output.id,
+                        repeat,
+                        evaluation.evaluator if evaluation else None,
+                        evaluation.rating if evaluation else None,
+                        exit_code,
+                    )
+                )
+
+        with self._connection:
+            if self._connection.execute(
+                "SELECT 1 FROM runs WHERE run_id = ?", (run_id,)
+            ).fetchone():
+                if not replace:
+                    raise ValueError(f"Run {run_id} is already ingested")
+                self._connection.execute("DELETE FROM runs WHERE run_id = ?", (run_id,))
+            self._connection.execute(
+                "INSERT INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    run_id,
+                    output.agent_name,
+                    output.date,
+                    output.total_runtime,
+                    len(output.benchmark_outputs),
+                    metrics.mean_rating,
+                    metrics.std_dev,
+                    metrics.pass_rate,
+                ),
+            )
+            self._connection.executemany(
+                "INSERT INTO cases VALUES (?, ?, ?, ?, ?, ?, ?)", cases
+            )
+            self._connection.executemany(
+                "INSERT INTO case_labels VALUES (?, ?, ?)", labels
+            )
+            self._connection.executemany(
+                "INSERT INTO evaluations VALUES (?, ?, ?, ?, ?, ?)", evaluations
+            )
+        _logger.info("Ingested run %s with %s cases", run_id, len(cases))
+        return run_id
+
+    def ingest_file(self, path: str, replace: bool = False) -> list[str]:
+        """Adds every run of a results file saved by the BenchmarkRunner"""
+        return [
+            self.ingest(run, replace=replace) for run in load_run_results(path).runs
+        ]
+
+    def rating_trend(
+        self,
+        agent_name: str,
+        label: str | None = None,
+        last_runs: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Mean case rating of each run of an agent, oldest first, optionally only
+        over the cases with a label and over the last_runs most recent runs.
+        """
+        query = """
+            SELECT runs.run_id, runs.date, AVG(cases.mean_rating) AS mean_rating,
+                COUNT(cases.mean_rating) AS num_rated_cases,
+                COUNT(*) AS num_cases
+            FROM runs JOIN cases ON cases.run_id = runs.run_id
+        """
+        params: list[Any] = []
+        if label is not None:
+            query += """
+                JOIN case_labels ON case_labels.run_id = cases.run_id
+                    AND case_labels.case_id = cases.case_id
+                    AND case_labels.label = ?
+            """
+            params.append(label)
+        query += " WHERE runs.agent_name = ?"
+        params.append(agent_name)
+        if last_runs is not None:
+            query += """
+                AND runs.run_id IN (
+                    SELECT run_id FROM runs WHERE agent_name = ?
+                    ORDER BY date DESC LIMIT ?
+                )
+            """
+            params.extend([agent_name, last_runs])
+        query += " GROUP BY runs.run_id ORDER BY runs.date"
+        return self._fetch(query, params)
+
+    def case_history(
+        self, case_hash: str, agent_name: str | None = None
+    ) -> list[dict[str, Any]]:
+        """Results of a case in every run (of an agent) it was part of, oldest first"""
+        query = """
+            SELECT runs.run_id, runs.agent_name, runs.date, cases.case_id,
+                cases.repeats, cases.mean_rating, cases.mean_case_runtime
+            FROM cases JOIN runs ON runs.run_id = cases.run_id
+            WHERE cases.case_hash = ?
+        """
+        params: list[Any] = [case_hash]
+        if agent_name is not None:
+            query += " AND runs.agent_name = ?"
+            params.append(agent_name)
+        query += " ORDER BY runs.date"
+        return self._fetch(query, params)
+
+    def evaluator_summary(self, agent_name: str | None = None) -> list[dict[str, Any]]:
+        """Number of evaluations and mean rating given by each evaluator"""
+        query = """
+            SELECT evaluations.evaluator, COUNT(*) AS num_evaluations,
+                AVG(evaluations.rating) AS mean_rating
+            FROM evaluations JOIN runs ON runs.run_id = evaluations.run_id
+            WHERE evaluations.evaluator IS NOT NULL
+        """
+        params: list[Any] = []
+        if agent_name is not None:
+            query += " AND runs.agent_name = ?"
+            params.append(agent_name)
+        query += " GROUP BY evaluations.evaluator ORDER BY evaluations.evaluator"
+        return self._fetch(query, params)
+
+    def _fetch(self, query: str, params: list[Any]) -> list[dict[str, Any]]:
+        return [dict(row) for row in self._connection.execute(query, params)]
@@ -0,0 +1,73 @@
+# Copyright 2024 Recursive AI
+
+import numpy as np
+from pydantic import BaseModel, computed_field
+
+from .._internal._benchmark_output import case_mean_ratings
+from .._internal._metrics._statistics import (
+    bootstrap_confidence_interval,
+    paired_t_test,
+)
+from .._internal._run_output import RunOutput
+
+
+class RunComparison(BaseModel):
+    num_cases: int
+    confidence: float
+    baseline_mean_rating: float | None = None
+    candidate_mean_rating: float | None = None
+    mean_difference: float | None = None
+    mean_difference_ci: tuple[float, float] | None = None
+    effect_size: float | None = None
+    p_value: float | None = None
+
+    @computed_field
+    @property
+    def significant(self) -> bool:
+        return self.p_value is not None and self.p_value < 1 - self.confidence
+
+
+def compare_runs(
+    baseline: RunOutput,
+    candidate: RunOutput,
+    confidence: float = 0.95,
+    num_resamples: int = 2000,
+    seed: int | None = 0,
+) -> RunComparison:
+    """
+    Paired comparison of the per-case mean ratings of two runs over the same cases.
+
+    Cases without a valid rating in either run are left out. The effect size is the
+    mean difference over the standard deviation of the differences (Cohen's d_z),
+    the p-value comes from a paired t-test and the confidence interval of the mean
+    difference from a bootstrap.
+    """
+    baseline_outputs = {output.id: output for output in baseline.benchmark_outputs}
+    candidate_outputs = {output.id: output for output in candidate.benchmark_outputs}
+    if baseline_outputs.keys() != candidate_outputs.keys() or any(
+        output.info.query != candidate_outputs[idx].info.query
+        for idx, output in baseline_outputs.items()
+    ):
+        raise ValueError("Cannot compare runs over different benchmark cases")
+
+    ids = list(baseline_outputs)
+    ratings = np.column_stack(
+        [
+            case_mean_ratings([baseline_outputs[idx] for idx in ids]),
+            case_mean_ratings([candidate_outputs[idx] for idx in ids]),
+        ]
+    )
+    ratings = ratings[~np.isnan(ratings).any(axis=1)]
+    comparison = RunComparison(num_cases=len(ratings), confidence=confidence)
+    if not len(ratings):
+        return comparison
+
+    differences = ratings[:, 1] - ratings[:, 0]
+    comparison.baseline_mean_rating = float(ratings[:, 0].mean())
+    comparison.candidate_mean_rating = float(ratings[:, 1].mean())
+    comparison.mean_difference = float(differences.mean())
+    comparison.mean_difference_ci = bootstrap_confidence_interval(
+        differences, confidence=confidence, num_resamples=num_resamples, seed=seed
+    )
+    comparison.effect_size, comparison.p_value = paired_t_test(differences)
+    return comparison
@@ -0,0 +1,25 @@
+# Copyright 2024 Recursive AI
+
+from abc import abstractmethod
+from typing import AsyncIterator
+
+from .benchmark_agent import BenchmarkAgent
+from .benchmark_case import BenchmarkCase, BenchmarkCaseResponse
+
+
+class StreamingBenchmarkAgent(BenchmarkAgent):
+    """
+    Interface used to define semantic agents that stream their response.
+
+    The runner consumes the stream returned by `stream_benchmark_case` to measure
+    the time to first chunk, the gaps between chunks and the output throughput,
+    and evaluates the concatenation of all the chunks as the response.
+    """
+
+    @abstractmethod
+    def stream_benchmark_case(self, case: BenchmarkCase) -> AsyncIterator[str]:
+        raise NotImplementedError()
+
+    async def run_benchmark_case(self, case: BenchmarkCase) -> BenchmarkCaseResponse:
+        chunks = [chunk async for chunk in self.stream_benchmark_case(case)]
+        return BenchmarkCaseResponse(response="".join(chunks))
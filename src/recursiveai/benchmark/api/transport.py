@@ -0,0 +1,15 @@
+# Copyright 2024 Recursive AI
+
+from .._internal._llm._transport import (
+    TransportConfig,
+    configure_transport,
+    prewarm_connections,
+    shared_http_client,
+)
+
+__all__ = [
+    "TransportConfig",
+    "configure_transport",
+    "prewarm_connections",
+    "shared_http_client",
+]
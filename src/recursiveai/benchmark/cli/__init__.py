@@ -0,0 +1,319 @@
+# Copyright 2024 Recursive AI
+
+import argparse
+import asyncio
+import importlib
+import logging
+import os
+import sys
+
+# The api, and the provider SDKs behind the evaluators, are only imported by the
+# commands that need them, so the CLI starts quickly
+
+_logger = logging.getLogger(__name__)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="flow-benchmark", description="Flow benchmark tools"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    _add_run_parser(subparsers)
+    _add_compare_parser(subparsers)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    return args.handler(args)
+
+
+def _add_run_parser(subparsers) -> None:
+    parser = subparsers.add_parser(
+        "run",
+        help="Run an agent over a JSONL benchmark",
+        description=(
+            "Runs the agent returned by a factory over the cases of a JSONL benchmark "
+            "file and saves the results. Criteria evaluators run a criteria benchmark. "
+            "Exits with code 1 when a canary aborts a run."
+        ),
+    )
+    parser.add_argument("benchmark", help="JSONL file with one benchmark case per line")
+    parser.add_argument(
+        "--agent",
+        required=True,
+        help=(
+            "Agent as module:factory, where factory is a BenchmarkAgent or a callable "
+            "without arguments returning one, e.g. my_agents:MyAgent"
+        ),
+    )
+    parser.add_argument(
+        "--evaluator",
+        default="llm_judge_gpt-4o",
+        help=(
+            "Evaluator name, built in or registered through entry points "
+            "(default: llm_judge_gpt-4o)"
+        ),
+    )
+    parser.add_argument("--repeats", type=int, default=1)
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        help="Run cases in parallel, with at most this many cases at a time",
+    )
+    parser.add_argument(
+        "--http2",
+        action="store_true",
+        help="Use HTTP/2 for the judges' connections, requires h2",
+    )
+    parser.add_argument(
+        "--no-prewarm",
+        action="store_true",
+        help="Don't open the judges' connections before the first case",
+    )
+    parser.add_argument("--case-timeout", type=float)
+    parser.add_argument("--run-deadline", type=float)
+    parser.add_argument("--num-shards", type=int, default=1)
+    parser.add_argument(
+        "--shard-index",
+        type=int,
+        default=0,
+        help="Shard to run, from 0 to num-shards - 1",
+    )
+    parser.add_argument(
+        "--sample-size",
+        type=_sample_size,
+        help="Run a random sample of cases, a number of cases or a fraction below 1",
+    )
+    parser.add_argument("--seed", type=int, help="Seed of the case sample")
+    parser.add_argument(
+        "--canary-size",
+        type=_sample_size,
+        help="Run a canary of this many cases first, or a fraction below 1",
+    )
+    parser.add_argument(
+        "--canary-threshold",
+        type=float,
+        help="Abort the run when the canary's mean rating is surely below this",
+    )
+    parser.add_argument(
+        "--resume",
+        help="Results file of an earlier run, whose completed cases are not run again",
+    )
+    parser.add_argument("--results-folder", default="benchmark/results/")
+    parser.add_argument("--results-file", default="")
+    parser.add_argument(
+        "--format",
+        choices=["json", "compact-json", "normalized-json"],
+        default="json",
+        help="Results file format (default: json)",
+    )
+    parser.add_argument(
+        "--compression", choices=["none", "gzip", "zstd"], default="none"
+    )
+    parser.add_argument(
+        "--export",
+        choices=["parquet", "arrow"],
+        help="Also export the results tables to the results folder in this format",
+    )
+    parser.set_defaults(handler=_run)
+
+
+def _run(args: argparse.Namespace) -> int:
+    from ..api import (
+        Compression,
+        ExportFormat,
+        ResultsExporter,
+        ResultsLayout,
+        TransportConfig,
+    )
+    from ..api.util import create_run_from_jsonl
+
+    runner_class = _runner_class(args.evaluator)
+    run = create_run_from_jsonl(agent=load_agent(args.agent), jsonl_file=args.benchmark)
+    exporter = None
+    if args.export is not None:
+        exporter = ResultsExporter(
+            folder=args.results_folder, export_format=ExportFormat(args.export)
+        )
+
+    concurrency = {}
+    if args.max_concurrency is not None:
+        concurrency = {"parallel": True, "max_concurrency": args.max_concurrency}
+    transport = None
+    if args.http2 or args.max_concurrency is not None:
+        # The judges' connection pools are sized for the cases in flight
+        transport = TransportConfig(http2=args.http2)
+        if args.max_concurrency is not None:
+            transport.max_connections = args.max_concurrency
+    runner = runner_class(
+        runs=run,
+        evaluator=args.evaluator,
+        results_folder=args.results_folder,
+        results_file=args.results_file,
+        repeats=args.repeats,
+        case_timeout=args.case_timeout,
+        run_deadline=args.run_deadline,
+        exporter=exporter,
+        compact_results=args.format != "json",
+        results_compression=Compression(args.compression),
+        results_layout=(
+            ResultsLayout.NORMALIZED
+            if args.format == "normalized-json"
+            else ResultsLayout.NESTED
+        ),
+        num_shards=args.num_shards,
+        shard_index=args.shard_index,
+        sample_size=args.sample_size,
+        sample_seed=args.seed,
+        canary_size=args.canary_size,
+        canary_threshold=args.canary_threshold,
+        resume_from=args.resume,
+        transport=transport,
+        prewarm=not args.no_prewarm,
+        **concurrency,
+    )
+    results = asyncio.run(runner.run())
+
+    aborted = [
+        result.agent_name
+        for result in results
+        if result.canary is not None and not result.canary.passed
+    ]
+    if aborted:
+        _logger.error("Canary aborted the run of agents: %s", ", ".join(aborted))
+        return 1
+    return 0
+
+
+def load_agent(path: str):
+    """Loads the agent of a module:factory path, importing from the working folder"""
+    from ..api import BenchmarkAgent
+
+    module_name, _, attribute = path.partition(":")
+    if not module_name or not attribute:
+        raise SystemExit(f"Agent must be given as module:factory, got {path}")
+    if os.getcwd() not in sys.path:
+        sys.path.insert(0, os.getcwd())
+    factory = importlib.import_module(module_name)
+    for name in attribute.split("."):
+        factory = getattr(factory, name)
+    agent = factory if isinstance(factory, BenchmarkAgent) else factory()
+    if not isinstance(agent, BenchmarkAgent):
+        raise SystemExit(f"{path} did not return a BenchmarkAgent")
+    return agent
+
+
+def _runner_class(evaluator: str):
+    """Criteria evaluators need the CriteriaBenchmarkRunner"""
+    from .._internal._evaluators import CRITERIA_EVALUATORS, EVALUATORS
+    from ..api.benchmark_runner import BenchmarkRunner, CriteriaBenchmarkRunner
+
+    if evaluator in EVALUATORS.names():
+        return BenchmarkRunner
+    if evaluator in CRITERIA_EVALUATORS.names():
+        return CriteriaBenchmarkRunner
+    names = ", ".join(EVALUATORS.names() + CRITERIA_EVALUATORS.names())
+    raise SystemExit(f"Unknown evaluator {evaluator}, expected one of: {names}")
+
+
+def _sample_size(value: str) -> int | float:
+    size = float(value)
+    if size <= 0:
+        raise argparse.ArgumentTypeError("sample size must be positive")
+    if size < 1:
+        return size
+    if not size.is_integer():
+        raise argparse.ArgumentTypeError(
+            "sample size must be a whole number of cases or a fraction below 1"
+        )
+    return int(size)
+
+
+def _add_compare_parser(subparsers) -> None:
+    parser = subparsers.add_parser(
+        "compare",
+        help="Detect regressions of a candidate run against a baseline run",
+        description=(
+            "Compares a candidate results file against a baseline results file. "
+            "Exits with code 1 when a rating or latency regression is detected."
+        ),
+    )
+    parser.add_argument("baseline", help="Results file of the baseline run")
+    parser.add_argument("candidate", help="Results file of the candidate run")
+    parser.add_argument(
+        "--baseline-agent",
+        help="Agent of the baseline run, needed if the file holds several runs",
+    )
+    parser.add_argument(
+        "--candidate-agent",
+        help="Agent of the candidate run, needed if the file holds several runs",
+    )
+    parser.add_argument(
+        "--rating-drop-threshold",
+        type=float,
+        default=2.0,
+        help="Per-case drop in mean rating flagged as a regression (default: 2.0)",
+    )
+    parser.add_argument(
+        "--latency-increase-threshold",
+        type=float,
+        default=0.25,
+        help="Relative increase in runtime flagged as a regression (default: 0.25)",
+    )
+    parser.add_argument(
+        "--min-rating-effect",
+        type=float,
+        default=0.1,
+        help="Drop in the run's mean rating needed to fail the run (default: 0.1)",
+    )
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument(
+        "--max-reported-cases",
+        type=int,
+        default=100,
+        help="Number of regressed cases listed in the report (default: 100)",
+    )
+    parser.add_argument(
+        "--output", help="Write the JSON report to this file instead of stdout"
+    )
+    parser.set_defaults(handler=_compare)
+
+
+def _compare(args: argparse.Namespace) -> int:
+    from ..api.regression import detect_regressions
+    from ..api.results_io import load_run_results
+
+    report = detect_regressions(
+        baseline=_select_run(load_run_results(args.baseline), args.baseline_agent),
+        candidate=_select_run(load_run_results(args.candidate), args.candidate_agent),
+        rating_drop_threshold=args.rating_drop_threshold,
+        latency_increase_threshold=args.latency_increase_threshold,
+        min_rating_effect=args.min_rating_effect,
+        confidence=args.confidence,
+        max_reported_cases=args.max_reported_cases,
+    )
+    report_json = report.model_dump_json(indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report_json)
+    else:
+        sys.stdout.write(report_json + "\n")
+
+    if not report.passed:
+        _logger.error(
+            "Regression detected: rating=%s latency=%s",
+            report.rating.regression,
+            report.latency.regression,
+        )
+        return 1
+    return 0
+
+
+def _select_run(results, agent_name: str | None):
+    runs = results.runs
+    if agent_name is not None:
+        runs = [run for run in runs if run.agent_name == agent_name]
+    if len(runs) != 1:
+        raise SystemExit(
+            f"Expected a single run{f' of agent {agent_name}' if agent_name else ''}, found {len(runs)}"
+        )
+    return runs[0]
@@ -0,0 +1,7 @@
+# Copyright 2024 Recursive AI
+
+import sys
+
+from . import main
+
+sys.exit(main())
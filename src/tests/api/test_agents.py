@@ -5,7 +5,11 @@ from unittest.mock import AsyncMock, Mock
 import pytest
 
 from recursiveai.benchmark.api import ExitCode
-from recursiveai.benchmark.api.agents import AsyncCallbackAgent, CallbackAgent
+from recursiveai.benchmark.api.agents import (
+    AsyncCallbackAgent,
+    AsyncStreamingCallbackAgent,
+    CallbackAgent,
+)
 
 
 @pytest.mark.asyncio
@@ -46,3 +50,31 @@ async def test_async_callback_agent_failure(sample_benchmark_case):
     response = await agent.run_benchmark_case(case=sample_benchmark_case)
     assert response.exit_code == ExitCode.FAILED
     assert response.response == None
+
+
+@pytest.mark.asyncio
+async def test_async_streaming_callback_agent_success(sample_benchmark_case):
+    async def stream(query: str):
+        for word in query.split("_"):
+            yield word
+
+    agent = AsyncStreamingCallbackAgent(async_callback=stream)
+    chunks = [
+        chunk async for chunk in agent.stream_benchmark_case(sample_benchmark_case)
+    ]
+    assert chunks == ["test", "query"]
+    response = await agent.run_benchmark_case(case=sample_benchmark_case)
+    assert response.exit_code == ExitCode.SUCCESS
+    assert response.response == "testquery"
+
+
+@pytest.mark.asyncio
+async def test_async_streaming_callback_agent_failure(sample_benchmark_case):
+    async def fail_stream(_: str):
+        yield "partial"
+        raise Exception()
+
+    agent = AsyncStreamingCallbackAgent(async_callback=fail_stream)
+    response = await agent.run_benchmark_case(case=sample_benchmark_case)
+    assert response.exit_code == ExitCode.FAILED
+    assert response.response == None
@@ -0,0 +1,129 @@
+# Copyright 2024 Recursive AI
+
+import pytest
+
+from recursiveai.benchmark._internal._benchmark_output import BenchmarkOutput
+from recursiveai.benchmark._internal._run_output import RunOutput
+from recursiveai.benchmark.api import (
+    BenchmarkCase,
+    Compression,
+    RunResults,
+    load_run_results,
+)
+from recursiveai.benchmark.api.results_io import save_results
+from recursiveai.benchmark.cli import main
+
+_AGENT_MODULE = """
+from recursiveai.benchmark.api import BenchmarkAgent, BenchmarkCaseResponse
+
+
+class EchoAgent(BenchmarkAgent):
+    async def run_benchmark_case(self, case):
+        return BenchmarkCaseResponse(response=case.query)
+"""
+
+
+def _run_output(sample_evaluation, ratings):
+    outputs = [
+        BenchmarkOutput(
+            id=idx,
+            info=BenchmarkCase(query=f"query {idx}", reference_answer="answer"),
+            evaluations=[sample_evaluation.model_copy(update={"ratings": [rating]})],
+            mean_case_runtime=1.0,
+        )
+        for idx, rating in enumerate(ratings)
+    ]
+    return RunOutput(date="date", agent_name="agent", benchmark_outputs=outputs)
+
+
+@pytest.fixture
+def benchmark_file(tmp_path, monkeypatch, benchmark_case_list):
+    (tmp_path / "cli_test_agents.py").write_text(_AGENT_MODULE)
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / "benchmark.jsonl"
+    path.write_text(
+        "\n".join(
+            case.model_copy(update={"query": f"q{idx}"}).model_dump_json()
+            for idx in range(6)
+            for case in benchmark_case_list[:1]
+        )
+    )
+    return path
+
+
+def test_cli_run_shard(tmp_path, benchmark_file):
+    argv = [
+        "run",
+        str(benchmark_file),
+        "--agent=cli_test_agents:EchoAgent",
+        "--evaluator=happy",
+        "--max-concurrency=4",
+        "--num-shards=2",
+        "--shard-index=1",
+        "--format=compact-json",
+        f"--results-folder={tmp_path}",
+        "--results-file=results.json",
+    ]
+    assert main(argv) == 0
+
+    (result,) = load_run_results(str(tmp_path / "results.json")).runs
+    assert [output.id for output in result.benchmark_outputs] == [1, 3, 5]
+    assert [output.info.query for output in result.benchmark_outputs] == [
+        "q1",
+        "q3",
+        "q5",
+    ]
+
+
+def test_cli_run_canary_abort(tmp_path, benchmark_file):
+    argv = [
+        "run",
+        str(benchmark_file),
+        "--agent=cli_test_agents:EchoAgent",
+        "--evaluator=happy",
+        "--canary-size=2",
+        "--canary-threshold=11",
+        f"--results-folder={tmp_path}",
+        "--results-file=results.json",
+    ]
+    assert main(argv) == 1
+
+    (result,) = load_run_results(str(tmp_path / "results.json")).runs
+    assert not result.canary.passed
+    assert len(result.benchmark_outputs) == 2
+
+
+@pytest.mark.parametrize(argnames="size", argvalues=["1.5", "0", "-2"])
+def test_cli_run_invalid_sample_size(benchmark_file, size):
+    with pytest.raises(SystemExit) as excinfo:
+        main(["run", str(benchmark_file), "--agent=x:y", f"--sample-size={size}"])
+    # Rejected by the argument parser, before the agent is loaded
+    assert excinfo.value.code == 2
+
+
+def test_cli_run_invalid_agent(benchmark_file):
+    with pytest.raises(SystemExit):
+        main(["run", str(benchmark_file), "--agent=cli_test_agents"])
+    with pytest.raises(SystemExit):
+        main(["run", str(benchmark_file), "--agent=x:y", "--evaluator=unknown"])
+
+
+def test_cli_compare(tmp_path, sample_evaluation):
+    baseline_path = tmp_path / "baseline.json"
+    candidate_path = tmp_path / "candidate.json"
+    report_path = tmp_path / "report.json"
+    for path, ratings in [
+        (baseline_path, [8, 8, 9, 8, 9, 8, 9, 8]),
+        (candidate_path, [5, 8, 6, 7, 8, 5, 8, 6]),
+    ]:
+        save_results(
+            RunResults(runs=[_run_output(sample_evaluation, ratings)]).model_dump(),
+            str(path),
+            compression=Compression.NONE,
+        )
+
+    argv = ["compare", str(baseline_path), str(baseline_path)]
+    assert main(argv) == 0
+    argv = ["compare", str(baseline_path), str(candidate_path)]
+    assert main([*argv, "--output", str(report_path)]) == 1
+    assert '"passed": false' in report_path.read_text()
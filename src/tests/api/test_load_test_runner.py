@@ -0,0 +1,267 @@
+# Copyright 2024 Recursive AI
+
+import asyncio
+import json
+import os
+from unittest.mock import AsyncMock
+
+import numpy as np
+import pytest
+
+from recursiveai.benchmark.api import (
+    ArrivalProcess,
+    BatchBenchmarkAgent,
+    Benchmark,
+    BenchmarkCaseResponse,
+    BenchmarkRun,
+    Compression,
+    ExitCode,
+    LoadStep,
+    LoadTestRunner,
+    qps_ramp,
+)
+from recursiveai.benchmark.api.agents import AsyncStreamingCallbackAgent
+from recursiveai.benchmark.api.results_io import load_results
+
+
+@pytest.fixture
+def load_test_agent():
+    async def run_benchmark_case(_):
+        await asyncio.sleep(0.01)
+        return BenchmarkCaseResponse(exit_code=ExitCode.SUCCESS, response="success")
+
+    agent = AsyncMock()
+    agent.name = "test_agent"
+    agent.run_benchmark_case = run_benchmark_case
+    return agent
+
+
+def test_qps_ramp():
+    steps = qps_ramp(start_qps=10, stop_qps=30, step_qps=10, step_duration=5)
+    assert [step.qps for step in steps] == [10, 20, 30]
+    assert all([step.duration == 5 for step in steps])
+
+
+def test_invalid_load_step():
+    with pytest.raises(ValueError):
+        LoadTestRunner(runs=[], steps=LoadStep(qps=0, duration=1))
+
+
+def test_constant_arrival_times():
+    runner = LoadTestRunner(
+        runs=[],
+        steps=[],
+        arrival_process=ArrivalProcess.CONSTANT,
+    )
+    arrivals = runner._arrival_times(LoadStep(qps=10, duration=2))
+    assert len(arrivals) == 20
+    assert np.allclose(np.diff(arrivals), 0.1)
+
+
+def test_poisson_arrival_times():
+    runner = LoadTestRunner(runs=[], steps=[], seed=1)
+    arrivals = runner._arrival_times(LoadStep(qps=100, duration=100))
+    assert all([0 <= arrival < 100 for arrival in arrivals])
+    assert len(arrivals) == pytest.approx(10000, rel=0.05)
+
+
+@pytest.mark.asyncio
+async def test_execute_run_constant_load(load_test_agent, benchmark_case_list):
+    run = BenchmarkRun(
+        agent=load_test_agent, benchmark=Benchmark(cases=benchmark_case_list)
+    )
+    runner = LoadTestRunner(
+        runs=[],
+        steps=[LoadStep(qps=50, duration=0.2), LoadStep(qps=100, duration=0.2)],
+        arrival_process=ArrivalProcess.CONSTANT,
+    )
+    result = await runner._execute_run(run=run)
+
+    load_test_agent.before_run.assert_awaited_once()
+    load_test_agent.after_run.assert_awaited_once()
+    assert len(result.steps) == 2
+    assert result.steps[0].num_requests == 10
+    assert result.steps[1].num_requests == 20
+    for step in result.steps:
+        assert step.num_errors == 0
+        assert step.error_rate == 0.0
+        assert len(step.queue_delays) == step.num_requests
+        assert step.latency["min"] >= 0.01
+        assert step.achieved_throughput > 0.0
+
+
+@pytest.mark.asyncio
+async def test_execute_run_load_errors(benchmark_case_list):
+    agent = AsyncMock()
+    agent.name = "test_agent"
+    agent.run_benchmark_case = AsyncMock(
+        side_effect=[
+            BenchmarkCaseResponse(exit_code=ExitCode.SUCCESS, response="success"),
+            BenchmarkCaseResponse(exit_code=ExitCode.FAILED),
+            Exception(),
+            BenchmarkCaseResponse(exit_code=ExitCode.SUCCESS, response="success"),
+        ]
+    )
+    run = BenchmarkRun(agent=agent, benchmark=Benchmark(cases=benchmark_case_list))
+    runner = LoadTestRunner(
+        runs=[],
+        steps=LoadStep(qps=40, duration=0.1),
+        arrival_process=ArrivalProcess.CONSTANT,
+    )
+    result = await runner._execute_run(run=run)
+
+    step = result.steps[0]
+    assert step.num_requests == 4
+    assert step.num_errors == 2
+    assert step.error_rate == 0.5
+    assert len(step.latencies) == 2
+
+
+@pytest.mark.asyncio
+async def test_execute_run_load_queue_delay(load_test_agent, benchmark_case_list):
+    run = BenchmarkRun(
+        agent=load_test_agent, benchmark=Benchmark(cases=benchmark_case_list)
+    )
+    runner = LoadTestRunner(
+        runs=[],
+        steps=LoadStep(qps=1000, duration=0.01),
+        arrival_process=ArrivalProcess.CONSTANT,
+        max_concurrency=1,
+    )
+    result = await runner._execute_run(run=run)
+
+    step = result.steps[0]
+    assert step.num_requests == 10
+    assert step.queue_delay["max"] >= 0.05
+
+
+@pytest.mark.asyncio
+async def test_execute_run_load_streaming_agent(benchmark_case_list):
+    async def stream(_):
+        for chunk in ["suc", "cess"]:
+            await asyncio.sleep(0.005)
+            yield chunk
+
+    agent = AsyncStreamingCallbackAgent(async_callback=stream)
+    run = BenchmarkRun(agent=agent, benchmark=Benchmark(cases=benchmark_case_list))
+    runner = LoadTestRunner(
+        runs=[],
+        steps=LoadStep(qps=40, duration=0.1),
+        arrival_process=ArrivalProcess.CONSTANT,
+    )
+    result = await runner._execute_run(run=run)
+
+    step = result.steps[0]
+    assert step.num_requests == 4
+    assert step.num_errors == 0
+    assert step.latency["min"] >= 0.01
+
+
+@pytest.mark.asyncio
+async def test_execute_run_load_case_timeout(benchmark_case_list):
+    async def run_benchmark_case(_):
+        await asyncio.sleep(1.0)
+        return BenchmarkCaseResponse(exit_code=ExitCode.SUCCESS, response="success")
+
+    agent = AsyncMock()
+    agent.name = "test_agent"
+    agent.run_benchmark_case = run_benchmark_case
+    run = BenchmarkRun(agent=agent, benchmark=Benchmark(cases=benchmark_case_list))
+    runner = LoadTestRunner(
+        runs=[],
+        steps=LoadStep(qps=40, duration=0.1),
+        arrival_process=ArrivalProcess.CONSTANT,
+        case_timeout=0.01,
+    )
+    result = await runner._execute_run(run=run)
+
+    step = result.steps[0]
+    assert step.num_requests == 4
+    assert step.num_errors == 4
+    assert step.elapsed < 0.5
+
+
+@pytest.mark.asyncio
+async def test_load_test_save_results(load_test_agent, benchmark_case_list):
+    run = BenchmarkRun(
+        agent=load_test_agent, benchmark=Benchmark(cases=benchmark_case_list)
+    )
+    runner = LoadTestRunner(
+        runs=run,
+        steps=LoadStep(qps=20, duration=0.1),
+        results_folder="load_test_temp",
+        results_file="results.json",
+    )
+    try:
+        outputs = await runner.run()
+        with open("load_test_temp/results.json", "r") as f:
+            results = json.load(f)
+        assert len(results["runs"]) == 1
+        assert results["runs"][0] == outputs[0].model_dump()
+        assert results["runs"][0]["agent_name"] == "test_agent"
+    finally:
+        try:
+            os.remove("load_test_temp/results.json")
+            os.rmdir("load_test_temp")
+        except OSError:
+            pass
+
+
+@pytest.mark.asyncio
+async def test_load_test_save_compressed_results(
+    tmp_path, load_test_agent, benchmark_case_list
+):
+    run = BenchmarkRun(
+        agent=load_test_agent, benchmark=Benchmark(cases=benchmark_case_list)
+    )
+    runner = LoadTestRunner(
+        runs=run,
+        steps=LoadStep(qps=20, duration=0.1),
+        results_folder=str(tmp_path),
+        results_file="results.json",
+        compact_results=True,
+        results_compression=Compression.GZIP,
+    )
+    await runner.run()
+
+    results = load_results(str(tmp_path / "results.json.gz"))
+    assert results["runs"][0]["agent_name"] == "test_agent"
+
+
+class _SlowBatchAgent(BatchBenchmarkAgent):
+    def __init__(self) -> None:
+        self.batches = []
+
+    async def run_benchmark_cases(self, cases):
+        self.batches.append(len(cases))
+        await asyncio.sleep(0.01)
+        return [
+            BenchmarkCaseResponse(exit_code=ExitCode.SUCCESS, response="success")
+            for _ in cases
+        ]
+
+    @property
+    def max_batch_size(self) -> int:
+        return 8
+
+    @property
+    def max_batch_wait(self) -> float:
+        return 1.0
+
+
+@pytest.mark.asyncio
+async def test_execute_run_load_batch_agent(benchmark_case_list):
+    agent = _SlowBatchAgent()
+    run = BenchmarkRun(agent=agent, benchmark=Benchmark(cases=benchmark_case_list))
+    runner = LoadTestRunner(
+        runs=[],
+        steps=LoadStep(qps=10, duration=0.3),
+        arrival_process=ArrivalProcess.CONSTANT,
+    )
+    result = await asyncio.wait_for(runner._execute_run(run=run), timeout=1.0)
+
+    step = result.steps[0]
+    # Each request is sent alone right away, since no other one is in flight
+    assert agent.batches == [1, 1, 1]
+    assert step.num_errors == 0
+    assert all([latency < 0.1 for latency in step.latencies])
@@ -0,0 +1,89 @@
+# Copyright 2024 Recursive AI
+
+import pytest
+
+from recursiveai.benchmark._internal._benchmark_output import BenchmarkOutput
+from recursiveai.benchmark._internal._run_output import RunOutput
+from recursiveai.benchmark.api import BenchmarkCase, detect_regressions
+
+
+def _run_output(sample_evaluation, ratings, runtimes=None, case_ids=None):
+    case_ids = case_ids or list(range(len(ratings)))
+    runtimes = runtimes or [1.0] * len(ratings)
+    outputs = []
+    for idx, rating, runtime in zip(case_ids, ratings, runtimes):
+        outputs.append(
+            BenchmarkOutput(
+                id=idx,
+                info=BenchmarkCase(query=f"query {idx}", reference_answer="answer"),
+                evaluations=[
+                    sample_evaluation.model_copy(update={"ratings": [rating]})
+                ],
+                mean_case_runtime=runtime,
+            )
+        )
+    return RunOutput(date="date", agent_name="agent", benchmark_outputs=outputs)
+
+
+def test_detect_regressions_rating(sample_evaluation):
+    baseline = _run_output(sample_evaluation, [8, 8, 9, 8, 9, 8, 9, 8])
+    candidate = _run_output(sample_evaluation, [5, 8, 6, 7, 8, 5, 8, 6])
+    report = detect_regressions(baseline, candidate, max_reported_cases=2)
+
+    assert report.num_aligned_cases == 8
+    assert report.rating.regression
+    assert not report.latency.regression
+    assert not report.passed
+    assert report.rating.num_regressed_cases == 4
+    assert [case.case_id for case in report.rating.regressed_cases] == [0, 2]
+    assert report.rating.regressed_cases[0].change == -3
+
+
+def test_detect_regressions_latency(sample_evaluation):
+    ratings = [8] * 6
+    baseline = _run_output(sample_evaluation, ratings, [1.0, 1.1, 0.9, 1.0, 1.2, 1.0])
+    candidate = _run_output(sample_evaluation, ratings, [2.0, 2.1, 1.8, 2.2, 2.0, 1.9])
+    report = detect_regressions(baseline, candidate)
+
+    assert not report.rating.regression
+    assert report.latency.regression
+    assert report.latency.num_regressed_cases == 6
+    assert report.latency.mean_difference == pytest.approx(29 / 30)
+
+
+def test_detect_regressions_aligns_by_case(sample_evaluation):
+    baseline = _run_output(sample_evaluation, [5, 6, 7], case_ids=[0, 1, 2])
+    candidate = _run_output(sample_evaluation, [9, 7, 6], case_ids=[3, 2, 1])
+    report = detect_regressions(baseline, candidate)
+
+    assert report.num_aligned_cases == 2
+    assert report.num_missing_cases == 1
+    assert report.num_new_cases == 1
+    assert report.rating.mean_difference == 0
+    assert report.passed
+
+
+def test_detect_regressions_aligns_repeated_cases(sample_evaluation):
+    baseline = _run_output(sample_evaluation, [8, 8, 8], case_ids=[0, 0, 0])
+    candidate = _run_output(sample_evaluation, [8, 2, 8], case_ids=[0, 0, 0])
+    report = detect_regressions(baseline, candidate)
+
+    assert report.num_aligned_cases == 3
+    assert report.num_missing_cases == 0
+    assert report.num_new_cases == 0
+    assert report.rating.num_regressed_cases == 1
+    assert report.rating.regressed_cases[0].change == -6
+
+
+def test_detect_regressions_min_rating_effect(sample_evaluation):
+    # A mean drop of 0.05 points, significant over 400 cases
+    baseline = _run_output(sample_evaluation, [8] * 400)
+    candidate = _run_output(sample_evaluation, [7] * 20 + [8] * 380)
+
+    report = detect_regressions(baseline, candidate)
+    assert report.rating.p_value < 0.05
+    assert not report.rating.regression
+    assert report.passed
+
+    report = detect_regressions(baseline, candidate, min_rating_effect=0.0)
+    assert report.rating.regression
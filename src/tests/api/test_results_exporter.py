@@ -0,0 +1,179 @@
+# Copyright 2024 Recursive AI
+
+import importlib.util
+from unittest.mock import AsyncMock
+
+import pytest
+
+from recursiveai.benchmark._internal._benchmark_output import BenchmarkOutput
+from recursiveai.benchmark._internal._run_output import RunOutput
+from recursiveai.benchmark.api import (
+    Benchmark,
+    BenchmarkCaseResponse,
+    BenchmarkRun,
+    BenchmarkRunner,
+    ExitCode,
+    ExportFormat,
+    ResultsExporter,
+)
+from recursiveai.benchmark.api.benchmark_evaluator import Evaluator
+
+_HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+
+@pytest.fixture
+def run_output(benchmark_case_list, sample_evaluation):
+    jury_evaluation = sample_evaluation.model_copy(
+        update={
+            "evaluator": "llm_jury model_a,model_b",
+            "evaluation": ["good", "fair"],
+            "ratings": [8, 6],
+        }
+    )
+    return RunOutput(
+        date="2024-01-01_00-00-00",
+        agent_name="test_agent",
+        benchmark_outputs=[
+            BenchmarkOutput(
+                id=idx,
+                info=case,
+                repeats=2,
+                evaluations=[jury_evaluation, None],
+                exit_codes=[ExitCode.SUCCESS, ExitCode.FAILED],
+            )
+            for idx, case in enumerate(benchmark_case_list)
+        ],
+    )
+
+
+@pytest.mark.skipif(_HAS_PYARROW, reason="pyarrow is installed")
+def test_results_exporter_requires_pyarrow(tmp_path):
+    with pytest.raises(ImportError):
+        ResultsExporter(folder=str(tmp_path))
+
+
+@pytest.mark.skipif(not _HAS_PYARROW, reason="pyarrow is not installed")
+def test_results_exporter_parquet(tmp_path, run_output):
+    import pyarrow.parquet
+
+    with ResultsExporter(folder=str(tmp_path), row_group_size=2) as exporter:
+        exporter.export([run_output])
+
+    runs = pyarrow.parquet.read_table(exporter.path("runs"))
+    cases = pyarrow.parquet.read_table(exporter.path("cases"))
+    repeats = pyarrow.parquet.read_table(exporter.path("repeats"))
+    judges = pyarrow.parquet.read_table(exporter.path("judges"))
+    assert runs.num_rows == 1
+    assert cases.num_rows == 3
+    assert repeats.num_rows == 6
+    assert judges.num_rows == 6
+    assert judges.column("judge_name").to_pylist()[:2] == ["model_a", "model_b"]
+    assert repeats.column("exit_code").to_pylist()[:2] == ["SUCCESS", "FAILED"]
+    assert pyarrow.parquet.ParquetFile(exporter.path("cases")).num_row_groups > 1
+
+
+@pytest.mark.skipif(not _HAS_PYARROW, reason="pyarrow is not installed")
+def test_results_exporter_arrow_without_text(tmp_path, run_output):
+    import pyarrow.ipc
+
+    with ResultsExporter(
+        folder=str(tmp_path), export_format=ExportFormat.ARROW, include_text=False
+    ) as exporter:
+        exporter.export([run_output])
+
+    cases = pyarrow.ipc.open_file(exporter.path("cases")).read_all()
+    assert cases.num_rows == 3
+    assert "query" not in cases.column_names
+    assert "reference_answer" not in cases.column_names
+
+
+@pytest.mark.skipif(not _HAS_PYARROW, reason="pyarrow is not installed")
+@pytest.mark.asyncio
+async def test_runner_exports_cases_as_they_complete(tmp_path, benchmark_case_list):
+    import pyarrow.parquet
+
+    agent = AsyncMock()
+    agent.name = "test_agent"
+    agent.run_benchmark_case = AsyncMock(
+        return_value=BenchmarkCaseResponse(
+            exit_code=ExitCode.SUCCESS, response="success"
+        )
+    )
+    run = BenchmarkRun(agent=agent, benchmark=Benchmark(cases=benchmark_case_list))
+    exporter = ResultsExporter(folder=str(tmp_path), row_group_size=1)
+    runner = BenchmarkRunner(
+        runs=run,
+        evaluator=Evaluator.HAPPY,
+        repeats=2,
+        results_folder=str(tmp_path),
+        exporter=exporter,
+    )
+    await runner.run()
+
+    repeats = pyarrow.parquet.read_table(exporter.path("repeats"))
+    assert repeats.num_rows == 6
+    assert pyarrow.parquet.read_table(exporter.path("runs")).num_rows == 1
+    assert pyarrow.parquet.ParquetFile(exporter.path("cases")).num_row_groups == 3
+
+
+@pytest.mark.skipif(not _HAS_PYARROW, reason="pyarrow is not installed")
+@pytest.mark.asyncio
+async def test_runner_exporter_context_manager(tmp_path, benchmark_case_list):
+    import pyarrow.parquet
+
+    agent = AsyncMock()
+    agent.name = "test_agent"
+    agent.run_benchmark_case = AsyncMock(
+        return_value=BenchmarkCaseResponse(
+            exit_code=ExitCode.SUCCESS, response="success"
+        )
+    )
+    run = BenchmarkRun(agent=agent, benchmark=Benchmark(cases=benchmark_case_list))
+    with ResultsExporter(folder=str(tmp_path)) as exporter:
+        runner = BenchmarkRunner(
+            runs=run,
+            evaluator=Evaluator.HAPPY,
+            results_folder=str(tmp_path),
+            exporter=exporter,
+        )
+        await runner.run()
+    exporter.close()
+
+    assert pyarrow.parquet.read_table(exporter.path("cases")).num_rows == 3
+    assert pyarrow.parquet.read_table(exporter.path("runs")).num_rows == 1
+
+
+@pytest.mark.skipif(not _HAS_PYARROW, reason="pyarrow is not installed")
+def test_results_exporter_keeps_earlier_exports(tmp_path, run_output):
+    import pyarrow.parquet
+
+    for _ in range(2):
+        with ResultsExporter(folder=str(tmp_path)) as exporter:
+            exporter.export([run_output])
+
+    assert len(list((tmp_path / "cases").iterdir())) == 2
+    assert pyarrow.parquet.read_table(tmp_path / "cases").num_rows == 6
+    assert pyarrow.parquet.read_table(tmp_path / "runs").num_rows == 2
+
+
+@pytest.mark.skipif(not _HAS_PYARROW, reason="pyarrow is not installed")
+@pytest.mark.asyncio
+async def test_results_exporter_closed(tmp_path, run_output, benchmark_case_list):
+    exporter = ResultsExporter(folder=str(tmp_path))
+    exporter.close()
+    assert exporter.closed
+    with pytest.raises(ValueError):
+        exporter.add_run(run_id="run", output=run_output)
+
+    agent = AsyncMock()
+    agent.name = "test_agent"
+    run = BenchmarkRun(agent=agent, benchmark=Benchmark(cases=benchmark_case_list))
+    runner = BenchmarkRunner(
+        runs=run,
+        evaluator=Evaluator.HAPPY,
+        results_folder=str(tmp_path),
+        exporter=exporter,
+    )
+    with pytest.raises(ValueError):
+        await runner.run()
+    agent.before_run.assert_not_awaited()
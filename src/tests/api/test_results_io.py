@@ -0,0 +1,143 @@
+# Copyright 2024 Recursive AI
+
+import importlib.util
+import json
+
+import pytest
+
+from recursiveai.benchmark._internal._benchmark_output import BenchmarkOutput
+from recursiveai.benchmark._internal._normalized_results import (
+    denormalize_results,
+    normalize_results,
+)
+from recursiveai.benchmark._internal._run_output import RunOutput
+from recursiveai.benchmark.api import Compression, ResultsLayout, load_run_results
+from recursiveai.benchmark.api.results_io import (
+    dumps_results,
+    iter_results_json,
+    save_results,
+)
+
+
+@pytest.fixture
+def results(benchmark_case_list, sample_evaluation):
+    run_output = RunOutput(
+        date="2024-01-01_00-00-00",
+        agent_name="test_agent",
+        benchmark_outputs=[
+            BenchmarkOutput(
+                id=idx,
+                info=case,
+                repeats=2,
+                evaluations=[sample_evaluation, None],
+                case_runtimes=[0.5],
+            )
+            for idx, case in enumerate(benchmark_case_list)
+        ],
+        total_runtime=2.0,
+    )
+    return {"total_runtime": 3.0, "runs": [run_output.model_dump()]}
+
+
+def test_dumps_results_compact(results):
+    compact = dumps_results(results, compact=True)
+    indented = dumps_results(results, compact=False)
+    assert len(compact) < 0.8 * len(indented)
+
+
+def test_iter_results_json(results):
+    chunks = list(iter_results_json(results, compact=True))
+    # Each case is encoded on its own
+    assert len(chunks) > len(results["runs"][0]["benchmark_outputs"])
+    assert json.loads(b"".join(chunks)) == json.loads(json.dumps(results))
+    indented = b"".join(iter_results_json(results, compact=False))
+    assert indented == json.dumps(results, ensure_ascii=False, indent=4).encode()
+
+
+@pytest.mark.parametrize(
+    argnames="compression",
+    argvalues=[
+        Compression.NONE,
+        Compression.GZIP,
+        pytest.param(
+            Compression.ZSTD,
+            marks=pytest.mark.skipif(
+                importlib.util.find_spec("zstandard") is None,
+                reason="zstandard is not installed",
+            ),
+        ),
+    ],
+)
+def test_save_and_load_run_results(tmp_path, results, compression):
+    path = save_results(
+        results, path=str(tmp_path / "results.json"), compression=compression
+    )
+    assert path.endswith(f".json{compression.extension}")
+
+    loaded = load_run_results(path)
+    assert loaded.total_runtime == 3.0
+    run = loaded.runs[0]
+    assert run.agent_name == "test_agent"
+    assert len(run.benchmark_outputs) == 3
+    assert run.benchmark_outputs[0].evaluations[1] is None
+    metrics = results["runs"][0]["metrics"]
+    assert run.metrics.mean_rating == pytest.approx(metrics["mean_rating"])
+    assert run.metrics.histogram == metrics["histogram"]
+    assert run.metrics.latency == pytest.approx(metrics["latency"])
+
+
+@pytest.fixture
+def long_text_results(benchmark_case_list, sample_evaluation):
+    case = benchmark_case_list[0].model_copy(
+        update={"reference_answer": "long reference " * 100}
+    )
+    evaluation = sample_evaluation.model_copy(
+        update={
+            "query": case.query,
+            "reference_answer": case.reference_answer,
+            "test_answer": "long answer " * 50,
+        }
+    )
+    run_output = RunOutput(
+        date="2024-01-01_00-00-00",
+        agent_name="test_agent",
+        benchmark_outputs=[
+            BenchmarkOutput(
+                id=idx,
+                info=case,
+                repeats=3,
+                evaluations=[evaluation, None, evaluation],
+            )
+            for idx in range(4)
+        ],
+    )
+    return {"total_runtime": 1.0, "runs": [run_output.model_dump()] * 2}
+
+
+def test_normalize_results_roundtrip(long_text_results):
+    normalized = normalize_results(long_text_results)
+    assert len(normalized["texts"]) == 2
+    assert len(dumps_results(normalized)) < len(dumps_results(long_text_results)) / 5
+
+    denormalized = denormalize_results(json.loads(dumps_results(normalized)))
+    assert json.loads(dumps_results(denormalized)) == json.loads(
+        dumps_results(long_text_results)
+    )
+
+
+def test_load_normalized_run_results(tmp_path, long_text_results):
+    path = save_results(
+        long_text_results,
+        path=str(tmp_path / "results.json"),
+        layout=ResultsLayout.NORMALIZED,
+    )
+    loaded = load_run_results(path)
+
+    outputs = loaded.runs[0].benchmark_outputs
+    assert len(outputs) == 4
+    assert outputs[0].evaluations[1] is None
+    evaluation = outputs[0].evaluations[0]
+    assert evaluation.reference_answer == outputs[0].info.reference_answer
+    # Texts are shared between the loaded objects
+    assert evaluation.test_answer is outputs[3].evaluations[2].test_answer
+    assert outputs[0].info.reference_answer is outputs[1].info.reference_answer
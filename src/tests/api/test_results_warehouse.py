@@ -0,0 +1,142 @@
+# Copyright 2024 Recursive AI
+
+from unittest.mock import AsyncMock
+
+import pytest
+
+from recursiveai.benchmark._internal._benchmark_output import BenchmarkOutput
+from recursiveai.benchmark._internal._run_output import RunOutput
+from recursiveai.benchmark.api import (
+    Benchmark,
+    BenchmarkCaseResponse,
+    BenchmarkRun,
+    BenchmarkRunner,
+    ExitCode,
+    ResultsWarehouse,
+    case_hash,
+)
+from recursiveai.benchmark.api.benchmark_evaluator import Evaluator
+
+
+def _run_output(benchmark_case_list, sample_evaluation, agent_name, date, rating):
+    cases = [
+        case.model_copy(update={"query": f"q{idx}", "labels": [f"label{idx % 2}"]})
+        for idx, case in enumerate(benchmark_case_list)
+    ]
+    evaluation = sample_evaluation.model_copy(update={"ratings": [rating]})
+    return RunOutput(
+        date=date,
+        agent_name=agent_name,
+        benchmark_outputs=[
+            BenchmarkOutput(
+                id=idx,
+                info=case,
+                repeats=2,
+                evaluations=[evaluation, None],
+                exit_codes=[ExitCode.SUCCESS, ExitCode.FAILED],
+            )
+            for idx, case in enumerate(cases)
+        ],
+    )
+
+
+@pytest.fixture
+def warehouse(tmp_path, benchmark_case_list, sample_evaluation):
+    with ResultsWarehouse(str(tmp_path / "results.db")) as warehouse:
+        for day, rating in enumerate([5, 6, 7]):
+            warehouse.ingest(
+                _run_output(
+                    benchmark_case_list,
+                    sample_evaluation,
+                    agent_name="agent_x",
+                    date=f"2024-01-0{day + 1}_00-00-00",
+                    rating=rating,
+                )
+            )
+        warehouse.ingest(
+            _run_output(
+                benchmark_case_list,
+                sample_evaluation,
+                agent_name="agent_y",
+                date="2024-01-02_00-00-00",
+                rating=9,
+            )
+        )
+        yield warehouse
+
+
+def test_rating_trend(warehouse):
+    trend = warehouse.rating_trend(agent_name="agent_x")
+    assert [row["mean_rating"] for row in trend] == [5, 6, 7]
+    assert [row["num_cases"] for row in trend] == [3, 3, 3]
+
+
+def test_rating_trend_label_and_last_runs(warehouse):
+    trend = warehouse.rating_trend(agent_name="agent_x", label="label1", last_runs=2)
+    assert [row["date"] for row in trend] == [
+        "2024-01-02_00-00-00",
+        "2024-01-03_00-00-00",
+    ]
+    assert [row["num_cases"] for row in trend] == [1, 1]
+
+
+def test_case_history(warehouse, benchmark_case_list):
+    case = benchmark_case_list[0].model_copy(update={"query": "q0"})
+    history = warehouse.case_history(case_hash(case))
+    assert len(history) == 4
+    history = warehouse.case_history(case_hash(case), agent_name="agent_y")
+    assert [row["mean_rating"] for row in history] == [9]
+
+
+def test_evaluator_summary(warehouse):
+    summary = warehouse.evaluator_summary(agent_name="agent_x")
+    assert summary == [
+        {"evaluator": "test_evaluator", "num_evaluations": 9, "mean_rating": 6.0}
+    ]
+
+
+def test_ingest_replaces_run(warehouse, benchmark_case_list, sample_evaluation):
+    output = _run_output(
+        benchmark_case_list,
+        sample_evaluation,
+        agent_name="agent_y",
+        date="2024-01-02_00-00-00",
+        rating=3,
+    )
+    with pytest.raises(ValueError):
+        warehouse.ingest(output)
+    assert [row["mean_rating"] for row in warehouse.rating_trend("agent_y")] == [9]
+
+    warehouse.ingest(output, replace=True)
+    trend = warehouse.rating_trend(agent_name="agent_y")
+    assert [row["mean_rating"] for row in trend] == [3]
+    assert [row["num_cases"] for row in trend] == [3]
+
+
+@pytest.mark.asyncio
+async def test_runner_ingests_runs_of_same_agent(tmp_path, benchmark_case_list):
+    agent = AsyncMock()
+    agent.name = "test_agent"
+    agent.run_benchmark_case = AsyncMock(
+        return_value=BenchmarkCaseResponse(
+            exit_code=ExitCode.SUCCESS, response="success"
+        )
+    )
+    runs = [
+        BenchmarkRun(agent=agent, benchmark=Benchmark(cases=benchmark_case_list))
+        for _ in range(2)
+    ]
+    with ResultsWarehouse(str(tmp_path / "results.db")) as warehouse:
+        runner = BenchmarkRunner(
+            runs=runs,
+            evaluator=Evaluator.HAPPY,
+            results_folder=str(tmp_path),
+            warehouse=warehouse,
+        )
+        results = await runner.run()
+
+        assert results[0].run_id != results[1].run_id
+        trend = warehouse.rating_trend(agent_name="test_agent")
+        assert sorted(row["run_id"] for row in trend) == sorted(
+            result.run_id for result in results
+        )
@@ -0,0 +1,60 @@
+# Copyright 2024 Recursive AI
+
+import pytest
+
+from recursiveai.benchmark._internal._benchmark_output import BenchmarkOutput
+from recursiveai.benchmark._internal._run_output import RunOutput
+from recursiveai.benchmark.api import compare_runs
+
+
+def _run_output(benchmark_case_list, sample_evaluation, ratings):
+    outputs = []
+    for idx, rating in enumerate(ratings):
+        evaluation = (
+            None
+            if rating is None
+            else sample_evaluation.model_copy(update={"ratings": [rating]})
+        )
+        outputs.append(
+            BenchmarkOutput(
+                id=idx,
+                info=benchmark_case_list[idx % len(benchmark_case_list)],
+                evaluations=[evaluation],
+            )
+        )
+    return RunOutput(date="", agent_name="test_agent", benchmark_outputs=outputs)
+
+
+def test_compare_runs(benchmark_case_list, sample_evaluation):
+    baseline = _run_output(
+        benchmark_case_list, sample_evaluation, [5, 6, 7, 5, 6, 7, 5, 6, 7, None]
+    )
+    candidate = _run_output(
+        benchmark_case_list, sample_evaluation, [7, 8, 8, 6, 8, 9, 7, 7, 9, 9]
+    )
+    comparison = compare_runs(baseline, candidate)
+
+    assert comparison.num_cases == 9
+    assert comparison.mean_difference == pytest.approx(15 / 9)
+    low, high = comparison.mean_difference_ci
+    assert 0 < low < comparison.mean_difference < high
+    assert comparison.effect_size > 1
+    assert comparison.p_value < 0.001
+    assert comparison.significant
+
+
+def test_compare_runs_same_ratings(benchmark_case_list, sample_evaluation):
+    run = _run_output(benchmark_case_list, sample_evaluation, [5, 6, 7])
+    comparison = compare_runs(run, run)
+
+    assert comparison.mean_difference == 0
+    assert comparison.p_value == 1.0
+    assert comparison.effect_size is None
+    assert not comparison.significant
+
+
+def test_compare_runs_different_cases(benchmark_case_list, sample_evaluation):
+    baseline = _run_output(benchmark_case_list, sample_evaluation, [5, 6, 7])
+    candidate = _run_output(benchmark_case_list, sample_evaluation, [5, 6])
+    with pytest.raises(ValueError):
+        compare_runs(baseline, candidate)
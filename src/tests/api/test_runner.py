@@ -1,5 +1,6 @@
 # Copyright 2024 Recursive AI
 
+import asyncio
 import datetime
 import json
 import os
@@ -9,14 +10,21 @@ import pytest
 
 from recursiveai.benchmark._internal._benchmark_evaluator import BenchmarkEvaluator
 from recursiveai.benchmark._internal._benchmark_output import BenchmarkOutput
+from recursiveai.benchmark._internal._concurrency_sweep_output import (
+    ConcurrencyLevelOutput,
+    ConcurrencySweepOutput,
+)
+from recursiveai.benchmark._internal._repeat_timing import StreamTiming
 from recursiveai.benchmark._internal._run_output import RunOutput
 from recursiveai.benchmark.api import (
+    BatchBenchmarkAgent,
     Benchmark,
     BenchmarkCaseResponse,
     BenchmarkRun,
     BenchmarkRunner,
     ExitCode,
 )
+from recursiveai.benchmark.api.agents import AsyncStreamingCallbackAgent
 from recursiveai.benchmark.api.benchmark_evaluator import Evaluator
 from recursiveai.benchmark.api.benchmark_runner import _MAX_NUM_REPEATS
 
@@ -99,6 +107,14 @@ async def test_execute_run_sequential_success(benchmark_case_list):
         assert all([evl.test_answer == "success" for evl in out.evaluations])
         assert out.total_runtime is not None and out.total_runtime > 0.0
         assert out.mean_case_runtime is not None and out.mean_case_runtime > 0.0
+        assert len(out.case_runtimes) == out.repeats
+        assert len(out.timings) == out.repeats
+        for timing in out.timings:
+            assert timing.before_case is not None
+            assert timing.agent is not None
+            assert timing.evaluator is not None
+            assert timing.after_case is not None
+            assert timing.total >= timing.agent + timing.evaluator
         agent.before_case.assert_any_await(benchmark_case_list[idx])
         agent.after_case.assert_any_await(benchmark_case_list[idx])
 
@@ -127,6 +143,14 @@ async def test_execute_run_parallel_success(benchmark_case_list):
         assert all([evl.test_answer == "success" for evl in out.evaluations])
         assert out.total_runtime is not None and out.total_runtime > 0.0
         assert out.mean_case_runtime is not None and out.mean_case_runtime > 0.0
+        assert len(out.case_runtimes) == out.repeats
+        assert len(out.timings) == out.repeats
+        for timing in out.timings:
+            assert timing.before_case is not None
+            assert timing.agent is not None
+            assert timing.evaluator is not None
+            assert timing.after_case is not None
+            assert timing.total >= timing.agent + timing.evaluator
         agent.before_case.assert_any_await(benchmark_case_list[idx])
         agent.after_case.assert_any_await(benchmark_case_list[idx])
 
@@ -153,6 +177,7 @@ async def test_execute_run_failure_exit_code(benchmark_case_list):
         assert all([evl is None for evl in out.evaluations])
         assert out.total_runtime is not None and out.total_runtime > 0.0
         assert out.mean_case_runtime is None
+        assert out.case_runtimes == []
         agent.before_case.assert_any_await(benchmark_case_list[idx])
         agent.after_case.assert_any_await(benchmark_case_list[idx])
 
@@ -177,6 +202,7 @@ async def test_execute_run_failure_exception(benchmark_case_list):
         assert all([evl is None for evl in out.evaluations])
         assert out.total_runtime is not None and out.total_runtime > 0.0
         assert out.mean_case_runtime is None
+        assert out.case_runtimes == []
         agent.before_case.assert_any_await(benchmark_case_list[idx])
         agent.after_case.assert_any_await(benchmark_case_list[idx])
 
@@ -201,3 +227,979 @@ def test_single_run():
 def test_evaluator_type():
     runner = BenchmarkRunner(runs=[], evaluator=Evaluator.HAPPY)
     assert isinstance(runner._evaluator, BenchmarkEvaluator)
+
+
+@pytest.mark.asyncio
+async def test_execute_run_phase_timings(benchmark_case_list):
+    async def slow_agent(_):
+        await asyncio.sleep(0.05)
+        return BenchmarkCaseResponse(exit_code=ExitCode.SUCCESS, response="success")
+
+    agent = AsyncMock()
+    agent.name = "test_agent"
+    agent.run_benchmark_case = slow_agent
+    run = BenchmarkRun(agent=agent, benchmark=Benchmark(cases=benchmark_case_list))
+
+    runner = BenchmarkRunner(
+        runs=[], evaluator=Evaluator.HAPPY, parallel=True, max_concurrency=1
+    )
+    result = await runner._execute_run(run=run)
+
+    queue_times = sorted(out.timings[0].queue for out in result.benchmark_outputs)
+    assert queue_times[0] < 0.05
+    assert queue_times[-1] >= 0.09
+    phase_timings = result.metrics.phase_timings
+    assert phase_timings["agent"]["min"] >= 0.05
+    assert phase_timings["evaluator"]["max"] < 0.05
+    assert phase_timings["queue"]["max"] == pytest.approx(queue_times[-1])
+
+
+@pytest.mark.asyncio
+async def test_execute_run_failure_phase_timings(benchmark_case_list):
+    agent = AsyncMock()
+    agent.name = "test_agent"
+    agent.run_benchmark_case = AsyncMock(
+        return_value=BenchmarkCaseResponse(exit_code=ExitCode.FAILED)
+    )
+    run = BenchmarkRun(agent=agent, benchmark=Benchmark(cases=benchmark_case_list))
+
+    runner = BenchmarkRunner(runs=[], evaluator=Evaluator.HAPPY)
+    result = await runner._execute_run(run=run)
+
+    for out in result.benchmark_outputs:
+        assert out.timings[0].agent is not None
+        assert out.timings[0].evaluator is None
+        assert out.timings[0].after_case is not None
+    assert result.metrics.phase_timings["evaluator"] is None
+
+
+@pytest.mark.asyncio
+async def test_sweep_concurrency_knee(sample_benchmark_case):
+    agent_capacity = asyncio.Semaphore(2)
+
+    async def saturating_agent(_):
+        async with agent_capacity:
+            await asyncio.sleep(0.02)
+        return BenchmarkCaseResponse(exit_code=ExitCode.SUCCESS, response="success")
+
+    agent = AsyncMock()
+    agent.name = "test_agent"
+    agent.run_benchmark_case = saturating_agent
+    cases = [sample_benchmark_case.model_copy(deep=True) for _ in range(8)]
+    run = BenchmarkRun(agent=agent, benchmark=Benchmark(cases=cases))
+
+    runner = BenchmarkRunner(runs=[], evaluator=Evaluator.HAPPY)
+    result = await runner._execute_sweep(
+        run=run,
+        concurrency_levels=[1, 2, 4, 8],
+        sample_size=None,
+        evaluate=False,
+        knee_threshold=0.2,
+        seed=None,
+    )
+
+    assert [level.concurrency for level in result.levels] == [1, 2, 4, 8]
+    assert all([level.num_requests == 8 for level in result.levels])
+    assert all([level.error_rate == 0.0 for level in result.levels])
+    assert all([level.mean_rating is None for level in result.levels])
+    assert result.levels[1].throughput > 1.5 * result.levels[0].throughput
+    assert result.knee_concurrency == 2
+    agent.before_run.assert_awaited_once()
+    agent.after_run.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_sweep_concurrency_sample_and_evaluate(benchmark_case_list):
+    agent = AsyncMock()
+    agent.name = "test_agent"
+    agent.run_benchmark_case = AsyncMock(
+        return_value=BenchmarkCaseResponse(
+            exit_code=ExitCode.SUCCESS, response="success"
+        )
+    )
+    run = BenchmarkRun(agent=agent, benchmark=Benchmark(cases=benchmark_case_list))
+
+    runner = BenchmarkRunner(runs=[], evaluator=Evaluator.HAPPY, max_concurrency=7)
+    result = await runner._execute_sweep(
+        run=run,
+        concurrency_levels=[1, 2],
+        sample_size=2,
+        evaluate=True,
+        knee_threshold=0.1,
+        seed=0,
+    )
+
+    assert all([level.num_requests == 2 for level in result.levels])
+    assert all([level.mean_rating == 10.0 for level in result.levels])
+    assert runner._semaphore._value == 7
+
+
+@pytest.mark.asyncio
+async def test_sweep_concurrency_keeps_run_results_file(tmp_path, benchmark_case_list):
+    agent = AsyncMock()
+    agent.name = "test_agent"
+    agent.run_benchmark_case = AsyncMock(
+        return_value=BenchmarkCaseResponse(
+            exit_code=ExitCode.SUCCESS, response="success"
+        )
+    )
+    run = BenchmarkRun(agent=agent, benchmark=Benchmark(cases=benchmark_case_list))
+    runner = BenchmarkRunner(
+        runs=run,
+        evaluator=Evaluator.HAPPY,
+        results_folder=str(tmp_path),
+        results_file="results.json",
+    )
+    await runner.run()
+    await runner.sweep_concurrency(concurrency_levels=[1], results_file="sweep.json")
+
+    with open(tmp_path / "results.json") as f:
+        assert "runs" in json.load(f)
+    with open(tmp_path / "sweep.json") as f:
+        assert len(json.load(f)["sweeps"]) == 1
+
+    await runner.sweep_concurrency(concurrency_levels=[1])
+    assert len(list(tmp_path.glob("concurrency_sweep_*.json"))) == 1
+
+
+@pytest.mark.asyncio
+async def test_sweep_concurrency_keeps_runner_semaphore(benchmark_case_list):
+    runner = BenchmarkRunner(runs=[], evaluator=Evaluator.HAPPY, max_concurrency=7)
+    semaphore = runner._semaphore
+    semaphores = []
+
+    async def run_benchmark_case(_):
+        semaphores.append(runner._semaphore)
+        return BenchmarkCaseResponse(exit_code=ExitCode.SUCCESS, response="success")
+
+    agent = AsyncMock()
+    agent.name = "test_agent"
+    agent.run_benchmark_case = run_benchmark_case
+    run = BenchmarkRun(agent=agent, benchmark=Benchmark(cases=benchmark_case_list))
+    await runner._execute_sweep(
+        run=run,
+        concurrency_levels=(1, 2),
+        sample_size=None,
+        evaluate=False,
+        knee_threshold=0.1,
+        seed=None,
+    )
+
+    assert len(semaphores) == 6
+    assert all(current is semaphore for current in semaphores)
+
+
+def test_sweep_knee_not_reached():
+    sweep = ConcurrencySweepOutput(
+        date="",
+        agent_name="",
+        knee_threshold=0.1,
+        levels=[
+            ConcurrencyLevelOutput(concurrency=1, elapsed=1.0, latencies=[1.0]),
+            ConcurrencyLevelOutput(concurrency=2, elapsed=1.0, latencies=[1.0] * 2),
+        ],
+    )
+    assert sweep.knee_concurrency is None
+
+
+@pytest.mark.asyncio
+async def test_execute_run_streaming_agent(benchmark_case_list):
+    async def stream(_: str):
+        await asyncio.sleep(0.02)
+        for chunk in ["su", "cc", "ess"]:
+            yield chunk
+            await asyncio.sleep(0.01)
+
+    agent = AsyncStreamingCallbackAgent(async_callback=stream)
+    run = BenchmarkRun(agent=agent, benchmark=Benchmark(cases=benchmark_case_list))
+
+    runner = BenchmarkRunner(runs=[], evaluator=Evaluator.HAPPY, repeats=2)
+    result = await runner._execute_run(run=run)
+
+    for out in result.benchmark_outputs:
+        assert all([evl.test_answer == "success" for evl in out.evaluations])
+        for timing in out.timings:
+            assert timing.stream.num_chunks == 3
+            assert timing.stream.output_chars == 7
+            assert timing.stream.time_to_first_chunk >= 0.02
+            assert timing.stream.max_inter_chunk_gap >= 0.01
+            assert timing.stream.chunks_per_second > 0.0
+            assert timing.agent >= timing.stream.time_to_first_chunk
+    stream_timings = result.metrics.stream_timings
+    assert stream_timings["time_to_first_chunk"]["min"] >= 0.02
+    assert stream_timings["chunks_per_second"]["max"] <= 100.0
+
+
+@pytest.mark.asyncio
+async def test_execute_run_streaming_agent_failure(benchmark_case_list):
+    async def fail_stream(_: str):
+        yield "partial"
+        raise Exception()
+
+    agent = AsyncStreamingCallbackAgent(async_callback=fail_stream)
+    run = BenchmarkRun(agent=agent, benchmark=Benchmark(cases=benchmark_case_list))
+
+    runner = BenchmarkRunner(runs=[], evaluator=Evaluator.HAPPY)
+    result = await runner._execute_run(run=run)
+
+    for out in result.benchmark_outputs:
+        assert all([evl is None for evl in out.evaluations])
+        assert out.case_runtimes == []
+
+
+def test_stream_timing_single_chunk():
+    timing = StreamTiming.from_chunks(start_time=1.0, chunk_times=[1.5], chunks=["a"])
+    assert timing.time_to_first_chunk == 0.5
+    assert timing.num_chunks == 1
+    assert timing.chunks_per_second is None
+
+
+def test_run_metrics_no_stream_timings(run_outputs):
+    assert run_outputs[1].metrics.stream_timings is None
+
+
+class _EchoBatchAgent(BatchBenchmarkAgent):
+    def __init__(self) -> None:
+        self.batches = []
+
+    async def run_benchmark_cases(self, cases):
+        self.batches.append(len(cases))
+        return [
+            BenchmarkCaseResponse(exit_code=ExitCode.SUCCESS, response=case.query)
+            for case in cases
+        ]
+
+    @property
+    def max_batch_size(self) -> int:
+        return 2
+
+
+@pytest.mark.asyncio
+async def test_execute_run_batch_agent(benchmark_case_list):
+    cases = [
+        case.model_copy(update={"query": f"q{idx}"})
+        for idx, case in enumerate(benchmark_case_list * 2)
+    ]
+    agent = _EchoBatchAgent()
+    run = BenchmarkRun(agent=agent, benchmark=Benchmark(cases=cases))
+
+    runner = BenchmarkRunner(runs=[], evaluator=Evaluator.HAPPY, parallel=True)
+    result = await runner._execute_run(run=run)
+
+    assert agent.batches == [2, 2, 2]
+    for idx, out in enumerate(result.benchmark_outputs):
+        assert out.evaluations[0].test_answer == f"q{idx}"
+        assert out.timings[0].batch_size == 2
+
+
+@pytest.mark.asyncio
+async def test_execute_run_batch_agent_sequential(benchmark_case_list):
+    agent = _EchoBatchAgent()
+    run = BenchmarkRun(agent=agent, benchmark=Benchmark(cases=benchmark_case_list))
+
+    runner = BenchmarkRunner(runs=[], evaluator=Evaluator.HAPPY, repeats=2)
+    result = await runner._execute_run(run=run)
+
+    assert agent.batches == [1] * 6
+    for out in result.benchmark_outputs:
+        assert all([evl.test_answer == "test_query" for evl in out.evaluations])
+        # Batches are not held back when no other case can join them
+        assert all([timing.batch_wait < 0.01 for timing in out.timings])
+
+
+@pytest.mark.asyncio
+async def test_execute_run_batch_agent_fewer_cases_than_batch(benchmark_case_list):
+    class _SlowBatchAgent(_EchoBatchAgent):
+        @property
+        def max_batch_size(self) -> int:
+            return 8
+
+        @property
+        def max_batch_wait(self) -> float:
+            return 10.0
+
+    agent = _SlowBatchAgent()
+    run = BenchmarkRun(agent=agent, benchmark=Benchmark(cases=benchmark_case_list))
+
+    runner = BenchmarkRunner(runs=[], evaluator=Evaluator.HAPPY, parallel=True)
+    result = await asyncio.wait_for(runner._execute_run(run=run), timeout=1.0)
+
+    assert agent.batches == [3]
+    for out in result.benchmark_outputs:
+        assert out.timings[0].batch_size == 3
+        assert out.timings[0].batch_wait < 1.0
+
+
+@pytest.mark.asyncio
+async def test_execute_run_warmup_cases(benchmark_case_list):
+    agent = AsyncMock()
+    agent.name = "test_agent"
+    agent.run_benchmark_case = AsyncMock(
+        return_value=BenchmarkCaseResponse(
+            exit_code=ExitCode.SUCCESS, response="success"
+        )
+    )
+    run = BenchmarkRun(agent=agent, benchmark=Benchmark(cases=benchmark_case_list))
+
+    runner = BenchmarkRunner(runs=[], evaluator=Evaluator.HAPPY, warmup_cases=5)
+    result = await runner._execute_run(run=run)
+
+    assert agent.run_benchmark_case.await_count == 5 + len(benchmark_case_list)
+    assert result.warmup.num_cases == 5
+    assert result.warmup.num_errors == 0
+    assert len(result.warmup.case_runtimes) == 5
+    assert result.metrics.latency_histogram.count == len(benchmark_case_list)
+    for out in result.benchmark_outputs:
+        assert len(out.evaluations) == out.repeats
+
+
+@pytest.mark.asyncio
+async def test_execute_run_warmup_seconds(benchmark_case_list):
+    async def slow_agent(_):
+        await asyncio.sleep(0.01)
+        return BenchmarkCaseResponse(exit_code=ExitCode.FAILED)
+
+    agent = AsyncMock()
+    agent.name = "test_agent"
+    agent.run_benchmark_case = slow_agent
+    run = BenchmarkRun(agent=agent, benchmark=Benchmark(cases=benchmark_case_list))
+
+    runner = BenchmarkRunner(runs=[], evaluator=Evaluator.HAPPY, warmup_seconds=0.05)
+    result = await runner._execute_run(run=run)
+
+    assert result.warmup.total_runtime >= 0.05
+    assert result.warmup.num_cases >= 3
+    assert result.warmup.num_errors == result.warmup.num_cases
+    assert result.warmup.mean_case_runtime is None
+
+
+@pytest.mark.asyncio
+async def test_execute_run_no_warmup(benchmark_case_list):
+    agent = AsyncMock()
+    agent.name = "test_agent"
+    run = BenchmarkRun(agent=agent, benchmark=Benchmark(cases=benchmark_case_list))
+
+    runner = BenchmarkRunner(runs=[], evaluator=Evaluator.HAPPY)
+    result = await runner._execute_run(run=run)
+
+    assert result.warmup is None
+
+
+@pytest.mark.asyncio
+async def test_execute_run_case_timeout(benchmark_case_list):
+    async def hanging_agent(case):
+        if case is benchmark_case_list[1]:
+            await asyncio.sleep(10)
+        return BenchmarkCaseResponse(exit_code=ExitCode.SUCCESS, response="success")
+
+    agent = AsyncMock()
+    agent.name = "test_agent"
+    agent.run_benchmark_case = hanging_agent
+    run = BenchmarkRun(agent=agent, benchmark=Benchmark(cases=benchmark_case_list))
+
+    runner = BenchmarkRunner(
+        runs=[], evaluator=Evaluator.HAPPY, parallel=True, case_timeout=0.05
+    )
+    result = await asyncio.wait_for(runner._execute_run(run=run), timeout=1)
+
+    outputs = result.benchmark_outputs
+    assert outputs[0].exit_codes == [ExitCode.SUCCESS]
+    assert outputs[1].exit_codes == [ExitCode.TIMEOUT]
+    assert outputs[1].evaluations == [None]
+    assert outputs[1].case_runtimes == []
+    assert outputs[1].timings[0].agent >= 0.05
+    assert outputs[2].exit_codes == [ExitCode.SUCCESS]
+    agent.after_case.assert_any_await(benchmark_case_list[1])
+
+
+@pytest.mark.asyncio
+async def test_execute_run_deadline(sample_benchmark_case):
+    async def slow_agent(_):
+        await asyncio.sleep(0.1)
+        return BenchmarkCaseResponse(exit_code=ExitCode.SUCCESS, response="success")
+
+    agent = AsyncMock()
+    agent.name = "test_agent"
+    agent.run_benchmark_case = slow_agent
+    cases = [sample_benchmark_case.model_copy(deep=True) for _ in range(10)]
+    run = BenchmarkRun(agent=agent, benchmark=Benchmark(cases=cases))
+
+    runner = BenchmarkRunner(
+        runs=run,
+        evaluator=Evaluator.HAPPY,
+        run_deadline=0.25,
+        results_folder="benchmark_temp",
+        results_file="results.json",
+    )
+    try:
+        await asyncio.wait_for(runner.run(), timeout=2)
+        with open("benchmark_temp/results.json", "r") as f:
+            results = json.load(f)
+    finally:
+        try:
+            os.remove("benchmark_temp/results.json")
+            os.rmdir("benchmark_temp")
+        except OSError:
+            pass
+
+    outputs = results["runs"][0]["benchmark_outputs"]
+    assert len(outputs) == 10
+    exit_codes = [code for out in outputs for code in out["exit_codes"]]
+    assert exit_codes[:2] == [ExitCode.SUCCESS, ExitCode.SUCCESS]
+    assert exit_codes[-1] == ExitCode.TIMEOUT
+    assert len(exit_codes) == 3
+    assert outputs[-1]["repeats"] == 0
+    assert outputs[-1]["evaluations"] == []
+    assert runner._deadline is None
+
+
+@pytest.mark.asyncio
+async def test_execute_run_deadline_evaluation(
+    sample_benchmark_case, sample_evaluation
+):
+    agent = AsyncMock()
+    agent.name = "test_agent"
+    agent.run_benchmark_case = AsyncMock(
+        return_value=BenchmarkCaseResponse(
+            exit_code=ExitCode.SUCCESS, response="success"
+        )
+    )
+    run = BenchmarkRun(agent=agent, benchmark=Benchmark(cases=[sample_benchmark_case]))
+
+    async def slow_evaluate(**_):
+        await asyncio.sleep(1.0)
+        return sample_evaluation
+
+    runner = BenchmarkRunner(runs=[], evaluator=Evaluator.HAPPY, run_deadline=0.05)
+    runner._evaluator.evaluate = slow_evaluate
+    result = await asyncio.wait_for(runner._execute_run(run=run), timeout=0.5)
+
+    (output,) = result.benchmark_outputs
+    assert output.exit_codes == [ExitCode.TIMEOUT]
+    assert output.evaluations == [None]
+    assert output.timings[0].evaluator is None
+    agent.after_case.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_execute_run_deadline_after_case_grace(sample_benchmark_case):
+    agent = AsyncMock()
+    agent.name = "test_agent"
+    agent.run_benchmark_case = AsyncMock(
+        return_value=BenchmarkCaseResponse(
+            exit_code=ExitCode.SUCCESS, response="success"
+        )
+    )
+    cleaned_up = []
+
+    async def slow_after_case(_):
+        await asyncio.sleep(0.2)
+        cleaned_up.append(True)
+
+    agent.after_case = slow_after_case
+    run = BenchmarkRun(agent=agent, benchmark=Benchmark(cases=[sample_benchmark_case]))
+
+    runner = BenchmarkRunner(runs=[], evaluator=Evaluator.HAPPY, run_deadline=0.05)
+    result = await asyncio.wait_for(runner._execute_run(run=run), timeout=1.0)
+
+    assert cleaned_up == [True]
+    assert result.benchmark_outputs[0].timings[0].after_case >= 0.2
+
+
+@pytest.mark.asyncio
+async def test_execute_run_early_stopping(benchmark_case_list):
+    agent = AsyncMock()
+    agent.name = "test_agent"
+    agent.run_benchmark_case = AsyncMock(
+        return_value=BenchmarkCaseResponse(
+            exit_code=ExitCode.SUCCESS, response="success"
+        )
+    )
+    run = BenchmarkRun(agent=agent, benchmark=Benchmark(cases=benchmark_case_list))
+
+    runner = BenchmarkRunner(
+        runs=[], evaluator=Evaluator.HAPPY, repeats=10, target_ci_width=1.0
+    )
+    result = await runner._execute_run(run=run)
+
+    for out in result.benchmark_outputs:
+        assert out.repeats == 3
+        assert len(out.evaluations) == 3
+
+
+@pytest.mark.asyncio
+async def test_execute_run_early_stopping_noisy_ratings(
+    benchmark_case_list, sample_evaluation
+):
+    agent = AsyncMock()
+    agent.name = "test_agent"
+    agent.run_benchmark_case = AsyncMock(
+        return_value=BenchmarkCaseResponse(
+            exit_code=ExitCode.SUCCESS, response="success"
+        )
+    )
+    run = BenchmarkRun(agent=agent, benchmark=Benchmark(cases=benchmark_case_list))
+    ratings = iter([1, 10] * 30)
+
+    async def noisy_evaluate(**_):
+        return sample_evaluation.model_copy(update={"ratings": [next(ratings)]})
+
+    runner = BenchmarkRunner(
+        runs=[], evaluator=Evaluator.HAPPY, repeats=6, target_ci_width=1.0
+    )
+    runner._evaluator.evaluate = noisy_evaluate
+    result = await runner._execute_run(run=run)
+
+    for out in result.benchmark_outputs:
+        assert out.repeats == 6
+
+
+@pytest.mark.asyncio
+async def test_execute_run_early_stopping_single_repeat(benchmark_case_list):
+    agent = AsyncMock()
+    agent.name = "test_agent"
+    agent.run_benchmark_case = AsyncMock(
+        return_value=BenchmarkCaseResponse(
+            exit_code=ExitCode.SUCCESS, response="success"
+        )
+    )
+    run = BenchmarkRun(agent=agent, benchmark=Benchmark(cases=benchmark_case_list))
+
+    runner = BenchmarkRunner(
+        runs=[], evaluator=Evaluator.HAPPY, repeats=1, target_ci_width=1.0
+    )
+    assert runner._min_repeats == 1
+    result = await runner._execute_run(run=run)
+
+    for out in result.benchmark_outputs:
+        assert out.repeats == 1
+        assert out.exit_codes == [ExitCode.SUCCESS]
+
+
+@pytest.mark.asyncio
+async def test_execute_run_repeat_budget_early_stopping(benchmark_case_list):
+    agent = AsyncMock()
+    agent.name = "test_agent"
+    agent.run_benchmark_case = AsyncMock(
+        return_value=BenchmarkCaseResponse(
+            exit_code=ExitCode.SUCCESS, response="success"
+        )
+    )
+    run = BenchmarkRun(agent=agent, benchmark=Benchmark(cases=benchmark_case_list))
+
+    runner = BenchmarkRunner(
+        runs=[],
+        evaluator=Evaluator.HAPPY,
+        repeats=1,
+        repeat_budget=3,
+        target_ci_width=1.0,
+    )
+    result = await runner._execute_run(run=run)
+
+    assert [out.repeats for out in result.benchmark_outputs] == [1, 1, 1]
+
+
+def test_min_repeats_bounds():
+    runner = BenchmarkRunner(runs=[], repeats=4, min_repeats=10)
+    assert runner._min_repeats == 4
+    runner = BenchmarkRunner(runs=[], repeats=4, min_repeats=0)
+    assert runner._min_repeats == 2
+
+
+@pytest.mark.asyncio
+async def test_execute_run_repeat_budget(benchmark_case_list, sample_evaluation):
+    cases = [
+        case.model_copy(update={"query": f"q{idx}"})
+        for idx, case in enumerate(benchmark_case_list)
+    ]
+    agent = AsyncMock()
+    agent.name = "test_agent"
+    agent.run_benchmark_case = AsyncMock(
+        return_value=BenchmarkCaseResponse(
+            exit_code=ExitCode.SUCCESS, response="success"
+        )
+    )
+    run = BenchmarkRun(agent=agent, benchmark=Benchmark(cases=cases))
+    noisy_ratings = iter([1, 10] * 30)
+
+    async def evaluate(query, **_):
+        rating = next(noisy_ratings) if query == "q0" else 5
+        return sample_evaluation.model_copy(update={"ratings": [rating]})
+
+    runner = BenchmarkRunner(
+        runs=[], evaluator=Evaluator.HAPPY, parallel=True, repeat_budget=20
+    )
+    runner._evaluator.evaluate = evaluate
+    result = await runner._execute_run(run=run)
+
+    repeats = [out.repeats for out in result.benchmark_outputs]
+    assert repeats == [14, 3, 3]
+    for out in result.benchmark_outputs:
+        assert len(out.evaluations) == out.repeats
+        assert len(out.timings) == out.repeats
+
+
+@pytest.mark.asyncio
+async def test_execute_run_repeat_budget_small(benchmark_case_list):
+    agent = AsyncMock()
+    agent.name = "test_agent"
+    agent.run_benchmark_case = AsyncMock(
+        return_value=BenchmarkCaseResponse(
+            exit_code=ExitCode.SUCCESS, response="success"
+        )
+    )
+    run = BenchmarkRun(agent=agent, benchmark=Benchmark(cases=benchmark_case_list))
+
+    runner = BenchmarkRunner(runs=[], evaluator=Evaluator.HAPPY, repeat_budget=4)
+    result = await runner._execute_run(run=run)
+
+    assert [out.repeats for out in result.benchmark_outputs] == [1, 1, 1]
+
+
+@pytest.mark.asyncio
+async def test_execute_run_repeat_budget_sample(benchmark_case_list):
+    agent = AsyncMock()
+    agent.name = "test_agent"
+    agent.run_benchmark_case = AsyncMock(
+        return_value=BenchmarkCaseResponse(
+            exit_code=ExitCode.SUCCESS, response="success"
+        )
+    )
+    run = BenchmarkRun(agent=agent, benchmark=Benchmark(cases=benchmark_case_list))
+
+    runner = BenchmarkRunner(
+        runs=[], evaluator=Evaluator.HAPPY, repeat_budget=4, sample_size=2
+    )
+    result = await runner._execute_run(run=run)
+
+    assert [out.repeats for out in result.benchmark_outputs] == [2, 2]
+
+
+def _labelled_cases(benchmark_case_list, num_cases):
+    case = benchmark_case_list[0]
+    return [
+        case.model_copy(
+            update={"query": f"q{idx}", "labels": ["easy" if idx % 4 else "hard"]}
+        )
+        for idx in range(num_cases)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_execute_run_canary_abort(benchmark_case_list, sample_evaluation):
+    agent = AsyncMock()
+    agent.name = "test_agent"
+    agent.run_benchmark_case = AsyncMock(
+        return_value=BenchmarkCaseResponse(
+            exit_code=ExitCode.SUCCESS, response="success"
+        )
+    )
+    cases = _labelled_cases(benchmark_case_list, 20)
+    run = BenchmarkRun(agent=agent, benchmark=Benchmark(cases=cases))
+    ratings = iter([1, 2] * 30)
+
+    async def evaluate(**_):
+        return sample_evaluation.model_copy(update={"ratings": [next(ratings)]})
+
+    runner = BenchmarkRunner(
+        runs=[],
+        evaluator=Evaluator.HAPPY,
+        canary_size=0.25,
+        canary_threshold=5.0,
+        canary_seed=0,
+    )
+    runner._evaluator.evaluate = evaluate
+    result = await runner._execute_run(run=run)
+
+    assert not result.canary.passed
+    assert result.canary.ci_high < 5.0
+    assert len(result.benchmark_outputs) == 5
+    assert [out.id for out in result.benchmark_outputs] == result.canary.case_ids
+    assert agent.run_benchmark_case.await_count == 5
+
+
+@pytest.mark.asyncio
+async def test_execute_run_canary_pass(benchmark_case_list):
+    agent = AsyncMock()
+    agent.name = "test_agent"
+    agent.run_benchmark_case = AsyncMock(
+        return_value=BenchmarkCaseResponse(
+            exit_code=ExitCode.SUCCESS, response="success"
+        )
+    )
+    cases = _labelled_cases(benchmark_case_list, 20)
+    run = BenchmarkRun(agent=agent, benchmark=Benchmark(cases=cases))
+
+    runner = BenchmarkRunner(
+        runs=[],
+        evaluator=Evaluator.HAPPY,
+        parallel=True,
+        canary_size=4,
+        canary_threshold=5.0,
+        canary_stratify=True,
+    )
+    result = await runner._execute_run(run=run)
+
+    assert result.canary.passed
+    assert len(result.canary.case_ids) == 4
+    assert [out.id for out in result.benchmark_outputs] == list(range(20))
+
+
+def test_sample_canary_stratified(benchmark_case_list):
+    cases = _labelled_cases(benchmark_case_list, 20)
+    runner = BenchmarkRunner(
+        runs=[],
+        canary_size=8,
+        canary_threshold=5.0,
+        canary_stratify=True,
+        canary_seed=1,
+    )
+    sample = runner._sample_canary(cases=cases, case_ids=list(range(len(cases))))
+
+    assert len(sample) == len(set(sample)) == 8
+    assert sum(1 for idx in sample if cases[idx].labels == ["hard"]) == 2
+
+
+def test_select_cases_sample_and_shards(benchmark_case_list):
+    cases = _labelled_cases(benchmark_case_list, 20)
+    shards = [
+        BenchmarkRunner(
+            runs=[],
+            sample_size=0.5,
+            sample_seed=3,
+            num_shards=3,
+            shard_index=idx,
+        )._select_cases(cases)
+        for idx in range(3)
+    ]
+
+    merged = sorted(idx for shard in shards for idx in shard)
+    assert len(merged) == len(set(merged)) == 10
+    assert [len(shard) for shard in shards] == [4, 3, 3]
+
+
+def test_invalid_shard_index():
+    with pytest.raises(ValueError):
+        BenchmarkRunner(runs=[], num_shards=2, shard_index=2)
+
+
+@pytest.mark.asyncio
+async def test_execute_run_resume(tmp_path, benchmark_case_list, sample_evaluation):
+    agent = AsyncMock()
+    agent.name = "test_agent"
+    agent.run_benchmark_case = AsyncMock(
+        return_value=BenchmarkCaseResponse(
+            exit_code=ExitCode.SUCCESS, response="success"
+        )
+    )
+    cases = _labelled_cases(benchmark_case_list, 4)
+    previous = RunOutput(
+        date="date",
+        agent_name="test_agent",
+        benchmark_outputs=[
+            # Completed, but stored under a different id
+            BenchmarkOutput(
+                id=3,
+                info=cases[0],
+                evaluations=[sample_evaluation],
+                exit_codes=[ExitCode.SUCCESS],
+            ),
+            BenchmarkOutput(
+                id=1,
+                info=cases[1],
+                evaluations=[None],
+                exit_codes=[ExitCode.FAILED],
+            ),
+            BenchmarkOutput(id=2, info=cases[2], repeats=0, evaluations=[]),
+        ],
+    )
+    resume_file = tmp_path / "previous.json"
+    resume_file.write_text(json.dumps({"runs": [previous.model_dump()]}))
+
+    runner = BenchmarkRunner(
+        runs=[], evaluator=Evaluator.HAPPY, resume_from=str(resume_file)
+    )
+    run = BenchmarkRun(agent=agent, benchmark=Benchmark(cases=cases))
+    result = await runner._execute_run(run=run)
+
+    assert [out.id for out in result.benchmark_outputs] == [0, 1, 2, 3]
+    assert result.benchmark_outputs[0].evaluations == [sample_evaluation]
+    assert result.resumed_case_ids == [0]
+    assert agent.run_benchmark_case.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_execute_run_resume_canary_abort(
+    tmp_path, benchmark_case_list, sample_evaluation
+):
+    agent = AsyncMock()
+    agent.name = "test_agent"
+    agent.run_benchmark_case = AsyncMock(
+        return_value=BenchmarkCaseResponse(
+            exit_code=ExitCode.SUCCESS, response="success"
+        )
+    )
+    cases = _labelled_cases(benchmark_case_list, 8)
+    previous = RunOutput(
+        date="date",
+        agent_name="test_agent",
+        benchmark_outputs=[
+            BenchmarkOutput(
+                id=idx,
+                info=cases[idx],
+                evaluations=[sample_evaluation],
+                exit_codes=[ExitCode.SUCCESS],
+                case_runtimes=[100.0],
+            )
+            for idx in range(4)
+        ],
+    )
+    resume_file = tmp_path / "previous.json"
+    resume_file.write_text(json.dumps({"runs": [previous.model_dump()]}))
+
+    async def evaluate(**_):
+        return sample_evaluation.model_copy(update={"ratings": [1]})
+
+    runner = BenchmarkRunner(
+        runs=[],
+        evaluator=Evaluator.HAPPY,
+        resume_from=str(resume_file),
+        canary_size=2,
+        canary_threshold=5.0,
+    )
+    runner._evaluator.evaluate = evaluate
+    run = BenchmarkRun(agent=agent, benchmark=Benchmark(cases=cases))
+    result = await runner._execute_run(run=run)
+
+    assert not result.canary.passed
+    assert [out.id for out in result.benchmark_outputs] == sorted(
+        [0, 1, 2, 3, *result.canary.case_ids]
+    )
+    assert result.resumed_case_ids == [0, 1, 2, 3]
+    assert result.metrics.latency_histogram.count == 6
+    # Only the 2 canary repeats ran within the run's runtime
+    assert result.metrics.throughput == pytest.approx(2 / result.total_runtime)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "parallel, prewarm, connections",
+    [(True, True, 8), (False, True, 1), (True, False, None)],
+)
+async def test_execute_run_prewarm(benchmark_case_list, parallel, prewarm, connections):
+    agent = AsyncMock()
+    agent.name = "test_agent"
+    agent.run_benchmark_case = AsyncMock(
+        return_value=BenchmarkCaseResponse(
+            exit_code=ExitCode.SUCCESS, response="success"
+        )
+    )
+    runner = BenchmarkRunner(
+        runs=[],
+        evaluator=Evaluator.HAPPY,
+        parallel=parallel,
+        max_concurrency=8,
+        prewarm=prewarm,
+    )
+    runner._evaluator.prewarm = AsyncMock(side_effect=Exception())
+    run = BenchmarkRun(agent=agent, benchmark=Benchmark(cases=benchmark_case_list))
+    result = await runner._execute_run(run=run)
+
+    assert len(result.benchmark_outputs) == len(benchmark_case_list)
+    if connections is None:
+        runner._evaluator.prewarm.assert_not_awaited()
+    else:
+        runner._evaluator.prewarm.assert_awaited_once_with(connections)
+
+
+@pytest.mark.asyncio
+async def test_execute_run_incremental_ratings_store(benchmark_case_list):
+    agent = AsyncMock()
+    agent.name = "test_agent"
+    agent.run_benchmark_case = AsyncMock(
+        return_value=BenchmarkCaseResponse(
+            exit_code=ExitCode.SUCCESS, response="success"
+        )
+    )
+    run = BenchmarkRun(agent=agent, benchmark=Benchmark(cases=benchmark_case_list))
+
+    runner = BenchmarkRunner(runs=[], evaluator=Evaluator.HAPPY, parallel=True)
+    result = await runner._execute_run(run=run)
+
+    assert result._ratings_store is not None
+    assert not runner._ratings_stores
+    assert result.metrics is result.metrics
+    assert result.metrics.benchmark_metrics == []
+    assert result.metrics.num_benchmarks == len(benchmark_case_list)
+    rebuilt = RunOutput(
+        date=result.date,
+        agent_name=result.agent_name,
+        benchmark_outputs=result.benchmark_outputs,
+        total_runtime=result.total_runtime,
+    )
+    assert result.metrics.model_dump() == rebuilt.metrics.model_dump()
+
+
+def test_run_output_metrics_follow_outputs(run_outputs):
+    run_output = run_outputs[1]
+    num_benchmarks = run_output.metrics.num_benchmarks
+    run_output.benchmark_outputs.append(run_output.benchmark_outputs[0])
+    assert run_output.metrics.num_benchmarks == num_benchmarks + 1
+    run_output.total_runtime = 2.0
+    assert run_output.metrics.runtime == 2.0
+
+
+def test_run_output_pass_threshold(run_outputs):
+    run_output = run_outputs[1]
+    assert run_output.metrics.pass_rate == 0.0
+
+    run_output.pass_threshold = 7.0
+    run_output.confidence = 0.5
+    assert run_output.metrics.pass_rate == 1.0
+    assert run_output.metrics.confidence == 0.5
+    assert run_output.model_dump()["pass_threshold"] == 7.0
+
+
+@pytest.mark.asyncio
+async def test_execute_run_pass_threshold(benchmark_case_list):
+    agent = AsyncMock()
+    agent.name = "test_agent"
+    agent.run_benchmark_case = AsyncMock(
+        return_value=BenchmarkCaseResponse(
+            exit_code=ExitCode.SUCCESS, response="success"
+        )
+    )
+    run = BenchmarkRun(agent=agent, benchmark=Benchmark(cases=benchmark_case_list))
+
+    runner = BenchmarkRunner(
+        runs=[], evaluator=Evaluator.HAPPY, pass_threshold=10.5, confidence=0.9
+    )
+    result = await runner._execute_run(run=run)
+
+    assert result.pass_threshold == 10.5
+    assert result.confidence == 0.9
+    assert result.metrics.pass_rate == 0.0
+
+
+@pytest.mark.asyncio
+async def test_execute_run_drop_case_text(benchmark_case_list):
+    agent = AsyncMock()
+    agent.name = "test_agent"
+    agent.run_benchmark_case = AsyncMock(
+        return_value=BenchmarkCaseResponse(
+            exit_code=ExitCode.SUCCESS, response="success"
+        )
+    )
+    run = BenchmarkRun(agent=agent, benchmark=Benchmark(cases=benchmark_case_list))
+
+    kept = await BenchmarkRunner(runs=[], evaluator=Evaluator.HAPPY)._execute_run(
+        run=run
+    )
+    dropped = await BenchmarkRunner(
+        runs=[], evaluator=Evaluator.HAPPY, drop_case_text=True
+    )._execute_run(run=run)
+
+    for output in dropped.benchmark_outputs:
+        assert all(evaluation.test_answer == "" for evaluation in output.evaluations)
+    assert dropped.metrics.ratings == kept.metrics.ratings
+    assert dropped.metrics.histogram == kept.metrics.histogram
@@ -1,18 +1,25 @@
 # Copyright 2024 Recursive AI
 
+from importlib.metadata import EntryPoint
 from unittest.mock import AsyncMock, Mock
 
 import pytest
 
 from recursiveai.benchmark._internal._evaluation import Evaluation
-from recursiveai.benchmark._internal._evaluators import get_evaluator
+from recursiveai.benchmark._internal._evaluators import (
+    EVALUATORS,
+    _registry,
+    get_evaluator,
+)
 from recursiveai.benchmark._internal._evaluators._happy import HappyEvaluator
 from recursiveai.benchmark._internal._evaluators._llm_judge import LLMJudgeEvaluator
 from recursiveai.benchmark._internal._evaluators._llm_jury import LLMJuryEvaluator
 from recursiveai.benchmark._internal._evaluators._regex_match import RegexMatchEvaluator
+from recursiveai.benchmark._internal._evaluators._registry import EvaluatorRegistry
 from recursiveai.benchmark._internal._evaluators._strict_match import (
     StrictMatchEvaluator,
 )
+from recursiveai.benchmark.api import BenchmarkRunner, register_evaluator
 from recursiveai.benchmark.api.benchmark_evaluator import Evaluator
 
 
@@ -214,9 +221,9 @@ def test_get_regex_match_evaluator():
     assert isinstance(evaluator, RegexMatchEvaluator)
 
 
-def test_get_default_evaluator():
-    evaluator = get_evaluator("test")
-    assert isinstance(evaluator, LLMJudgeEvaluator)
+def test_get_unknown_evaluator():
+    with pytest.raises(ValueError):
+        get_evaluator("test")
 
 
 @pytest.mark.asyncio
@@ -325,3 +332,63 @@ async def test_regex_match_evaluate_number():
         query="query", reference_answer="\\d+", test_answer="answer"
     )
     assert evaluation.rating == 1
+
+
+def test_evaluator_registry():
+    registry = EvaluatorRegistry(entry_point_group="test.evaluators")
+    registry.register("shared", HappyEvaluator)
+    registry.register("fresh", HappyEvaluator, cached=False)
+
+    assert registry.names() == ["fresh", "shared"]
+    assert registry.create("shared") is registry.create("shared")
+    assert registry.create("fresh") is not registry.create("fresh")
+    with pytest.raises(ValueError):
+        registry.register("shared", StrictMatchEvaluator)
+    registry.register("shared", StrictMatchEvaluator, replace=True)
+    assert isinstance(registry.create("shared"), StrictMatchEvaluator)
+    with pytest.raises(ValueError):
+        registry.create("unknown")
+    registry.unregister("shared")
+    assert registry.names() == ["fresh"]
+
+
+def test_evaluator_registry_entry_points(monkeypatch):
+    entry_point = EntryPoint(
+        name="plugged",
+        value="recursiveai.benchmark._internal._evaluators._happy:HappyEvaluator",
+        group="test.evaluators",
+    )
+    monkeypatch.setattr(
+        _registry,
+        "entry_points",
+        lambda group: [entry_point] if group == "test.evaluators" else [],
+    )
+    registry = EvaluatorRegistry(entry_point_group="test.evaluators")
+
+    assert isinstance(registry.create("plugged"), HappyEvaluator)
+    assert registry.create("plugged") is registry.create("plugged")
+
+
+@pytest.fixture
+def registered_name():
+    name = "test_register_evaluator"
+    yield name
+    EVALUATORS.unregister(name)
+
+
+def test_register_evaluator(registered_name):
+    register_evaluator(registered_name, lambda: HappyEvaluator(rating=3))
+
+    evaluator = get_evaluator(registered_name)
+    assert isinstance(evaluator, HappyEvaluator)
+    assert get_evaluator(registered_name) is evaluator
+    assert isinstance(
+        BenchmarkRunner(runs=[], evaluator=registered_name)._evaluator,
+        HappyEvaluator,
+    )
+
+
+def test_llm_evaluators_are_shared():
+    assert get_evaluator(Evaluator.LLM_JUDGE_GPT_4_0) is get_evaluator(
+        "llm_judge_gpt-4o"
+    )
@@ -0,0 +1,14 @@
+# Copyright 2024 Recursive AI
+
+from recursiveai.benchmark._internal._llm._google_gemini_model import GoogleGemini
+
+# Runs without GOOGLE_API_KEY, unlike the tests in test_google.py
+
+
+def test_client_cache():
+    model = GoogleGemini(name="mock_model", context_window=8)
+    client = model._client("system prompt")
+
+    assert model._client("system prompt") is client
+    assert model._client("other system prompt") is not client
+    assert model._client() is model._client(None)
@@ -0,0 +1,66 @@
+# Copyright 2024 Recursive AI
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+from recursiveai.benchmark._internal._llm._registry import get_model
+
+_PROVIDER_MODULES = ["openai", "anthropic", "google.generativeai"]
+
+# Importing every provider SDK took about 3s, the api alone takes well under 1s
+_MAX_IMPORT_SECONDS = 2.0
+
+_IMPORT_BENCHMARK = """
+import json, sys, time
+start = time.perf_counter()
+import recursiveai.benchmark.api
+seconds = time.perf_counter() - start
+{statement}
+print(json.dumps({{
+    "seconds": seconds,
+    "providers": [module for module in {providers} if module in sys.modules],
+}}))
+"""
+
+
+def _benchmark_import(statement: str = "") -> dict:
+    code = _IMPORT_BENCHMARK.format(statement=statement, providers=_PROVIDER_MODULES)
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def test_api_import_time():
+    result = _benchmark_import()
+
+    assert result["providers"] == []
+    assert result["seconds"] < _MAX_IMPORT_SECONDS
+
+
+def test_local_evaluator_does_not_import_providers():
+    statement = (
+        "from recursiveai.benchmark.api import BenchmarkRunner, Evaluator\n"
+        "BenchmarkRunner(runs=[], evaluator=Evaluator.STRICT_MATCH)"
+    )
+    assert _benchmark_import(statement)["providers"] == []
+
+
+def test_llm_evaluator_imports_its_provider_only():
+    statement = (
+        "from recursiveai.benchmark.api import BenchmarkRunner, Evaluator\n"
+        "BenchmarkRunner(runs=[], evaluator=Evaluator.LLM_JUDGE_CLAUDE_3_HAIKU)"
+    )
+    assert _benchmark_import(statement)["providers"] == ["anthropic"]
+
+
+def test_get_model():
+    model = get_model("GPT_4_1_MINI")
+
+    assert model.name == "gpt-4.1-mini"
+    assert get_model("GPT_4_1_MINI") is model
+    with pytest.raises(ValueError):
+        get_model("GPT_5")
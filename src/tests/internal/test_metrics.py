@@ -5,7 +5,24 @@ import pytest
 
 from recursiveai.benchmark._internal._evaluation import Evaluation
 from recursiveai.benchmark._internal._metrics._benchmark_metrics import BenchmarkMetrics
-from recursiveai.benchmark._internal._metrics._run_metrics import RunMetrics
+from recursiveai.benchmark._internal._metrics._judge_agreement import (
+    judge_agreement,
+    judge_ratings_matrix,
+)
+from recursiveai.benchmark._internal._metrics._latency_histogram import LatencyHistogram
+from recursiveai.benchmark._internal._metrics._ratings_store import RatingsStore
+from recursiveai.benchmark._internal._metrics._run_metrics import (
+    RATING_BINS,
+    RunMetrics,
+)
+from recursiveai.benchmark._internal._metrics._statistics import (
+    bootstrap_confidence_interval,
+    bootstrap_mean_distribution,
+    mean_confidence_interval,
+    neyman_allocation,
+    t_critical_value,
+    t_two_sided_p_value,
+)
 
 
 @pytest.fixture
@@ -192,3 +209,288 @@ def test_run_metrics_std_dev(run_metrics):
 def test_run_metrics_std_dev_empty():
     run_metrics = RunMetrics(benchmark_metrics=[])
     assert run_metrics.std_dev is None
+
+
+def test_latency_histogram_empty():
+    histogram = LatencyHistogram()
+    assert histogram.count == 0
+    assert histogram.quantile(0.5) is None
+    assert histogram.summary() is None
+
+
+def test_latency_histogram_quantiles():
+    values = np.linspace(0.01, 10.0, 1000)
+    histogram = LatencyHistogram()
+    histogram.add_many(values)
+    assert histogram.count == 1000
+    assert histogram.min == pytest.approx(0.01)
+    assert histogram.max == pytest.approx(10.0)
+    assert histogram.mean == pytest.approx(np.mean(values))
+    for q in [0.5, 0.9, 0.95, 0.99]:
+        expected = np.quantile(values, q)
+        assert histogram.quantile(q) == pytest.approx(expected, rel=0.03)
+
+
+def test_latency_histogram_zero_values():
+    histogram = LatencyHistogram()
+    histogram.add_many([0.0, 0.0, 1.0])
+    assert histogram.zero_count == 2
+    assert histogram.quantile(0.0) == 0.0
+    assert histogram.quantile(1.0) == pytest.approx(1.0, rel=0.01)
+
+
+def test_latency_histogram_merge():
+    first, second, combined = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+    first.add_many([0.1, 0.2, 0.3])
+    second.add_many([1.0, 2.0])
+    combined.add_many([0.1, 0.2, 0.3, 1.0, 2.0])
+    first.merge(second)
+    assert first == combined
+
+
+def test_latency_histogram_merge_different_accuracy():
+    with pytest.raises(ValueError):
+        LatencyHistogram().merge(LatencyHistogram(relative_accuracy=0.05))
+
+
+def test_latency_histogram_serialization():
+    histogram = LatencyHistogram()
+    histogram.add_many([0.1, 0.5, 2.0])
+    restored = LatencyHistogram.model_validate_json(histogram.model_dump_json())
+    assert restored == histogram
+
+
+def test_run_metrics_latency():
+    run_metrics = RunMetrics(
+        benchmark_metrics=[
+            BenchmarkMetrics(evals=[], runtimes=[1.0, 2.0]),
+            BenchmarkMetrics(evals=[], runtimes=[3.0]),
+        ],
+        runtime=2.0,
+    )
+    latency = run_metrics.latency
+    assert latency["min"] == 1.0
+    assert latency["max"] == 3.0
+    assert latency["p50"] == pytest.approx(2.0, rel=0.02)
+    assert np.isclose(latency["mean"], 2.0)
+    assert np.isclose(run_metrics.throughput, 1.5)
+
+
+def test_run_metrics_latency_empty(run_metrics):
+    assert run_metrics.latency is None
+    assert run_metrics.throughput is None
+
+
+@pytest.mark.parametrize(
+    argnames=["dof", "expected"],
+    argvalues=[(1, 12.706), (2, 4.303), (3, 3.182), (5, 2.571), (30, 2.042)],
+)
+def test_t_critical_value(dof, expected):
+    assert t_critical_value(0.95, dof) == pytest.approx(expected, rel=0.01)
+
+
+def test_mean_confidence_interval():
+    low, high = mean_confidence_interval([5, 7, 9], confidence=0.95)
+    assert np.isclose((low + high) / 2, 7.0)
+    assert high - low == pytest.approx(2 * 4.303 * 2 / np.sqrt(3), rel=0.01)
+
+
+def test_mean_confidence_interval_single_value():
+    assert mean_confidence_interval([5]) is None
+
+
+def test_neyman_allocation_proportional_to_std_dev():
+    allocation = neyman_allocation(
+        std_devs=[0.0, 1.0, 3.0], current=[2, 2, 2], budget=12, max_per_item=20
+    )
+    assert allocation.sum() == 12
+    assert allocation[0] == 0
+    assert allocation[2] > allocation[1]
+    assert allocation[2] + 2 == pytest.approx(3 * (allocation[1] + 2), abs=1)
+
+
+def test_neyman_allocation_capacity():
+    allocation = neyman_allocation(
+        std_devs=[1.0, 1.0], current=[4, 2], budget=10, max_per_item=5
+    )
+    assert list(allocation) == [1, 3]
+
+
+def test_neyman_allocation_no_variance():
+    allocation = neyman_allocation(
+        std_devs=[0.0, 0.0], current=[2, 2], budget=10, max_per_item=20
+    )
+    assert allocation.sum() == 0
+
+
+def test_bootstrap_confidence_interval():
+    values = np.random.default_rng(0).integers(0, 11, size=100_000)
+    low, high = bootstrap_confidence_interval(values, seed=0)
+    assert low < values.mean() < high
+    # Matches the normal approximation of the standard error of the mean
+    assert high - low == pytest.approx(
+        2 * 1.96 * values.std() / np.sqrt(values.size), rel=0.1
+    )
+
+
+def test_bootstrap_confidence_interval_continuous_values():
+    values = np.random.default_rng(0).random(500)
+    low, high = bootstrap_confidence_interval(values, seed=0)
+    assert low < values.mean() < high
+
+
+def test_bootstrap_confidence_interval_empty():
+    assert bootstrap_confidence_interval([]) is None
+
+
+def test_bootstrap_mean_distribution_reproducible():
+    first = bootstrap_mean_distribution([1, 2, 3], num_resamples=10, seed=1)
+    second = bootstrap_mean_distribution([1, 2, 3], num_resamples=10, seed=1)
+    assert first.shape == (10,)
+    assert np.array_equal(first, second)
+
+
+@pytest.mark.parametrize(
+    argnames=["t", "dof", "expected"],
+    argvalues=[(12.706, 1, 0.05), (2.228, 10, 0.05), (2.750, 30, 0.01), (0.0, 5, 1.0)],
+)
+def test_t_two_sided_p_value(t, dof, expected):
+    assert t_two_sided_p_value(t, dof) == pytest.approx(expected, rel=0.01)
+
+
+def test_run_metrics_pass_rate(run_metrics):
+    assert run_metrics.pass_rate == pytest.approx(1 / 3)
+    low, high = run_metrics.pass_rate_ci
+    assert 0.0 <= low <= run_metrics.pass_rate <= high <= 1.0
+    low, high = run_metrics.mean_rating_ci
+    assert low <= run_metrics.mean_rating <= high
+
+
+def test_run_metrics_pass_rate_empty():
+    run_metrics = RunMetrics(benchmark_metrics=[])
+    assert run_metrics.pass_rate is None
+    assert run_metrics.pass_rate_ci is None
+    assert run_metrics.mean_rating_ci is None
+
+
+def test_ratings_store_add_case():
+    store = RatingsStore(num_cases=1, num_repeats=1)
+    assert store.add_case(ratings=[5, None], runtimes=[0.1, 0.2]) == 0
+    assert store.add_case(ratings=[7, 9, 8]) == 1
+    assert store.add_case(ratings=[None]) == 2
+
+    assert store.num_cases == 3
+    assert store.ratings.shape == (3, 3)
+    assert np.allclose(store.case_mean_ratings()[:2], [5.0, 8.0])
+    assert np.isnan(store.case_mean_ratings()[2])
+    assert np.allclose(store.valid_values("runtime"), [0.1, 0.2])
+
+
+def test_ratings_store_from_benchmark_metrics(multi_benchmark_metrics):
+    store = RatingsStore.from_benchmark_metrics(multi_benchmark_metrics)
+    assert store.num_cases == 4
+    assert store.ratings.shape == (4, 1)
+    assert np.allclose(store.valid_values("rating"), [5, 9, 7])
+
+
+def test_ratings_store_empty():
+    store = RatingsStore.from_benchmark_metrics([])
+    assert store.num_cases == 0
+    assert store.case_mean_ratings().size == 0
+    assert store.valid_values("runtime").size == 0
+
+
+def _jury_evaluation(ratings):
+    return Evaluation(
+        evaluator="llm_jury model_a,model_b",
+        query="",
+        reference_answer="",
+        test_answer="",
+        evaluation=[""] * len(ratings),
+        ratings=ratings,
+        rating_min=0,
+        rating_max=10,
+    )
+
+
+def test_judge_ratings_matrix():
+    ratings, judges = judge_ratings_matrix(
+        [_jury_evaluation([1, 2]), None, _jury_evaluation([3, None])]
+    )
+    assert judges == ["model_a", "model_b"]
+    assert np.array_equal(ratings, [[1, 2], [3, np.nan]], equal_nan=True)
+
+
+def test_judge_ratings_matrix_no_jury(multi_evaluations):
+    assert judge_ratings_matrix(multi_evaluations) is None
+
+
+def test_judge_agreement():
+    ratings = np.array([[1, 2], [3, 4], [5, 6], [8, np.nan]])
+    agreement = judge_agreement(ratings, judges=["a", "b"], bins=RATING_BINS)
+
+    assert agreement.num_evaluations == 3
+    assert np.allclose(agreement.pairwise_correlation, [[1.0, 1.0], [1.0, 1.0]])
+    assert np.allclose(agreement.judge_bias, [-0.5, 0.5])
+    assert agreement.fleiss_kappa == pytest.approx(1.0)
+    assert agreement.krippendorff_alpha == pytest.approx(6 / 7)
+
+
+def test_judge_agreement_disagreement():
+    ratings = np.array([[1.0, 9.0], [9.0, 1.0], [2.0, 8.0], [8.0, 2.0]])
+    agreement = judge_agreement(ratings, judges=["a", "b"], bins=RATING_BINS)
+
+    assert agreement.pairwise_correlation[0][1] == pytest.approx(-1.0)
+    assert agreement.fleiss_kappa < 0
+    assert agreement.krippendorff_alpha < 0
+
+
+def test_run_metrics_judge_agreement():
+    run_metrics = RunMetrics(
+        benchmark_metrics=[
+            BenchmarkMetrics(evals=[_jury_evaluation([r, r + 1])]) for r in [1, 4, 7]
+        ]
+    )
+    agreement = run_metrics.judge_agreement
+    assert agreement.judges == ["model_a", "model_b"]
+    assert agreement.num_evaluations == 3
+    assert agreement.pairwise_correlation[0][1] == pytest.approx(1.0)
+
+
+def test_run_metrics_judge_agreement_no_jury(run_metrics):
+    assert run_metrics.judge_agreement is None
+
+
+def test_ratings_store_take():
+    store = RatingsStore()
+    store.add_case(ratings=[5], case_id=3)
+    store.add_case(ratings=[7, 9], case_id=1)
+
+    taken = store.take([1, 3])
+    assert taken.num_cases == 2
+    assert np.allclose(taken.case_mean_ratings(), [8.0, 5.0])
+    assert store.num_cases == 2
+
+
+def test_ratings_store_merge():
+    shard_0 = RatingsStore()
+    shard_0.add_case(ratings=[5], runtimes=[0.1], case_id=0)
+    shard_0.add_case(ratings=[7], runtimes=[0.2], case_id=2)
+    shard_1 = RatingsStore()
+    shard_1.add_case(ratings=[9, None], runtimes=[0.3, 0.4], case_id=1)
+
+    merged = RatingsStore.merge([shard_0, RatingsStore(), shard_1])
+    assert merged.num_cases == 3
+    assert merged.ratings.shape == (3, 2)
+    assert np.allclose(merged.take([0, 1, 2]).case_mean_ratings(), [5.0, 9.0, 7.0])
+    assert np.allclose(merged.valid_values("runtime"), [0.1, 0.2, 0.3, 0.4])
+    assert RatingsStore.merge([]).num_cases == 0
+
+
+def test_ratings_store_from_ratings():
+    store = RatingsStore.from_ratings([[5, None], [7, 9, 8], [], [None]])
+    assert store.ratings.shape == (4, 3)
+    means = store.case_mean_ratings()
+    assert np.allclose(means[:2], [5.0, 8.0])
+    assert np.isnan(means[2:]).all()
+    assert RatingsStore.from_ratings([]).case_mean_ratings().size == 0
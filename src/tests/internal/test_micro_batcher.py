@@ -0,0 +1,106 @@
+# Copyright 2024 Recursive AI
+
+import asyncio
+
+import pytest
+
+from recursiveai.benchmark._internal._micro_batcher import MicroBatcher
+
+
+@pytest.mark.asyncio
+async def test_micro_batcher_full_batches():
+    batches = []
+
+    async def handler(items: list[int]) -> list[int]:
+        batches.append(items)
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(handler=handler, max_batch_size=3, max_batch_wait=10.0)
+    results = await asyncio.gather(*[batcher.submit(item) for item in range(6)])
+
+    assert [result for result, _, _ in results] == [0, 2, 4, 6, 8, 10]
+    assert all([batch_size == 3 for _, batch_size, _ in results])
+    assert batches == [[0, 1, 2], [3, 4, 5]]
+
+
+@pytest.mark.asyncio
+async def test_micro_batcher_max_wait():
+    batches = []
+
+    async def handler(items: list[int]) -> list[int]:
+        batches.append(items)
+        return items
+
+    batcher = MicroBatcher(handler=handler, max_batch_size=10, max_batch_wait=0.01)
+    results = await asyncio.gather(*[batcher.submit(item) for item in range(4)])
+
+    assert [result for result, _, _ in results] == [0, 1, 2, 3]
+    assert batches == [[0, 1, 2, 3]]
+    assert all([wait >= 0.01 for _, _, wait in results])
+
+
+@pytest.mark.asyncio
+async def test_micro_batcher_submitters():
+    batches = []
+
+    async def handler(items: list[int]) -> list[int]:
+        batches.append(items)
+        return items
+
+    batcher = MicroBatcher(handler=handler, max_batch_size=10, max_batch_wait=10.0)
+
+    async def submit(item: int, num_items: int) -> list[int]:
+        with batcher.submitter():
+            return [(await batcher.submit(item))[0] for _ in range(num_items)]
+
+    results = await asyncio.wait_for(
+        asyncio.gather(submit(0, 2), submit(1, 1), submit(2, 2)), timeout=1.0
+    )
+
+    assert results == [[0, 0], [1], [2, 2]]
+    assert batches == [[0, 1, 2], [0, 2]]
+
+
+@pytest.mark.asyncio
+async def test_micro_batcher_handler_exception():
+    async def handler(_: list[int]) -> list[int]:
+        raise RuntimeError()
+
+    batcher = MicroBatcher(handler=handler, max_batch_size=2, max_batch_wait=0.01)
+    results = await asyncio.gather(
+        *[batcher.submit(item) for item in range(2)], return_exceptions=True
+    )
+
+    assert all([isinstance(result, RuntimeError) for result in results])
+
+
+@pytest.mark.asyncio
+async def test_micro_batcher_wrong_number_of_results():
+    async def handler(items: list[int]) -> list[int]:
+        return items[:-1]
+
+    batcher = MicroBatcher(handler=handler, max_batch_size=2, max_batch_wait=0.01)
+    with pytest.raises(ValueError):
+        await asyncio.gather(*[batcher.submit(item) for item in range(2)])
+
+
+def test_micro_batcher_invalid_batch_size():
+    with pytest.raises(ValueError):
+        MicroBatcher(handler=None, max_batch_size=0, max_batch_wait=0.01)
+
+
+@pytest.mark.asyncio
+async def test_micro_batcher_cancelled_submit():
+    batches = []
+
+    async def handler(items: list[int]) -> list[int]:
+        batches.append(items)
+        return items
+
+    batcher = MicroBatcher(handler=handler, max_batch_size=10, max_batch_wait=0.05)
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(batcher.submit(0), timeout=0.01)
+    results = await asyncio.gather(*[batcher.submit(item) for item in (1, 2)])
+
+    assert [result for result, _, _ in results] == [1, 2]
+    assert batches == [[1, 2]]
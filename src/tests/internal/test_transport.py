@@ -0,0 +1,96 @@
+# Copyright 2024 Recursive AI
+
+from unittest.mock import AsyncMock
+
+import anthropic
+import httpx
+import openai
+import pytest
+
+from recursiveai.benchmark._internal._llm import _transport
+from recursiveai.benchmark._internal._llm._anthropic_claude_model import AnthropicClaude
+from recursiveai.benchmark._internal._llm._openai_gpt_model import GPTX
+from recursiveai.benchmark._internal._llm._transport import (
+    TransportConfig,
+    configure_transport,
+    prewarm_connections,
+    shared_http_client,
+)
+
+
+@pytest.fixture(autouse=True)
+def transport(monkeypatch):
+    monkeypatch.setattr(_transport, "_config", TransportConfig())
+    monkeypatch.setattr(_transport, "_http_clients", {})
+
+
+def test_shared_http_client():
+    configure_transport(TransportConfig(max_connections=8, keepalive_expiry=5.0))
+    client = shared_http_client("openai", openai)
+
+    assert shared_http_client("openai", openai) is client
+    assert shared_http_client("azure_openai", openai) is not client
+    pool = client._transport._pool
+    assert pool._max_connections == 8
+    assert pool._max_keepalive_connections == 8
+    assert pool._keepalive_expiry == 5.0
+
+
+def test_models_share_http_client(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+    models = [GPTX(name="a", context_window=8), GPTX(name="b", context_window=8)]
+    claude = AnthropicClaude(name="c", context_window=8)
+
+    assert models[0]._client is not models[1]._client
+    assert models[0]._client._client is models[1]._client._client
+    assert models[0]._client._client is shared_http_client("openai", openai)
+    assert claude._client._client is shared_http_client("anthropic", anthropic)
+
+
+def test_http2_requires_h2():
+    configure_transport(TransportConfig(http2=True))
+    try:
+        import h2  # noqa: F401 pylint: disable=unused-import
+    except ImportError:
+        with pytest.raises(ImportError):
+            shared_http_client("openai", openai)
+    else:
+        assert shared_http_client("openai", openai)._transport._pool._http2
+
+
+@pytest.mark.asyncio
+async def test_prewarm_connections():
+    configure_transport(TransportConfig(max_connections=4))
+    client = shared_http_client("openai", openai)
+    client.head = AsyncMock(side_effect=[None, None, httpx.ConnectError(""), None])
+
+    opened = await prewarm_connections(client, "https://example.com", 10)
+
+    assert opened == 3
+    assert client.head.await_count == 4
+
+
+def test_configure_transport_existing_pools(caplog):
+    client = shared_http_client("openai", openai)
+    configure_transport(TransportConfig(max_connections=4))
+
+    assert "openai keep their settings" in caplog.text
+    assert shared_http_client("openai", openai) is client
+    assert (
+        shared_http_client("anthropic", anthropic)._transport._pool._max_connections
+        == 4
+    )
+
+
+def test_runner_keeps_transport_unless_given():
+    from recursiveai.benchmark.api import BenchmarkRunner
+
+    config = _transport.transport_config()
+    BenchmarkRunner(runs=[], evaluator="happy", max_concurrency=8)
+    assert _transport.transport_config() is config
+
+    BenchmarkRunner(
+        runs=[], evaluator="happy", transport=TransportConfig(max_connections=8)
+    )
+    assert _transport.transport_config().max_connections == 8